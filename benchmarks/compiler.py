@@ -0,0 +1,150 @@
+"""Mede a compilação de pré-requisitos (fnd_array).
+
+Gera expressões no formato das páginas do SIGAA, com repetições e grafias
+variadas dos operadores, e compara: compilação sem cache, LRU em memória e
+cache em disco (LRU vazia, como numa nova execução).
+
+Também confere a FND em bits com a FND de conjuntos original (``dnf``), depois
+da absorção, em expressões aleatórias com negação, e mede as duas em
+expressões patológicas (conjunções longas de disjunções).
+
+Uso: python -m benchmarks.compiler [--expressions N] [--distinct N] [--fuzz N]
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, List
+
+from src.sigaa_cli.utils.cache import Cache
+from src.sigaa_cli.utils.compiler import Literals, Parser, _compile_text, _compile_uncached, attach_cache, compile_dnf, \
+    dnf, dnf_bits, fnd_array, normalize, to_nnf
+
+OPERATORS = {"OR": ["OU", "ou", "or", "||"], "AND": ["E", "e", "and", "&&"]}
+
+
+def _code(rng: random.Random) -> str:
+    return "MAT" + rng.choice("ABC") + str(rng.randint(1, 60)).zfill(2)
+
+
+def _expression(rng: random.Random, depth: int = 0) -> List[str]:
+    # Lista de (tipo, texto) com grafia sorteada depois, para gerar variantes
+    if depth >= 2 or rng.random() < 0.4:
+        return [_code(rng)]
+    kind = rng.choice(["OR", "AND"])
+    tokens = ["("]
+    for index in range(rng.randint(2, 4)):
+        if index:
+            tokens.append(kind)
+        tokens.extend(_expression(rng, depth + 1))
+    tokens.append(")")
+    return tokens
+
+
+def _spell(rng: random.Random, tokens: List[str]) -> str:
+    return " ".join(rng.choice(OPERATORS[token]) if token in OPERATORS else token for token in tokens)
+
+
+def _time(compile_all: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    compile_all()
+    return time.perf_counter() - start
+
+
+def _fuzz_expression(rng: random.Random, depth: int = 0) -> str:
+    if depth >= 3 or rng.random() < 0.35:
+        return rng.choice(["", "", "NAO "]) + rng.choice(["A", "B", "C", "D", "F"])
+    operator = rng.choice([" OU ", " E "])
+    items = [_fuzz_expression(rng, depth + 1) for _ in range(rng.randint(2, 3))]
+    return rng.choice(["", "NAO "]) + "(" + operator.join(items) + ")"
+
+
+def _sets_reference(expr: str) -> set[frozenset[str]]:
+    terms = dnf(to_nnf(Parser(expr).parse()))
+    return {t for t in terms if not any(o < t for o in terms)}
+
+
+def _sets_bits(expr: str) -> set[frozenset[str]]:
+    lits = Literals()
+    return {frozenset(lits.clause(c)) for c in dnf_bits(to_nnf(Parser(expr).parse()), lits)}
+
+
+def check_engine(samples: int, seed: int) -> int:
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(samples):
+        expr = _fuzz_expression(rng)
+        if _sets_reference(expr) != _sets_bits(expr):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"divergência: {expr}")
+    return mismatches
+
+
+# Conjunções de disjunções: o produto cresce 2^n sem absorção
+PATHOLOGICAL = {
+    "produto (A_i OU B_i)": " E ".join(f"(A{i} OU B{i})" for i in range(10)),
+    "absorção (X OU Y_i)": " E ".join(f"(X OU Y{i} OU Z{i})" for i in range(9)),
+}
+
+
+def bench_pathological() -> None:
+    for label, expr in PATHOLOGICAL.items():
+        node = to_nnf(Parser(expr).parse())
+        start = time.perf_counter(); before = dnf(node); sets = time.perf_counter() - start
+        start = time.perf_counter(); after = dnf_bits(node, Literals()); bits = time.perf_counter() - start
+        print(f"{label:22} conjuntos: {sets * 1000:9.1f} ms ({len(before)} cláusulas)"
+              f"  bits: {bits * 1000:8.1f} ms ({len(after)} cláusulas)")
+
+
+def _clear() -> None:
+    _compile_text.cache_clear()
+    compile_dnf.cache_clear()
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--expressions", type=int, default=20000)
+    arguments.add_argument("--distinct", type=int, default=800)
+    arguments.add_argument("--fuzz", type=int, default=5000)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    engine_mismatches = check_engine(options.fuzz, options.seed)
+    print(f"FND em bits x conjuntos: {options.fuzz} expressões, {engine_mismatches} divergências")
+    bench_pathological()
+
+    rng = random.Random(options.seed)
+    shapes = [_expression(rng) for _ in range(options.distinct)]
+    expressions = [_spell(rng, rng.choice(shapes)) for _ in range(options.expressions)]
+
+    mismatches = sum(1 for expr in expressions[:2000]
+                     if set(map(frozenset, fnd_array(expr))) != set(map(frozenset, _compile_uncached(expr))))
+
+    cold = _time(lambda: [_compile_uncached(expr) for expr in expressions])
+    with tempfile.TemporaryDirectory() as folder:
+        cache = Cache(os.path.join(folder, "bench.sqlite3"), compact_interval=None)
+        attach_cache(cache)
+        _clear()
+        first = _time(lambda: [fnd_array(expr) for expr in expressions])
+        _clear()
+        disk = _time(lambda: [fnd_array(expr) for expr in expressions])
+        memory = _time(lambda: [fnd_array(expr) for expr in expressions])
+        attach_cache(None)
+        cache.close()
+
+    distinct = len({normalize(expr) for expr in expressions})
+    print(f"{len(expressions)} expressões, {distinct} distintas após normalizar")
+    print(f"sem cache:          {cold * 1000:8.1f} ms")
+    print(f"1ª execução:        {first * 1000:8.1f} ms  (compila e grava em disco)")
+    print(f"nova execução:      {disk * 1000:8.1f} ms  (LRU vazia, lê do disco)")
+    print(f"LRU em memória:     {memory * 1000:8.1f} ms  ganho: {cold / memory:.1f}x")
+    print(f"Equivalência: {mismatches} divergências")
+    if mismatches or engine_mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
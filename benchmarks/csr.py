@@ -0,0 +1,122 @@
+"""Compara as análises vetorizadas do grafo em CSR (utils/csr.py) com laços em Python.
+
+Monta um catálogo sintético (o mesmo de ``benchmarks.graph``) e Cursos que
+usam partes dele, exporta o grafo e calcula, dos dois jeitos, a maior cadeia
+de pré-requisitos de cada Curso e quantas Disciplinas dependem de cada uma.
+Confere que os resultados são iguais. Requer numpy.
+
+Uso: python -m benchmarks.csr [--courses N] [--programs N] [--size N]
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.graph import _courses
+from src.sigaa_cli.models.course import AnchoredCourse
+from src.sigaa_cli.models.program import DetailedProgram
+from src.sigaa_cli.utils.csr import CurriculumGraph, blocking, build_graph, load_graph, longest_chains, save_graph
+from src.sigaa_cli.utils.graph import DependencyIndex
+
+
+def _programs(codes: list[str], count: int, size: int, rng: random.Random) -> list[DetailedProgram]:
+    programs = []
+    for index in range(count):
+        # Um trecho contíguo do catálogo (as cadeias ficam dentro do Curso) mais algumas avulsas
+        start = rng.randrange(0, len(codes) - size)
+        chosen = codes[start:start + size * 3 // 4] + rng.sample(codes, size // 4)
+        programs.append(DetailedProgram(
+            id_ref=str(index), code=str(1000 + index), title="CURSO " + str(index), location="SALVADOR",
+            program_type="BACHARELADO", mode="Presencial", time_code="MT",
+            courses=[AnchoredCourse(code=code, name=code, mode="Presencial", id_ref=code, program_code=str(1000 + index),
+                                    level="1", type="OBRIGATÓRIA") for code in chosen],
+        ))
+    return programs
+
+
+def _python(index: DependencyIndex, programs: list[DetailedProgram]) -> tuple[dict[str, int], dict[str, int]]:
+    # O jeito de hoje: laços sobre os modelos e o índice, Curso a Curso
+    chains: dict[str, int] = {}
+    blocked: dict[str, int] = {}
+    for program in programs:
+        members = {course.code for course in program.courses}
+        required = {code: [item for item in index.requires(code, transitive=False) if item in members] for code in members}
+        depth: dict[str, int] = {}
+        for code in sorted(members):
+            stack = [(code, False)]
+            while stack:
+                current, ready = stack.pop()
+                if current in depth:
+                    continue
+                if ready:
+                    depth[current] = 1 + max((depth.get(item, 0) for item in required[current]), default=0)
+                    continue
+                stack.append((current, True))
+                stack.extend((item, False) for item in required[current] if item not in depth)
+        chains[program.code] = max(depth.values(), default=0)
+        for code in members:
+            reached: set[str] = set()
+            pending = list(required[code])
+            while pending:
+                current = pending.pop()
+                if current not in reached:
+                    reached.add(current)
+                    pending.extend(required[current])
+            for item in reached - {code}:
+                blocked[item] = blocked.get(item, 0) + 1
+    return chains, blocked
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--courses", type=int, default=4000)
+    arguments.add_argument("--programs", type=int, default=120)
+    arguments.add_argument("--size", type=int, default=120)
+    arguments.add_argument("--repeat", type=int, default=3)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    rng = random.Random(options.seed)
+    # Sem os ciclos de correquisitos de benchmarks.graph: nos dois jeitos eles saem da contagem de forma diferente
+    courses = _courses(options.courses, rng)
+    for course in courses:
+        course.prerequisites = [[code for code in clause if code < course.code] for clause in course.prerequisites]
+    index = DependencyIndex.build(courses)
+    programs = _programs([course.code for course in courses], options.programs, options.size, rng)
+
+    start = time.perf_counter()
+    graph = build_graph(index, programs)
+    build = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "graph.npz")
+        save_graph(graph, path)
+        size = os.path.getsize(path)
+        loaded = load_graph(path)
+    assert isinstance(loaded, CurriculumGraph)
+
+    # Melhor de algumas rodadas: a primeira chamada de cada função do numpy paga a inicialização
+    vectorised = loops = float("inf")
+    for _ in range(options.repeat):
+        start = time.perf_counter()
+        chains = {chain.program: chain.length for chain in longest_chains(loaded)}
+        blocked = blocking(loaded)
+        vectorised = min(vectorised, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        expected_chains, expected_blocked = _python(index, programs)
+        loops = min(loops, time.perf_counter() - start)
+
+    mismatches = int(chains != expected_chains) + int(blocked != expected_blocked)
+    print(f"{len(graph.codes)} Disciplinas, {len(graph.indices)} pré-requisitos, {len(graph.programs)} Cursos"
+          f" (montagem: {build * 1000:.1f} ms, arquivo: {size // 1024} KiB)")
+    print(f"laços em Python: {loops * 1000:8.1f} ms")
+    print(f"CSR + numpy:     {vectorised * 1000:8.1f} ms  ganho: {loops / vectorised:.1f}x")
+    print(f"Equivalência: {mismatches} análises divergentes")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
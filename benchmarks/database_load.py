@@ -0,0 +1,91 @@
+"""Compara a leitura validada das tabelas com a decodificação confiável.
+
+Monta um banco TinyDB temporário com Cursos e Disciplinas sintéticos e lê cada
+tabela pelos dois caminhos: TinyDB + ``model_validate`` por registro (o de
+sempre, usado na primeira leitura) e ``load_table`` com a versão do esquema já
+registrada. Confere que os modelos são iguais e mede o tempo de cada um.
+
+Uso: python -m benchmarks.database_load [--programs N] [--courses N]
+"""
+from __future__ import annotations
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from tinydb import TinyDB
+
+from src.sigaa_cli.models.course import AnchoredCourse, RequestedCourse
+from src.sigaa_cli.models.program import DetailedProgram
+from src.sigaa_cli.utils.database import dump, load_table
+
+
+def _code(rng: random.Random) -> str:
+    return "MAT" + rng.choice("ABC") + str(rng.randint(1, 99)).zfill(2)
+
+
+def _program(rng: random.Random, index: int, courses: int) -> DetailedProgram:
+    return DetailedProgram(
+        id_ref=str(index), code=str(1000 + index), title="CURSO " + str(index), location="SALVADOR",
+        program_type="BACHARELADO", mode="Presencial", time_code="MT",
+        courses=[
+            AnchoredCourse(code=_code(rng), name="DISCIPLINA " + str(item), mode="Presencial", id_ref=str(item),
+                           program_code=str(1000 + index), level=str(rng.randint(1, 10)), type="OBRIGATÓRIA")
+            for item in range(courses)
+        ],
+    )
+
+
+def _course(rng: random.Random, index: int) -> RequestedCourse:
+    def dnf() -> list[list[str]]:
+        return [[_code(rng) for _ in range(rng.randint(1, 3))] for _ in range(rng.randint(0, 3))]
+    return RequestedCourse(code=_code(rng), name="DISCIPLINA " + str(index), mode="Presencial", id_ref=str(index),
+                           location="SALVADOR", department="IME", prerequisites=dnf(), corequisites=dnf(),
+                           equivalences=dnf())
+
+
+def _time(load: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        load()
+    return (time.perf_counter() - start) / repeat
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--programs", type=int, default=60)
+    arguments.add_argument("--courses", type=int, default=3000)
+    arguments.add_argument("--repeat", type=int, default=5)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    rng = random.Random(options.seed)
+    programs = [_program(rng, index, 50) for index in range(options.programs)]
+    courses = [_course(rng, index) for index in range(options.courses)]
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as folder, TinyDB(Path(folder) / "bench.json") as db:
+        db.table("programs").insert_multiple(dump(program) for program in programs)
+        db.table("courses").insert_multiple(dump(course) for course in courses)
+
+        tables: tuple[tuple[str, Any, list[Any]], ...] = (
+            ("programs", DetailedProgram, programs), ("courses", RequestedCourse, courses))
+        for name, cls, expected in tables:
+            validated = load_table(db, name, cls)  # primeira leitura: valida e registra o esquema
+            trusted = load_table(db, name, cls)
+            mismatches += int(not validated == trusted == expected)
+
+            before = _time(lambda: [cls.model_validate(row) for row in db.table(name).all()], options.repeat)
+            after = _time(lambda: load_table(db, name, cls), options.repeat)
+            print(f"{name:9} validada: {before * 1000:8.2f} ms  confiável: {after * 1000:8.2f} ms"
+                  f"  ganho: {before / after:5.1f}x")
+
+    print(f"Equivalência: {len(programs) + len(courses)} registros, {mismatches} tabelas divergentes")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Compara o avaliador de elegibilidade compilado com a varredura ingênua das FNDs.
+
+Gera um Curso sintético (Disciplinas em semestres, pré-requisitos dos
+semestres anteriores, alguns com negação e alguns literais de fórmula) e
+históricos de alunos, e confere que ``eligible`` e ``eligible_batch`` liberam
+exatamente as mesmas Disciplinas que a varredura ingênua. Uma fórmula
+aninhada além do limite de recursão do Python também tem de ser avaliada.
+
+Uso: python -m benchmarks.eligibility [--courses N] [--students N]
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from typing import Callable
+
+from src.sigaa_cli.models.course import AnchoredCourse
+from src.sigaa_cli.utils.compiler import Parser, Var, Not, And, Or, Node, is_formula, to_nnf
+from src.sigaa_cli.utils.eligibility import Eligibility
+
+
+def _program(count: int, rng: random.Random) -> tuple[list[AnchoredCourse], dict[str, list[list[str]]]]:
+    codes = ["MAT" + "ABC"[index % 3] + str(index).zfill(3) for index in range(count)]
+    courses, requisites = [], {}
+    for index, code in enumerate(codes):
+        level = index * 10 // count + 1
+        courses.append(AnchoredCourse(code=code, name=code, mode="Presencial", id_ref=str(index), program_code="1",
+                                      level=str(level), type="OBRIGATÓRIA"))
+        earlier = codes[:index * (level - 1) // level]
+        clauses = []
+        for _ in range(rng.randint(0, 3) if earlier else 0):
+            clause = [rng.choice(earlier) for _ in range(rng.randint(1, 3))]
+            if rng.random() < 0.05:
+                clause.append("¬" + rng.choice(codes))
+            if rng.random() < 0.02:
+                clause.append("( " + rng.choice(earlier) + " || " + rng.choice(earlier) + " )")
+            clauses.append(sorted(set(clause)))
+        requisites[code] = clauses
+    return courses, requisites
+
+
+def _holds(node: Node, done: set[str]) -> bool:
+    if isinstance(node, Var):
+        return node.name in done
+    if isinstance(node, Not):
+        return not _holds(node.child, done)
+    if isinstance(node, And):
+        return all(_holds(item, done) for item in node.items)
+    if isinstance(node, Or):
+        return any(_holds(item, done) for item in node.items)
+    raise TypeError
+
+
+def naive(courses: list[AnchoredCourse], requisites: Callable[[str], list[list[str]]], done: set[str]) -> list[AnchoredCourse]:
+    def literal(value: str) -> bool:
+        if is_formula(value):
+            return _holds(to_nnf(Parser(value).parse()), done)
+        if value.startswith("¬"):
+            return value[1:] not in done
+        return value in done
+    return [course for course in courses if course.code not in done and (
+        not requisites(course.code) or any(all(literal(value) for value in clause) for clause in requisites(course.code)))]
+
+
+def check_deep() -> int:
+    # "( A0 E ( A1 E ( ... ) ) )": só libera quem cursou todas
+    depth = sys.getrecursionlimit() * 2
+    codes = [f"MATD{index}" for index in range(depth)]
+    text = "( " + " E ( ".join(codes) + " )" * depth
+    course = AnchoredCourse(code="MATZ01", name="MATZ01", mode="Presencial", id_ref="0", program_code="1",
+                            level="1", type="OBRIGATÓRIA")
+    evaluator = Eligibility.build([course], lambda code: [[text]])
+    students = [set(codes), set(codes[1:]), set(codes[:-1]), set()]
+    expected = [[course], [], [], []]
+    found = [evaluator.eligible(done) for done in students]
+    return int(found != expected) + int(evaluator.eligible_batch(students) != expected)
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--courses", type=int, default=300)
+    arguments.add_argument("--students", type=int, default=2000)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    rng = random.Random(options.seed)
+    courses, table = _program(options.courses, rng)
+    codes = [course.code for course in courses]
+    students = [set(rng.sample(codes, rng.randint(0, len(codes) // 2))) for _ in range(options.students)]
+
+    def requisites(code: str) -> list[list[str]]:
+        return table.get(code, [])
+
+    start = time.perf_counter()
+    evaluator = Eligibility.build(courses, requisites)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [naive(courses, requisites, done) for done in students]
+    slow = time.perf_counter() - start
+    start = time.perf_counter()
+    single = [evaluator.eligible(done) for done in students]
+    fast = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = evaluator.eligible_batch(students)
+    batched = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b, c in zip(expected, single, batch) if not a == b == c) + check_deep()
+    print(f"{len(courses)} Disciplinas, {len(students)} alunos (compilação: {build * 1000:.1f} ms)")
+    print(f"varredura ingênua:  {slow * 1000:8.1f} ms")
+    print(f"eligible:           {fast * 1000:8.1f} ms  ganho: {slow / fast:5.1f}x")
+    print(f"eligible_batch:     {batched * 1000:8.1f} ms  ganho: {slow / batched:5.1f}x")
+    print(f"Equivalência: {mismatches} divergências")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compara o índice de equivalências (union-find) com a busca repetida nas equivalências.
+
+Gera Disciplinas com equivalências de um só código (formando cadeias e
+grupos) e algumas de vários códigos, e responde "o aluno já tem algo que
+equivale a X?" de dois jeitos: busca em largura pelas cláusulas a cada
+consulta e consulta ao índice já montado. Confere que as classes e as
+respostas são iguais.
+
+Uso: python -m benchmarks.equivalence [--courses N] [--queries N]
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from src.sigaa_cli.models.course import RequestedCourse
+from src.sigaa_cli.utils.equivalence import EquivalenceIndex
+
+
+def _courses(count: int, rng: random.Random) -> list[RequestedCourse]:
+    codes = ["MAT" + "ABC"[index % 3] + str(index).zfill(4) for index in range(count)]
+    # Grupos pequenos, como nas ementas reais; cada código cita um anterior do mesmo grupo
+    group = 0
+    groups: list[int] = []
+    while len(groups) < count:
+        groups.extend([group] * rng.choice([1, 1, 1, 2, 2, 3, 4]))
+        group += 1
+    members: dict[int, list[str]] = {}
+    courses = []
+    for index, code in enumerate(codes):
+        earlier = members.setdefault(groups[index], [])
+        equivalences = [[rng.choice(earlier)]] if earlier else []
+        if rng.random() < 0.1:
+            equivalences.append([rng.choice(codes), rng.choice(codes)])
+        earlier.append(code)
+        courses.append(RequestedCourse(code=code, name=code, mode="Presencial", id_ref=str(index), location="SALVADOR",
+                                       department="IME", prerequisites=[], corequisites=[], equivalences=equivalences))
+    return courses
+
+
+def _scan(courses: list[RequestedCourse], code: str) -> set[str]:
+    # Sem índice: percorre as equivalências nos dois sentidos até fechar a classe
+    found = {code}
+    pending = [code]
+    while pending:
+        current = pending.pop()
+        for course in courses:
+            for clause in course.equivalences:
+                if len(clause) != 1:
+                    continue
+                if course.code == current and clause[0] not in found:
+                    found.add(clause[0])
+                    pending.append(clause[0])
+                elif clause[0] == current and course.code not in found:
+                    found.add(course.code)
+                    pending.append(course.code)
+    return found
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--courses", type=int, default=3000)
+    arguments.add_argument("--queries", type=int, default=200)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    rng = random.Random(options.seed)
+    courses = _courses(options.courses, rng)
+    codes = [course.code for course in courses]
+    queries = [(rng.choice(codes), set(rng.sample(codes, 40))) for _ in range(options.queries)]
+
+    start = time.perf_counter()
+    index = EquivalenceIndex.build(courses)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = [bool(_scan(courses, code) & completed) for code, completed in queries]
+    slow = time.perf_counter() - start
+    start = time.perf_counter()
+    answers = [index.find(code) in index.canonicalize(completed) for code, completed in queries]
+    fast = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(expected, answers) if a != b)
+    mismatches += sum(1 for code, _ in queries if set(index.members(code)) != _scan(courses, code))
+    print(f"{len(courses)} Disciplinas, {len(index)} classes de equivalência (montagem: {build * 1000:.1f} ms)")
+    print(f"busca nas cláusulas: {slow / len(queries) * 1000:9.3f} ms por consulta")
+    print(f"índice:              {fast / len(queries) * 1000:9.3f} ms por consulta  ganho: {slow / fast:.0f}x")
+    print(f"Equivalência: {mismatches} divergências")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""Roda os extratores da UFBA sobre o corpus de páginas anonimizadas.
+
+Para cada caso confere a saída com ``corpus/expected.json`` e mede páginas/s
+e o pico de memória (tracemalloc) ao extrair uma página. É o pico, não o
+número de alocações: o tracemalloc não conta as que já foram liberadas.
+
+Uso: python -m benchmarks.extractors [--live] [--repeat N] [--update]
+
+Sem ``--live`` só rodam os extratores offline (HTML -> dados) e a checagem de
+que ``get_course_by_code`` não guarda no cache uma busca com falha de parse
+(navegador de mentira, cache temporário). Com ``--live``
+as páginas do corpus são servidas a um Chromium de verdade (interceptando as
+URLs do SIGAA) e os extratores que dependem da página viva também rodam;
+requer ``playwright install chromium``. Os casos ao vivo têm nomes próprios
+(``live.<página>``) no mesmo arquivo, então ``--update`` num modo não apaga
+os esperados do outro. Os extratores do portal, da lista de Turmas e os
+métodos de página do ``UFBAProvider`` trabalham sobre locators do Playwright
+e só são conferidos com ``--live``.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, cast
+from urllib.parse import parse_qs, urlparse
+
+from bs4 import BeautifulSoup
+
+from src.sigaa_cli.providers.ufba.provider import UFBAProvider
+from src.sigaa_cli.providers.ufba.utils.active_courses import get_table as get_active_courses_table, \
+    is_valid_active_course_line, get_active_course, parse_cards, TEACHER_TABLE as TEACHERS, STUDENT_TABLE as STUDENTS
+from src.sigaa_cli.providers.ufba.utils.detail_course import parse_course
+from src.sigaa_cli.providers.ufba.utils.detail_program import extract_detail_program, extract_detail_program_html
+from src.sigaa_cli.providers.ufba.utils.detail_section import _extract_basic_from_row, _extract_course_from_header, \
+    _extract_detail, _extract_ref_id, extract_teachers_and_spots_html
+from src.sigaa_cli.providers.ufba.utils.table_html import extract_cards, extract_cards_html, get_rows
+from src.sigaa_cli.session import Session
+from src.sigaa_cli.utils.cache import Cache, make_key
+from src.sigaa_cli.utils.compiler import attach_cache
+
+CORPUS = Path(__file__).parent / "corpus"
+EXPECTED = CORPUS / "expected.json"
+
+# Caminho da URL -> página do corpus (modo --live)
+ROUTES = {
+    "/sigaa/portais/discente/discente.jsf": "portal",
+    "/sigaa/graduacao/componente/view_painel.jsf": "component",
+    "/sigaa/ensino/turma/busca_turma.jsf": "section_list",
+    "/sigaa/graduacao/turma/view_painel.jsf": "section_detail",
+    "/corpus/participants": "participants",
+    "/corpus/curriculum": "curriculum",
+}
+
+
+class Case(NamedTuple):
+    name: str
+    page: str
+    run: Callable[[Any], Any]
+
+
+def read_page(page: str) -> str:
+    return (CORPUS / (page + ".html")).read_text(encoding="utf-8")
+
+
+def _participants_from_fragments(html: str) -> Any:
+    # Caminho preguiçoso do ActiveSection: outerHTML de cada tabela, parseado depois
+    soup = BeautifulSoup(html, "html.parser")
+    fragments = {name: str(soup.select_one(selector) or '') for name, selector in
+                 (("teachers", TEACHERS), ("students", STUDENTS))}
+    return {name: parse_cards(fragment) for name, fragment in fragments.items()}
+
+
+def offline_cases() -> List[Case]:
+    return [
+        Case("component", "component", lambda html: parse_course("1001", html)),
+        Case("curriculum", "curriculum", extract_detail_program_html),
+        Case("participants", "participants", lambda html: {
+            "teachers": extract_cards_html(html, TEACHERS),
+            "students": extract_cards_html(html, STUDENTS),
+        }),
+        Case("participants.fragments", "participants", _participants_from_fragments),
+        Case("section_detail.participants", "section_detail", extract_teachers_and_spots_html),
+    ]
+
+
+class _SearchPage:
+    # O mínimo de página para get_course_by_code: a busca lista os ids de ``pages``
+    # e cada view_painel.jsf?id=... serve o HTML correspondente
+    def __init__(self, pages: dict[str, str]) -> None:
+        self.pages = pages
+        self.body = ""
+
+    def goto(self, url: str) -> None:
+        self.body = self.pages.get(parse_qs(urlparse(url).query).get("id", [""])[0], "")
+
+    def wait_for_selector(self, selector: str) -> None:
+        pass
+
+    def locator(self, selector: str) -> _SearchLocator:
+        return _SearchLocator(self, selector, 0)
+
+
+class _SearchLocator(NamedTuple):
+    page: _SearchPage
+    selector: str
+    index: int
+
+    def count(self) -> int:
+        return len(self.page.pages) if "td:nth-child(6)" in self.selector else 1
+
+    def nth(self, index: int) -> _SearchLocator:
+        return self._replace(index=index)
+
+    def click(self) -> None:
+        pass
+
+    def fill(self, value: str) -> None:
+        pass
+
+    def get_attribute(self, name: str) -> str:
+        return "{'id' : '" + list(self.page.pages)[self.index] + "'}"
+
+    def inner_html(self) -> str:
+        return self.page.body
+
+
+class _SearchBrowser:
+    def __init__(self, page: _SearchPage) -> None:
+        self._page = page
+
+    @contextmanager
+    def page(self) -> Iterator[_SearchPage]:
+        yield self._page
+
+
+class _IsolatedProvider(UFBAProvider):
+    KEY = UFBAProvider.KEY
+
+    def __init__(self, browser: _SearchBrowser, cache: Cache) -> None:
+        super().__init__(cast(Any, browser), Session(institution=UFBAProvider.KEY))
+        self._cache = cache
+
+    def get_cache(self) -> Cache:
+        return self._cache
+
+
+def check_code_failure() -> int:
+    # Dois ids para o código, um deles com HTML quebrado: a busca tem de falhar
+    # e nada pode ficar em course:code (senão o código passaria por resolvido)
+    pages = {"1001": read_page("component"), "1002": '<div id="container"></div>'}
+    with tempfile.TemporaryDirectory() as folder:
+        cache = Cache(os.path.join(folder, "cache.sqlite3"), compact_interval=None)
+        provider = _IsolatedProvider(_SearchBrowser(_SearchPage(pages)), cache)
+        try:
+            provider.get_course_by_code("MATA01")
+            raised = False
+        except Exception:
+            raised = True
+        finally:
+            provider.release()
+            attach_cache(None)
+        written = cache.get(make_key("course:code", "MATA01")) is not None
+        cache.close()
+    failures = int(not raised) + int(written)
+    print(f"{'offline':8} {'course_by_code.falha':28} {'':>16} {'':>19}  {'ok' if not failures else 'DIVERGENTE'}")
+    return failures
+
+
+class LiveEnv(NamedTuple):
+    provider: UFBAProvider
+    page: Any
+
+
+def _live_portal(env: LiveEnv) -> Any:
+    provider, page = env
+    page.goto("/sigaa/portais/discente/discente.jsf")
+    rows = [row for row in get_rows(get_active_courses_table(page)) if is_valid_active_course_line(row)]
+    return {
+        "name": provider.get_name(),
+        "email": provider.get_email(),
+        "program": provider.get_program(),
+        "registration": provider.get_registration(),
+        "current_term": provider.get_current_term(),
+        "profile_picture_url": provider.get_profile_picture_url(),
+        "active_courses": [get_active_course(row) for row in rows],
+    }
+
+
+def _live_component(env: LiveEnv) -> Any:
+    html = UFBAProvider._fetch_course_html(env.page, "1001")
+    return parse_course("1001", html)
+
+
+def _live_curriculum(env: LiveEnv) -> Any:
+    env.page.goto("/corpus/curriculum")
+    return extract_detail_program(env.page)
+
+
+def _live_participants(env: LiveEnv) -> Any:
+    env.page.goto("/corpus/participants")
+    return {"teachers": extract_cards(env.page.locator(TEACHERS)), "students": extract_cards(env.page.locator(STUDENTS))}
+
+
+def _live_section_list(env: LiveEnv) -> Any:
+    env.page.goto("/sigaa/ensino/turma/busca_turma.jsf")
+    rows = get_rows(env.page.locator('#lista-turmas'))
+    rows = [row for row in rows if 'linhapar' in (row.get_attribute('class') or '').lower()
+            or 'linhaimpar' in (row.get_attribute('class') or '').lower()]
+    return [(_extract_ref_id(row), _extract_course_from_header(row), *_extract_basic_from_row(row)) for row in rows]
+
+
+def _live_section_detail(env: LiveEnv) -> Any:
+    env.page.goto("/sigaa/graduacao/turma/view_painel.jsf?id=5001")
+    return _extract_detail(env.page)
+
+
+def live_cases() -> List[Case]:
+    return [
+        Case("live.portal", "portal", _live_portal),
+        Case("live.component", "component", _live_component),
+        Case("live.curriculum", "curriculum", _live_curriculum),
+        Case("live.participants", "participants", _live_participants),
+        Case("live.section_list", "section_list", _live_section_list),
+        Case("live.section_detail", "section_detail", _live_section_detail),
+    ]
+
+
+def _serve(route: Any) -> None:
+    page = ROUTES.get(urlparse(route.request.url).path)
+    if page is None:
+        route.fulfill(status=404, body="")
+        return
+    route.fulfill(status=200, content_type="text/html; charset=utf-8", body=read_page(page))
+
+
+def _live_env() -> Iterator[LiveEnv]:
+    from src.sigaa_cli.browser import BrowserConfig, SigaaBrowser
+    from src.sigaa_cli.session import Session
+
+    browser = SigaaBrowser(BrowserConfig(base_url=UFBAProvider.HOST))
+    try:
+        browser.route("**/*", _serve)
+        provider = UFBAProvider(browser, Session(institution=UFBAProvider.KEY))
+        with browser.page() as page:
+            yield LiveEnv(provider, page)
+    finally:
+        browser.close()
+
+
+def _normalize(value: Any) -> Any:
+    # NamedTuples/tuplas viram listas, como no JSON esperado
+    return json.loads(json.dumps(value, ensure_ascii=False))
+
+
+def measure(case: Case, target: Any, repeat: int) -> tuple[Any, float, float]:
+    result = case.run(target)
+    tracemalloc.start()
+    case.run(target)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        case.run(target)
+    elapsed = time.perf_counter() - start
+    return _normalize(result), repeat / elapsed, peak / 1024
+
+
+def run(cases: List[Case], target_for: Callable[[Case], Any], mode: str, repeat: int,
+        expected: dict[str, Any], update: bool) -> int:
+    failures = 0
+    for case in cases:
+        result, pages_per_second, peak_kib = measure(case, target_for(case), repeat)
+        if update:
+            expected[case.name] = result
+            status = "atualizado"
+        elif case.name not in expected:
+            status = "sem esperado"
+            failures += 1
+        elif expected[case.name] != result:
+            status = "DIVERGENTE"
+            failures += 1
+        else:
+            status = "ok"
+        print(f"{mode:8} {case.name:28} {pages_per_second:10.1f} pág/s {peak_kib:10.1f} KiB pico  {status}")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arguments = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arguments.add_argument("--live", action="store_true", help="também roda os extratores num navegador")
+    arguments.add_argument("--repeat", type=int, default=50)
+    arguments.add_argument("--update", action="store_true", help="regrava corpus/expected.json com as saídas atuais")
+    options = arguments.parse_args(argv)
+
+    expected: dict[str, Any] = json.loads(EXPECTED.read_text(encoding="utf-8")) if EXPECTED.exists() else {}
+    print(f"{'modo':8} {'caso':28} {'vazão':>16} {'pico de memória':>19}  resultado")
+    failures = run(offline_cases(), lambda case: read_page(case.page), "offline", options.repeat, expected, options.update)
+    failures += check_code_failure()
+    if options.live:
+        for env in _live_env():
+            failures += run(live_cases(), lambda case: env, "live", max(1, options.repeat // 10), expected, options.update)
+
+    if options.update:
+        EXPECTED.write_text(json.dumps(expected, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Mede o índice de pré-requisitos (utils/graph.py) num currículo sintético.
+
+Gera Disciplinas em níveis (cada uma exige Disciplinas de níveis anteriores,
+com alguns ciclos de correquisitos mal cadastrados), confere o fecho
+transitivo com uma busca em largura ingênua e mede montagem, leitura do
+arquivo salvo e consultas.
+
+Uso: python -m benchmarks.graph [--courses N] [--seed N]
+"""
+from __future__ import annotations
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from src.sigaa_cli.models.course import RequestedCourse
+from src.sigaa_cli.utils.graph import DependencyIndex, literal_codes, load_index, save_index
+
+
+def _courses(count: int, rng: random.Random) -> list[RequestedCourse]:
+    codes = ["MAT" + "ABC"[index % 3] + str(index).zfill(4) for index in range(count)]
+    courses = []
+    for index, code in enumerate(codes):
+        level = index * 10 // count
+        earlier = codes[:index] if level else []
+        clauses = [[rng.choice(earlier) for _ in range(rng.randint(1, 3))] for _ in range(rng.randint(0, 2))] if earlier else []
+        if index and rng.random() < 0.01:
+            clauses.append([codes[min(count - 1, index + 1)]])
+        courses.append(RequestedCourse(code=code, name=code, mode="Presencial", id_ref=str(index), location="SALVADOR",
+                                       department="IME", prerequisites=clauses, corequisites=[], equivalences=[]))
+    return courses
+
+
+def _reachable(edges: dict[str, set[str]], code: str) -> list[str]:
+    seen: set[str] = set()
+    pending = list(edges.get(code, ()))
+    while pending:
+        current = pending.pop()
+        if current not in seen:
+            seen.add(current)
+            pending.extend(edges.get(current, ()))
+    seen.discard(code)
+    return sorted(seen)
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--courses", type=int, default=4000)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    courses = _courses(options.courses, random.Random(options.seed))
+    start = time.perf_counter()
+    index = DependencyIndex.build(courses)
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "deps.json")
+        save_index(index, path)
+        start = time.perf_counter()
+        loaded = load_index(path)
+        load = time.perf_counter() - start
+        size = os.path.getsize(path)
+    assert loaded is not None
+
+    edges: dict[str, set[str]] = {}
+    reverse: dict[str, set[str]] = {}
+    for course in courses:
+        for clause in course.prerequisites:
+            for literal in clause:
+                for code in literal_codes(literal):
+                    if code != course.code:
+                        edges.setdefault(course.code, set()).add(code)
+                        reverse.setdefault(code, set()).add(course.code)
+    codes = [course.code for course in courses]
+    mismatches = sum(1 for code in codes if loaded.requires(code) != _reachable(edges, code)
+                     or loaded.unlocks(code) != _reachable(reverse, code))
+
+    start = time.perf_counter()
+    for code in codes:
+        loaded.requires(code)
+        loaded.unlocks(code)
+    query = (time.perf_counter() - start) / (2 * len(codes))
+
+    print(f"{len(codes)} Disciplinas")
+    print(f"montagem:  {build * 1000:8.1f} ms")
+    print(f"leitura:   {load * 1000:8.1f} ms ({size // 1024} KiB)")
+    print(f"consulta:  {query * 1_000_000:8.2f} µs")
+    print(f"Equivalência: {mismatches} divergências")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
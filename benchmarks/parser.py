@@ -0,0 +1,137 @@
+"""Confere e mede o parser iterativo de pré-requisitos (``Parser`` + ``to_nnf``).
+
+Fuzzing: expressões aleatórias (válidas e sequências soltas de tokens) têm de
+dar a mesma árvore, a mesma FNN e o mesmo erro no ``RecursiveParser`` com o
+``to_nnf_recursive`` originais. Expressões aninhadas além do limite de
+recursão do Python têm de compilar.
+
+Vazão: todas as expressões de um catálogo, as das Disciplinas salvas de um
+provedor (``--provider``, remontadas a partir das FNDs) ou um catálogo
+sintético no formato das páginas do SIGAA.
+
+Uso: python -m benchmarks.parser [--provider UFBA] [--catalog N] [--fuzz N]
+"""
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from typing import Callable, List, Optional
+
+from benchmarks.compiler import _expression, _spell
+from src.sigaa_cli.models.course import RequestedCourse
+from src.sigaa_cli.utils.compiler import Node, Parser, RecursiveParser, _compile_uncached, to_nnf, to_nnf_recursive
+from src.sigaa_cli.utils.database import get_database, load_table
+
+TOKENS = ["MATA01", "MATA02", "FISA75", "OU", "E", "NAO", "(", ")", "||", "&&", "!", "and", "or", "not"]
+
+
+def _fuzz_expression(rng: random.Random, depth: int = 0) -> str:
+    if depth >= 6 or rng.random() < 0.3:
+        return rng.choice(["", "", "NAO ", "! "]) + rng.choice(TOKENS[:3])
+    operator = rng.choice([" OU ", " E ", " || ", " && "])
+    items = [_fuzz_expression(rng, depth + 1) for _ in range(rng.randint(1, 4))]
+    return rng.choice(["", "", "NAO "]) + "(" + operator.join(items) + ")"
+
+
+def _outcome(parse: Callable[[str], Node], nnf: Callable[[Node], Node], text: str) -> tuple[str, Optional[Node], Optional[Node]]:
+    try:
+        node = parse(text)
+    except SyntaxError:
+        return "SyntaxError", None, None
+    return "ok", node, nnf(node)
+
+
+def check(samples: int, seed: int) -> int:
+    rng = random.Random(seed)
+    mismatches = 0
+    for index in range(samples):
+        if index % 2:
+            text = _fuzz_expression(rng)
+        else:
+            text = " ".join(rng.choice(TOKENS) for _ in range(rng.randint(0, 8)))
+        expected = _outcome(lambda value: RecursiveParser(value).parse(), to_nnf_recursive, text)
+        found = _outcome(lambda value: Parser(value).parse(), to_nnf, text)
+        if expected != found:
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"divergência: {text!r}")
+    return mismatches
+
+
+def check_deep() -> int:
+    # Aninhamentos que estouram a pilha da versão recursiva
+    depth = sys.getrecursionlimit() * 2
+    cases = {
+        "parênteses": ("(" * depth + "MATA01" + ")" * depth, [("MATA01",)]),
+        "negações": ("NAO " * (depth + 1) + "MATA01", [("¬MATA01",)]),
+        "E/OU alternados": ("MATA01" + "".join(f" {'OU' if i % 2 else 'E'} (X{i}" for i in range(depth)) + ")" * depth, None),
+    }
+    failures = 0
+    for label, (text, expected) in cases.items():
+        try:
+            compiled = _compile_uncached(text)
+        except RecursionError:
+            failures += 1
+            print(f"profundo ({label}): RecursionError")
+            continue
+        ok = expected is None or list(compiled) == expected
+        failures += int(not ok)
+        print(f"profundo ({label}, {depth} níveis): {len(compiled)} cláusulas" + ("" if ok else " divergência"))
+    return failures
+
+
+def _catalog(provider: Optional[str], size: int, seed: int) -> List[str]:
+    if provider:
+        # Cada FND salva vira de novo uma expressão "( A E B ) OU ( C )"
+        with get_database(provider) as db:
+            courses = load_table(db, "courses", RequestedCourse)
+        return [" OU ".join("( " + " E ".join(clause) + " )" for clause in items)
+                for course in courses for items in (course.prerequisites, course.corequisites, course.equivalences)
+                if items]
+    rng = random.Random(seed)
+    return [_spell(rng, _expression(rng)) for _ in range(size)]
+
+
+def _time(run: Callable[[str], object], expressions: List[str]) -> float:
+    start = time.perf_counter()
+    for text in expressions:
+        run(text)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--provider", required=False)
+    arguments.add_argument("--catalog", type=int, default=20000)
+    arguments.add_argument("--fuzz", type=int, default=20000)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    mismatches = check(options.fuzz, options.seed)
+    print(f"Fuzzing: {options.fuzz} expressões, {mismatches} divergências")
+    failures = check_deep()
+
+    expressions = _catalog(options.provider, options.catalog, options.seed)
+    tokens = sum(len(text.split()) for text in expressions)
+    recursive = _time(lambda text: to_nnf_recursive(RecursiveParser(text).parse()), expressions)
+    iterative = _time(lambda text: to_nnf(Parser(text).parse()), expressions)
+    compiled = _time(_compile_uncached, expressions)
+    print(f"{len(expressions)} expressões do catálogo ({tokens} tokens)")
+    print(f"recursivo:  {recursive * 1000:8.1f} ms  {len(expressions) / recursive:10.0f} expressões/s")
+    print(f"iterativo:  {iterative * 1000:8.1f} ms  {len(expressions) / iterative:10.0f} expressões/s"
+          f"  ({recursive / iterative:.2f}x)")
+    print(f"compilação: {compiled * 1000:8.1f} ms  {len(expressions) / compiled:10.0f} expressões/s  (até a FND)")
+
+    # Cadeias longas: o achatamento binário do recursivo recria a lista a cada operando
+    chain = [" OU ".join(f"MATA{index}" for index in range(20000))]
+    recursive = _time(lambda text: RecursiveParser(text).parse(), chain)
+    iterative = _time(lambda text: Parser(text).parse(), chain)
+    print(f"cadeia de 20000 OU: recursivo {recursive * 1000:.1f} ms, iterativo {iterative * 1000:.1f} ms"
+          f"  ({recursive / iterative:.1f}x)")
+    if mismatches or failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Mede o planejador de semestres (utils/planner.py) em Cursos sintéticos.
+
+Gera Cursos com Disciplinas obrigatórias em semestres sugeridos (cada uma
+exige Disciplinas de semestres anteriores, às vezes com alternativas) e
+algumas optativas exigidas por obrigatórias. Confere que cada plano respeita
+os pré-requisitos e o limite por semestre e compara o número de semestres com
+o limite inferior e com a ordem ingênua (semestre sugerido, depois código).
+
+Uso: python -m benchmarks.planner [--programs N] [--courses N] [--max-courses N]
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from benchmarks.eligibility import naive
+from src.sigaa_cli.models.course import AnchoredCourse
+from src.sigaa_cli.utils.planner import Plan, is_mandatory, plan
+
+
+def _program(count: int, rng: random.Random) -> tuple[list[AnchoredCourse], dict[str, list[list[str]]]]:
+    codes = ["MAT" + "ABC"[index % 3] + str(index).zfill(3) for index in range(count)]
+    courses, requisites = [], {}
+    for index, code in enumerate(codes):
+        level = index * 10 // count + 1
+        optional = rng.random() < 0.15
+        courses.append(AnchoredCourse(code=code, name=code, mode="Presencial", id_ref=str(index), program_code="1",
+                                      level=str(level), type="OPTATIVA" if optional else "OBRIGATÓRIA"))
+        earlier = codes[:index * (level - 1) // level]
+        if earlier and rng.random() < 0.8:
+            requisites[code] = [sorted({rng.choice(earlier[-count // 5:]) for _ in range(rng.randint(1, 3))})
+                                for _ in range(rng.randint(1, 2))]
+    return courses, requisites
+
+
+def _naive(courses: list[AnchoredCourse], targets: set[str], requisites: dict[str, list[list[str]]], done: set[str],
+           cap: int) -> int:
+    # Ordem sugerida pelo Curso: o que estiver liberado, do menor semestre sugerido
+    remaining = [course for course in courses if course.code in targets]
+    terms = 0
+    while remaining:
+        available = naive(remaining, lambda code: requisites.get(code, []), done)
+        if not available:
+            break
+        available.sort(key=lambda course: (int(course.level), course.code))
+        done = done | {course.code for course in available[:cap]}
+        remaining = [course for course in remaining if course.code not in done]
+        terms += 1
+    return terms
+
+
+def _violations(result: Plan, requisites: dict[str, list[list[str]]], done: set[str], cap: int) -> int:
+    errors = 0
+    for term in result.terms:
+        errors += int(len(term) > cap)
+        errors += sum(1 for course in term if not naive([course], lambda code: requisites.get(code, []), done))
+        done = done | {course.code for course in term}
+    return errors
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--programs", type=int, default=200)
+    arguments.add_argument("--courses", type=int, default=60)
+    arguments.add_argument("--max-courses", type=int, default=6)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    rng = random.Random(options.seed)
+    violations = planned = baseline = bound = 0
+    elapsed = 0.0
+    for _ in range(options.programs):
+        courses, table = _program(options.courses, rng)
+        codes = [course.code for course in courses]
+        done = set(rng.sample(codes[:len(codes) // 3], rng.randint(0, len(codes) // 4)))
+
+        def requisites(code: str) -> list[list[str]]:
+            return table.get(code, [])
+
+        start = time.perf_counter()
+        result = plan(courses, done, requisites, options.max_courses)
+        elapsed += time.perf_counter() - start
+
+        violations += _violations(result, table, done, options.max_courses)
+        scheduled = {course.code for term in result.terms for course in term}
+        violations += sum(1 for course in courses if is_mandatory(course) and course.code not in done
+                          and course.code not in scheduled and course.code not in result.blocked)
+        planned += len(result.terms)
+        bound += result.lower_bound
+        baseline += _naive(courses, scheduled, table, set(done), options.max_courses)
+
+    print(f"{options.programs} Cursos de {options.courses} Disciplinas, até {options.max_courses} por semestre")
+    print(f"planejamento:     {elapsed / options.programs * 1000:8.1f} ms por Curso")
+    print(f"semestres (soma): planejador {planned}, ordem sugerida {baseline}, limite inferior {bound}")
+    print(f"Validação: {violations} violações")
+    if violations:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compara os predicados compilados (``Predicates``) com a varredura das listas da FND.
+
+Compila expressões no formato das páginas do SIGAA (algumas com limite de
+cláusulas baixo, para gerar literais de fórmula) e testa cada uma contra
+vários históricos: percorrendo as listas aninhadas a cada teste, como hoje, e
+com o predicado gerado sobre a máscara do histórico. Confere que as respostas
+são iguais, inclusive para fórmulas fundas demais para virar código Python.
+
+Uso: python -m benchmarks.predicates [--expressions N] [--students N]
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+
+from benchmarks.compiler import _expression, _spell
+from benchmarks.eligibility import _holds
+from src.sigaa_cli.utils.compiler import Codes, Node, Parser, Predicates, compile_predicate, fnd_array, is_formula, to_nnf
+
+# Fórmulas já analisadas: a varredura paga só o percurso, não o parse
+_formulas: dict[str, Node] = {}
+
+
+def naive(clauses: list[list[str]], done: set[str]) -> bool:
+    def literal(value: str) -> bool:
+        if is_formula(value):
+            if value not in _formulas:
+                _formulas[value] = to_nnf(Parser(value).parse())
+            return _holds(_formulas[value], done)
+        if value.startswith("¬"):
+            return value[1:] not in done
+        return value in done
+    return not clauses or any(all(literal(value) for value in clause) for clause in clauses)
+
+
+def check_deep() -> int:
+    # Fórmula com mais parênteses aninhados do que o compilador do Python aceita
+    depth = 400
+    text = "( " + "".join(f"MATA{i} {'OU' if i % 2 else 'E'} ( " for i in range(depth)) + "MATB01" + " )" * (depth + 1)
+    clauses = [[text]]
+    predicate = compile_predicate(clauses, codes := Codes())
+    rng = random.Random(1)
+    universe = [f"MATA{i}" for i in range(depth)] + ["MATB01"]
+    failures = 0
+    for _ in range(200):
+        done = set(rng.sample(universe, rng.randint(0, len(universe))))
+        failures += int(predicate(codes.mask(done)) != naive(clauses, done))
+    return failures
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--expressions", type=int, default=500)
+    arguments.add_argument("--students", type=int, default=200)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    rng = random.Random(options.seed)
+    table = {}
+    for index in range(options.expressions):
+        # Um quinto com limite baixo: a FND vira um literal de fórmula
+        max_clauses = 2 if index % 5 == 0 else 4096
+        table["MATX" + str(index).zfill(3)] = fnd_array(_spell(rng, _expression(rng)), max_clauses)
+    universe = sorted({code for clauses in table.values() for clause in clauses for literal in clause
+                       for code in ([literal] if not is_formula(literal) else []) if not code.startswith("¬")} |
+                      {"MAT" + letter + str(number).zfill(2) for letter in "ABC" for number in range(1, 61)})
+    students = [set(rng.sample(universe, rng.randint(0, len(universe)))) for _ in range(options.students)]
+
+    predicates = Predicates(lambda code: table[code])
+    start = time.perf_counter()
+    for code in table:
+        predicates(code)
+    build = time.perf_counter() - start
+
+    checks = len(table) * len(students)
+    start = time.perf_counter()
+    expected = [[naive(clauses, done) for clauses in table.values()] for done in students]
+    slow = time.perf_counter() - start
+
+    masks = [predicates.mask(done) for done in students]
+    compiled = [predicates(code) for code in table]
+    start = time.perf_counter()
+    found = [[predicate(mask) for predicate in compiled] for mask in masks]
+    fast = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(expected, found) for x, y in zip(a, b) if x != y) + check_deep()
+    print(f"{len(table)} Disciplinas x {len(students)} históricos (compilação: {build * 1000:.1f} ms)")
+    print(f"listas da FND:  {slow / checks * 1e9:9.0f} ns por teste")
+    print(f"predicado:      {fast / checks * 1e9:9.0f} ns por teste  ganho: {slow / fast:.1f}x")
+    print(f"Equivalência: {mismatches} divergências")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compara Parser.remove_tags_html (passada única) com a versão em várias passadas.
+
+Uso: python -m benchmarks.remove_tags_html [--fuzz N] [--rows N]
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from src.sigaa_cli.parser import Parser
+
+ATOMS = [
+    "<span>", "</span>", "<span class=\"nome\">", "<SPAN >", "<spanx>", "<em>", "</em>",
+    "<b>", "</B>", "<i>", "<i\tclass='x'>", "<strong>", "</strong>", "<br>", "<br/>",
+    "<br\n/>", "</p>", "<p>", "</li>", "<li>", "<td>", "</td>", "<a href=\"#\">", "</a>",
+    "<", ">", "<>", "&amp;", "&nbsp;", "&lt;b&gt;", "&#225;", "&am", "p;", "&",
+    " ", "\n", "\t", "\xa0", "MATA37", "Fulano", "İ", "ſ",
+]
+
+
+def _fuzz(rng: random.Random) -> str:
+    return "".join(rng.choice(ATOMS) for _ in range(rng.randint(0, 16)))
+
+
+def _large_page(rows: int) -> str:
+    row = (
+        "<tr class=\"linhaPar\">\n\t<td><span class=\"nome\">FULANO DE TAL</span><br/>"
+        "<em>Departamento</em> de Ci&ecirc;ncia da Computa&ccedil;&atilde;o</td>\n"
+        "\t<td><b>MATA37</b> - INTRODU&Ccedil;&Atilde;O &Agrave; L&Oacute;GICA</td>\n"
+        "\t<td><a href=\"/sigaa/turma?id=1\">Turma 01</a></td>\n</tr>\n"
+    )
+    return "<table><tbody>\n" + row * rows + "</tbody></table>"
+
+
+def _cells(rows: int) -> List[str]:
+    page = _large_page(rows)
+    return [cell.split("</td>")[0] for cell in page.split("<td>")[1:]]
+
+
+def check(parser: Parser, samples: int, seed: int) -> int:
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(samples):
+        text = _fuzz(rng)
+        if parser.remove_tags_html(text) != parser.remove_tags_html_multipass(text):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"divergência: {text!r}")
+    return mismatches
+
+
+def _throughput(extract: Callable[[str], str], pages: List[str], repeat: int) -> float:
+    size = sum(len(page) for page in pages) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            extract(page)
+    return size / (time.perf_counter() - start) / 1024 / 1024
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--fuzz", type=int, default=50000)
+    arguments.add_argument("--rows", type=int, default=2000)
+    arguments.add_argument("--repeat", type=int, default=5)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    parser = Parser()
+    mismatches = check(parser, options.fuzz, options.seed)
+    print(f"Equivalência: {options.fuzz} entradas, {mismatches} divergências")
+
+    pages = [_large_page(options.rows), _large_page(options.rows // 10)]
+    before = _throughput(parser.remove_tags_html_multipass, pages, options.repeat)
+    after = _throughput(parser.remove_tags_html, pages, options.repeat)
+    print(f"várias passadas: {before:8.2f} MB/s")
+    print(f"passada única:   {after:8.2f} MB/s")
+    print(f"Ganho:           {after / before:8.1f}x")
+
+    cells = _cells(options.rows)
+    before = _throughput(parser.remove_tags_html_multipass, cells, options.repeat)
+    after = _throughput(parser.remove_tags_html, cells, options.repeat)
+    print(f"Por célula ({len(cells)} células):")
+    print(f"várias passadas: {before:8.2f} MB/s")
+    print(f"passada única:   {after:8.2f} MB/s")
+    print(f"Ganho:           {after / before:8.1f}x")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Compara strip_html com strip_html_bs4 em células típicas de páginas do SIGAA.
+
+Uso: python -m benchmarks.strip_html [--pages N] [--fuzz N]
+"""
+from __future__ import annotations
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from src.sigaa_cli.utils.parser import strip_html, strip_html_bs4
+
+# Células no formato em que os extratores as recebem (inner_html de th/td)
+CELLS = [
+    "MATA37 - INTRODUÇÃO À LÓGICA DE PROGRAMAÇÃO",
+    "<b>Carga Horária Total:</b> 68h",
+    '<span class="tipo">OBRIGATÓRIA</span>',
+    "\n\t\t\t\t<a href=\"#\" onclick=\"jsfcljs(document.forms['form'],'form:j_id_jsp_1','');return false;\">"
+    "MATA02 - C&Aacute;LCULO A</a>\n\t\t\t",
+    "( ( MATA01 ) E ( MATA02 ) ) OU ( MATA03 )",
+    "<i>Docente(s):</i><br/>FULANO DE TAL (60h)<br>CICLANO&nbsp;DA SILVA (8h)",
+    "<td>35 | 40</td>",
+    '<div id="resumo"><h3>Turma 01</h3><p>Local: PAF I &amp; PAF III</p><!-- comentário --></div>',
+    '<script type="text/javascript">var x = "<b>oculto</b>";</script>Período: 2024.1',
+    "<em>Ementa:</em> Conceitos b&#225;sicos &lt;algoritmos&gt; e estruturas.",
+]
+
+# Uma página de estrutura curricular tem algumas centenas de células
+CELLS_PER_PAGE = 400
+
+
+def _page(rng: random.Random) -> List[str]:
+    return [rng.choice(CELLS) for _ in range(CELLS_PER_PAGE)]
+
+
+def _fuzz_cell(rng: random.Random) -> str:
+    atoms = [
+        "<b>", "</b>", "<br>", "<br/>", "</br>", "<span class='x'>", "</span>",
+        "<script>", "</script>", "<style>", "</style>", "<!-- c -->", "<![CDATA[x]]>",
+        "&amp;", "&nbsp;", "&lt;", "&#225;", "&#x41;", "&foo;", "&", "<", ">",
+        " ", "\n", "\t", "texto", "MATA01", "Á",
+        # Referências raras: controles C1 (cp1252), fora do Unicode, sem ";", hex maiúsculo
+        "&#0;", "&#128;", "&#x81;", "&#x9F;", "&#150", "&#55296;", "&#1114112;", "&#x1F600;", "&#X41;",
+        "&#65abc", "&#xZZ;", "&#;", "&eacute", "&AElig;", "&notin;", "&amp", "&NotNestedGreaterGreater;",
+    ]
+    return "".join(rng.choice(atoms) for _ in range(rng.randint(0, 12)))
+
+
+def check(samples: int, seed: int) -> int:
+    rng = random.Random(seed)
+    mismatches = 0
+    # Todas as referências numéricas dos controles e das bordas do Unicode
+    numeric = [f"&#{code};" for code in [*range(0, 0x100), *range(0xD7FF, 0xE001), *range(0xFDCF, 0xFDF1),
+                                          0xFFFE, 0xFFFF, 0x10FFFF, 0x110000]]
+    for cell in CELLS + numeric + [_fuzz_cell(rng) for _ in range(samples)]:
+        if strip_html(cell) != strip_html_bs4(cell):
+            mismatches += 1
+            if mismatches <= 5:
+                print(f"divergência: {cell!r}")
+    return mismatches
+
+
+def _time_page(extract: Callable[[str], str], pages: List[List[str]]) -> float:
+    start = time.perf_counter()
+    for page in pages:
+        for cell in page:
+            extract(cell)
+    return (time.perf_counter() - start) / len(pages)
+
+
+def main() -> None:
+    arguments = argparse.ArgumentParser(description=__doc__)
+    arguments.add_argument("--pages", type=int, default=20)
+    arguments.add_argument("--fuzz", type=int, default=20000)
+    arguments.add_argument("--seed", type=int, default=0)
+    options = arguments.parse_args()
+
+    mismatches = check(options.fuzz, options.seed)
+    print(f"Equivalência: {options.fuzz + len(CELLS)} entradas, {mismatches} divergências")
+
+    rng = random.Random(options.seed)
+    pages = [_page(rng) for _ in range(options.pages)]
+    before = _time_page(strip_html_bs4, pages)
+    after = _time_page(strip_html, pages)
+    print(f"strip_html_bs4: {before * 1000:8.2f} ms/página")
+    print(f"strip_html:     {after * 1000:8.2f} ms/página")
+    print(f"Ganho:          {before / after:8.1f}x")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, TextIO
 import rich_click as click
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich import box
 from .sigaa import Sigaa
+from .utils.text import format_size, parse_size
+
+if TYPE_CHECKING:
+    from .utils.csr import CurriculumGraph
 
 
 @click.group()
@@ -31,11 +35,13 @@ def programs(provider: Optional[str] = None, user: Optional[str] = None, passwor
 @click.option("--user", required=False)
 @click.option("--password", required=False)
 @click.option("--no-cache", is_flag=True)
-def courses(provider: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None, no_cache: bool = False) -> None:
+@click.option("--workers", type=int, required=False, help="Processos para o parse das páginas (padrão: núcleos - 1)")
+def courses(provider: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None, no_cache: bool = False,
+            workers: Optional[int] = None) -> None:
     sigaa = Sigaa(institution=provider)
     try:
         sigaa.login(user, password)
-        sigaa.get_courses(no_cache=no_cache)
+        sigaa.get_courses(no_cache=no_cache, workers=workers)
     finally:
         sigaa.close()
 
@@ -89,11 +95,13 @@ def get_account(provider: Optional[str] = None, user: Optional[str] = None, pass
 @click.option("--provider", required=False)
 @click.option("--user", required=False)
 @click.option("--password", required=False)
-def orphan_courses(provider: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None) -> None:
+@click.option("--workers", default=4, show_default=True, type=click.IntRange(min=1), help="Navegadores buscando em paralelo")
+def orphan_courses(provider: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None,
+                   workers: int = 4) -> None:
     sigaa = Sigaa(institution=provider)
     try:
         sigaa.login(user, password)
-        sigaa.get_orphan_courses()
+        sigaa.get_orphan_courses(workers=workers)
     finally:
         sigaa.close()
 
@@ -101,11 +109,13 @@ def orphan_courses(provider: Optional[str] = None, user: Optional[str] = None, p
 @click.option("--provider", required=False)
 @click.option("--user", required=False)
 @click.option("--password", required=False)
-def active_courses(provider: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None) -> None:
+@click.option("--no-participants", is_flag=True, default=False, help="Não coleta docentes e discentes de cada turma")
+def active_courses(provider: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None,
+                   no_participants: bool = False) -> None:
     sigaa = Sigaa(institution=provider)
     try:
         sigaa.login(user, password)
-        courses = sigaa.get_active_sections()
+        courses = sigaa.get_active_sections(participants=not no_participants)
 
         console = Console()
         table = Table(
@@ -130,6 +140,253 @@ def active_courses(provider: Optional[str] = None, user: Optional[str] = None, p
     finally:
         sigaa.close()
 
+@cli.command("deps", help="Pré-requisitos de uma Disciplina (ou o que ela libera), a partir das Disciplinas salvas")
+@click.argument("code")
+@click.option("--provider", required=False)
+@click.option("--unlocks", is_flag=True, help="Mostra as Disciplinas que dependem desta")
+@click.option("--direct", is_flag=True, help="Só as dependências diretas")
+@click.option("--rebuild", is_flag=True, help="Reconstrói o índice a partir do banco")
+def deps(code: str, provider: Optional[str] = None, unlocks: bool = False, direct: bool = False, rebuild: bool = False) -> None:
+    sigaa = Sigaa(institution=provider)
+    try:
+        index = sigaa.get_dependency_index(rebuild=rebuild)
+        code = code.strip().upper()
+        if code not in index:
+            raise click.ClickException(f"Disciplina {code} não aparece nas Disciplinas salvas.")
+        console = Console()
+        clauses = index.clauses(code)
+        if clauses:
+            expression = " OU ".join("(" + " E ".join(clause) + ")" for clause in clauses)
+            console.print(f"[bold cyan]Pré-requisitos de {code}:[/bold cyan] {expression}")
+        found = index.unlocks(code, not direct) if unlocks else index.requires(code, not direct)
+        label = "libera" if unlocks else "exige"
+        scope = "diretamente" if direct else "transitivamente"
+        console.print(f"[bold cyan]{code} {label} {scope} ({len(found)}):[/bold cyan] " + (", ".join(found) or "-"))
+        equivalents = [member for member in sigaa.get_equivalence_index(rebuild=rebuild).members(code) if member != code]
+        if equivalents:
+            console.print("[bold cyan]Equivalentes:[/bold cyan] " + ", ".join(equivalents))
+    finally:
+        sigaa.close()
+
+
+@cli.command("plan", help="Semestres para concluir as Disciplinas obrigatórias de um Curso, a partir das Disciplinas salvas")
+@click.argument("program")
+@click.option("--provider", required=False)
+@click.option("--completed", default="", help="Disciplinas já cursadas, separadas por vírgula")
+@click.option("--file", "completed_file", type=click.File("r", encoding="utf-8"), required=False,
+              help="Arquivo com uma Disciplina cursada por linha")
+@click.option("--max-courses", default=6, show_default=True, type=click.IntRange(min=1), help="Disciplinas por semestre")
+def plan(program: str, provider: Optional[str] = None, completed: str = "", completed_file: Optional[TextIO] = None,
+         max_courses: int = 6) -> None:
+    sigaa = Sigaa(institution=provider)
+    try:
+        detailed = sigaa.get_saved_program(program.strip())
+        if detailed is None:
+            raise click.ClickException(f"Curso {program} não aparece nos Cursos salvos (rode `sigaa-cli programs`).")
+        codes = {code.strip().upper() for code in completed.split(",") if code.strip()}
+        if completed_file is not None:
+            codes |= {line.strip().upper() for line in completed_file if line.strip()}
+        result = sigaa.get_plan(detailed, codes, max_courses)
+        console = Console()
+
+        table = Table(
+            show_header=True,
+            header_style="bold cyan",
+            box=box.SIMPLE_HEAVY,
+            title=f"{detailed.title} ({detailed.code})",
+            title_style="bold magenta",
+        )
+        table.add_column("Semestre", justify="right", style="bold")
+        table.add_column("Disciplinas")
+        for number, term in enumerate(result.terms, start=1):
+            table.add_row(str(number), "\n".join(f"{course.code} - {course.name}" for course in term))
+        console.print(table)
+        console.print(f"[bold cyan]Semestres:[/bold cyan] {len(result.terms)} (mínimo possível: {result.lower_bound})")
+        if result.extra:
+            console.print("[bold cyan]Fora das obrigatórias, exigidas por elas:[/bold cyan] " + ", ".join(result.extra))
+        for code, missing in result.blocked.items():
+            console.print(f"[bold red]{code} sem plano:[/bold red] depende de " + ", ".join(missing))
+    finally:
+        sigaa.close()
+
+
+@cli.group("graph", help="Grafo de pré-requisitos de todos os Cursos em CSR (requer numpy)")
+def graph() -> None:
+    pass
+
+
+def _curriculum_graph(sigaa: Sigaa, rebuild: bool) -> "CurriculumGraph":
+    try:
+        return sigaa.get_curriculum_graph(rebuild=rebuild)
+    except ImportError as e:
+        raise click.ClickException("O grafo em CSR precisa do numpy: pip install 'sigaa-cli[graph]'") from e
+
+
+@graph.command("export", help="Salva o grafo (indptr/indices + tabela de códigos) num arquivo .npz")
+@click.option("--provider", required=False)
+@click.option("--output", type=click.Path(dir_okay=False, writable=True), required=False,
+              help="Arquivo de saída (padrão: $SIGAA_CLI_DATA_PATH/data/<provedor>.graph.npz)")
+@click.option("--rebuild", is_flag=True, help="Reconstrói a partir do banco")
+def graph_export(provider: Optional[str] = None, output: Optional[str] = None, rebuild: bool = False) -> None:
+    sigaa = Sigaa(institution=provider)
+    try:
+        curriculum = _curriculum_graph(sigaa, rebuild)
+        if output is not None:
+            from .utils.csr import save_graph
+            save_graph(curriculum, output)
+        Console().print(f"[bold cyan]{len(curriculum.codes)} Disciplinas, {len(curriculum.indices)} pré-requisitos, "
+                        f"{len(curriculum.programs)} Cursos[/bold cyan]")
+    finally:
+        sigaa.close()
+
+
+@graph.command("analyze", help="Maior cadeia de pré-requisitos por Curso e Disciplinas que mais bloqueiam")
+@click.option("--provider", required=False)
+@click.option("--program", required=False, help="Só este Curso (código)")
+@click.option("--top", default=15, show_default=True, type=click.IntRange(min=1), help="Disciplinas que mais bloqueiam")
+@click.option("--rebuild", is_flag=True, help="Reconstrói a partir do banco")
+def graph_analyze(provider: Optional[str] = None, program: Optional[str] = None, top: int = 15, rebuild: bool = False) -> None:
+    sigaa = Sigaa(institution=provider)
+    try:
+        curriculum = _curriculum_graph(sigaa, rebuild)
+        from .utils.csr import blocking, longest_chains, select_programs
+        if program is not None:
+            curriculum = select_programs(curriculum, [program.strip()])
+            if not curriculum.programs:
+                raise click.ClickException(f"Curso {program} não aparece nos Cursos salvos.")
+        console = Console()
+
+        table = Table(
+            show_header=True,
+            header_style="bold cyan",
+            box=box.SIMPLE_HEAVY,
+            title="Maior Cadeia de Pré-requisitos",
+            title_style="bold magenta",
+        )
+        table.add_column("Curso", style="bold", no_wrap=True)
+        table.add_column("Semestres", justify="right")
+        table.add_column("Em ciclo", justify="right")
+        table.add_column("Cadeia")
+        for chain in sorted(longest_chains(curriculum), key=lambda chain: (-chain.length, chain.program)):
+            table.add_row(chain.program, str(chain.length), str(chain.cyclic), " → ".join(chain.path) or "-")
+        console.print(table)
+
+        table = Table(
+            show_header=True,
+            header_style="bold cyan",
+            box=box.SIMPLE_HEAVY,
+            title="Disciplinas que Mais Bloqueiam",
+            title_style="bold magenta",
+        )
+        table.add_column("Disciplina", style="bold", no_wrap=True)
+        table.add_column("Dependentes", justify="right")
+        for code, count in sorted(blocking(curriculum).items(), key=lambda item: (-item[1], item[0]))[:top]:
+            table.add_row(code, str(count))
+        console.print(table)
+    finally:
+        sigaa.close()
+
+
+@cli.group("cache", help="Inspeciona e limpa o cache local")
+def cache() -> None:
+    pass
+
+
+@cache.command("stats", help="Acertos, falhas, remoções, tamanho e idade das entradas do cache")
+@click.option("--provider", required=False)
+def cache_stats(provider: Optional[str] = None) -> None:
+    sigaa = Sigaa(institution=provider)
+    try:
+        store = sigaa.get_cache()
+        console = Console()
+
+        table = Table(
+            show_header=True,
+            header_style="bold cyan",
+            box=box.SIMPLE_HEAVY,
+            title="Cache por Família",
+            title_style="bold magenta",
+        )
+        table.add_column("Family", style="bold", no_wrap=True)
+        table.add_column("Entries", justify="right")
+        table.add_column("Size", justify="right")
+        table.add_column("Hits", justify="right")
+        table.add_column("Misses", justify="right")
+        table.add_column("Hit Rate", justify="right")
+        table.add_column("Evictions", justify="right")
+        for row in store.stats():
+            lookups = row.hits + row.misses
+            hit_rate = f"{100 * row.hits / lookups:.1f}%" if lookups else "-"
+            table.add_row(row.family + ":*", str(row.entries), format_size(row.size), str(row.hits),
+                          str(row.misses), hit_rate, str(row.evictions))
+        console.print(table)
+
+        ages = Table(show_header=True, header_style="bold cyan", box=box.SIMPLE_HEAVY, title="Idade das Entradas", title_style="bold magenta")
+        ages.add_column("Age", style="bold", no_wrap=True)
+        ages.add_column("Entries", justify="right")
+        for label, count in store.age_distribution():
+            ages.add_row(label, str(count))
+        console.print(ages)
+
+        console.print(f"Arquivo: {store.path} ({format_size(store.disk_size())} em disco)")
+    finally:
+        sigaa.close()
+
+
+@cache.command("prune", help="Remove entradas expiradas e/ou reduz o cache a um tamanho máximo")
+@click.option("--provider", required=False)
+@click.option("--expired", is_flag=True, help="Remove entradas com TTL vencido")
+@click.option("--max-size", required=False, help="Tamanho máximo (ex.: 50MB); remove as menos acessadas")
+def cache_prune(provider: Optional[str] = None, expired: bool = False, max_size: Optional[str] = None) -> None:
+    if not expired and max_size is None:
+        raise click.UsageError("Informe --expired e/ou --max-size.")
+    try:
+        limit = parse_size(max_size) if max_size is not None else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--max-size")
+    sigaa = Sigaa(institution=provider)
+    try:
+        store = sigaa.get_cache()
+        if expired:
+            print("Entradas expiradas removidas: " + str(store.evict_expired()))
+        if limit is not None:
+            print("Entradas removidas por tamanho: " + str(store.trim(limit)))
+    finally:
+        sigaa.close()
+
+
+@cache.command("clear", help="Apaga entradas do cache (todas, ou só as de um prefixo)")
+@click.option("--provider", required=False)
+@click.option("--prefix", default="", help="Prefixo das chaves (ex.: course:code:)")
+def cache_clear(provider: Optional[str] = None, prefix: str = "") -> None:
+    sigaa = Sigaa(institution=provider)
+    try:
+        print("Entradas removidas: " + str(sigaa.get_cache().clear(prefix)))
+    finally:
+        sigaa.close()
+
+
+@cache.command("warm", help="Preenche o cache de busca por código de Disciplinas, em paralelo")
+@click.option("--provider", required=False)
+@click.option("--user", required=False)
+@click.option("--password", required=False)
+@click.option("--file", "codes_file", type=click.File("r", encoding="utf-8"), required=False,
+              help="Arquivo com um código por linha (padrão: pré-requisitos das Disciplinas salvas)")
+@click.option("--workers", default=4, show_default=True, type=click.IntRange(min=1))
+def cache_warm(provider: Optional[str] = None, user: Optional[str] = None, password: Optional[str] = None,
+               codes_file: Optional[TextIO] = None, workers: int = 4) -> None:
+    sigaa = Sigaa(institution=provider)
+    try:
+        if codes_file is not None:
+            codes = {line.strip() for line in codes_file if line.strip()}
+        else:
+            codes = sigaa.get_referenced_codes()
+        sigaa.login(user, password)
+        sigaa.warm_courses(codes, workers=workers)
+    finally:
+        sigaa.close()
+
+
 def main() -> None:
     cli(prog_name="sigaa-cli")
 
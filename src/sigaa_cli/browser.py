@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Iterator, List, Optional, Literal
+from typing import Any, Callable, Iterator, List, Optional, Literal
 from urllib.parse import urljoin
 
 from playwright.sync_api import (
@@ -13,6 +13,7 @@ from playwright.sync_api import (
     Locator as PWLocator,
     Page,
     Playwright,
+    Route,
     TimeoutError as PWTimeoutError,
     sync_playwright,
 )
@@ -118,6 +119,10 @@ class NodeAdapter:
         except PWTimeoutError:
             return None
 
+    def evaluate(self, expression: str, arg: Any = None) -> Any:
+        # O elemento é passado como primeiro argumento da função
+        return self._loc.evaluate(expression, arg)
+
     def locator(self, selector: str) -> "Locator":
         return Locator(self._loc.locator(selector), self._page)
 
@@ -193,6 +198,9 @@ class HtmlPage:
     def content(self) -> str:
         return self._page.content()
 
+    def evaluate(self, expression: str, arg: Any = None) -> Any:
+        return self._page.evaluate(expression, arg)
+
     def locator(self, selector: str) -> Locator:
         return Locator(self._page.locator(selector), self)
 
@@ -217,6 +225,12 @@ class SigaaBrowser:
         page = self._context.new_page()
         return HtmlPage(page, self._config.base_url)
 
+    def route(self, url: str, handler: Callable[[Route], Any]) -> None:
+        # Intercepta requisições do contexto (ex.: servir páginas salvas offline)
+        self.ensure_started()
+        assert self._context is not None
+        self._context.route(url, handler)
+
     @property
     def request(self) -> RequestClient:
         self.ensure_started()
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from pydantic import BaseModel
+from typing import Callable, Optional
+from pydantic import BaseModel, PrivateAttr, computed_field
 from src.sigaa_cli.models.course import Course
 from src.sigaa_cli.models.entities import ActiveTeacher, ActiveStudent
 from src.sigaa_cli.models.program import Program
@@ -29,11 +30,36 @@ class DetailedSection(Section):
     spots_reserved: list[Spot]
 
 
+Participants = tuple[list[ActiveTeacher], list[ActiveStudent]]
+
+
 class ActiveSection(BaseSection):
     location_table: str
     term: str
     class_code: str
-    teachers: list[ActiveTeacher]
-    students: list[ActiveStudent]
     total_classes: int
     number_classes: int
+    # Participantes só viram modelos no primeiro acesso a teachers/students
+    _participants: Optional[Participants] = PrivateAttr(default=None)
+    _load_participants: Optional[Callable[[], Participants]] = PrivateAttr(default=None)
+
+    def with_participants(self, load: Callable[[], Participants]) -> "ActiveSection":
+        self._participants = None
+        self._load_participants = load
+        return self
+
+    def get_participants(self) -> Participants:
+        if self._participants is None:
+            load, self._load_participants = self._load_participants, None
+            self._participants = load() if load is not None else ([], [])
+        return self._participants
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def teachers(self) -> list[ActiveTeacher]:
+        return self.get_participants()[0]
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def students(self) -> list[ActiveStudent]:
+        return self.get_participants()[1]
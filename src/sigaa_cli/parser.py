@@ -4,11 +4,35 @@ import html
 import re
 from typing import Final
 
+# Tag "bem formada": sem '<' ou '>' internos. Quando todo '<' e '>' do texto
+# pertence a uma delas, as substituições em várias passadas equivalem a trocar
+# cada tag uma única vez: as inline por "" e as demais por " ".
+_TAG_RE: Final = re.compile(r"<[^<>]+>")
+_INLINE_TAG_RE: Final = re.compile(r"</?(?:span|em|b|i|strong)(?: [^<>]+)?>", re.IGNORECASE)
+
 
 class Parser:
     _remove_tags: Final[tuple[str, ...]] = ("span", "em", "b", "i", "strong")
 
     def remove_tags_html(self, text: str | None) -> str:
+        if not text:
+            return ""
+        try:
+            new_text = text
+            if "<" in new_text or ">" in new_text:
+                tags = _TAG_RE.subn("", new_text)[1]
+                if tags != new_text.count("<") or tags != new_text.count(">"):
+                    return self.remove_tags_html_multipass(text)
+                new_text = _TAG_RE.sub(" ", _INLINE_TAG_RE.sub("", new_text))
+            if "&" in new_text:
+                new_text = html.unescape(new_text)
+            # Quebras de linha (<br>, </p>, </li>) também viram espaço aqui
+            return " ".join(new_text.split())
+        except Exception:
+            return ""
+
+    def remove_tags_html_multipass(self, text: str | None) -> str:
+        # Implementação de referência, usada quando há '<' ou '>' soltos
         if not text:
             return ""
         try:
@@ -31,4 +55,3 @@ class Parser:
             return new_text
         except Exception:
             return ""
-
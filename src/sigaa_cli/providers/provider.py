@@ -1,13 +1,22 @@
+import hashlib
 from abc import ABC, abstractmethod
-from shelve import Shelf
-from typing import ClassVar, Optional, List, Any
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import ClassVar, Iterable, Iterator, Optional, List, Any
 from src.sigaa_cli.browser import SigaaBrowser
 from src.sigaa_cli.models.course import RequestedCourse
 from src.sigaa_cli.models.program import DetailedProgram
 from tinydb import TinyDB
 from src.sigaa_cli.models.section import ActiveSection, DetailedSection
 from src.sigaa_cli.session import Session
-from src.sigaa_cli.utils.cache import get_cache
+from src.sigaa_cli.utils.cache import Cache, RefreshQueue, get_cache
+from src.sigaa_cli.utils.compiler import attach_cache
+from src.sigaa_cli.utils.memo import ParseMemo
+
+PARSE_THREADS = 2
+# Revalidações feitas ao encerrar; as demais entradas continuam velhas no
+# cache e voltam para a fila na próxima leitura
+REFRESH_ON_CLOSE = 5
 
 
 class Provider(ABC):
@@ -24,6 +33,9 @@ class Provider(ABC):
     def __init__(self, browser: SigaaBrowser, session: Session) -> None:
         self._browser = browser
         self._session = session
+        self._refresh_queue = RefreshQueue()
+        self._bypass_cache = False
+        self._parse_executor: Optional[ThreadPoolExecutor] = None
 
     @abstractmethod
     def login(self, username: str, password: str) -> None:
@@ -61,19 +73,76 @@ class Provider(ABC):
         ...
 
     @abstractmethod
-    def get_active_courses(self) -> List[ActiveSection]:
+    def get_active_courses(self, participants: bool = True) -> List[ActiveSection]:
         ...
 
     def get_host(self) -> str:
         return self.HOST
 
-    def get_cache(self) -> Shelf[Any]:
+    def get_cache(self) -> Cache:
         return get_cache(self.KEY)
 
+    def get_cache_scope(self) -> str:
+        # Identifica a conta nas chaves do cache sem gravar o login em claro
+        account = self._session.account
+        return hashlib.sha256(account.encode()).hexdigest()[:16] if account else "anonimo"
+
+    def get_parse_memo(self) -> ParseMemo:
+        return ParseMemo(self.get_cache())
+
+    def get_parse_executor(self) -> Executor:
+        # Threads para interpretar páginas enquanto o navegador segue para a próxima
+        if self._parse_executor is None:
+            self._parse_executor = ThreadPoolExecutor(max_workers=PARSE_THREADS, thread_name_prefix="sigaa-parse")
+        return self._parse_executor
+
+    def get_refresh_queue(self) -> RefreshQueue:
+        return self._refresh_queue
+
+    def is_cache_bypassed(self) -> bool:
+        return self._bypass_cache
+
+    @contextmanager
+    def fresh(self) -> Iterator[None]:
+        # Ignora leituras do cache (os resultados novos continuam sendo gravados)
+        previous, self._bypass_cache = self._bypass_cache, True
+        try:
+            yield
+        finally:
+            self._bypass_cache = previous
+
+    def refresh_stale(self, limit: Optional[int] = None) -> int:
+        return self._refresh_queue.run_pending(limit)
+
+    def idle(self) -> int:
+        # Chamado quando o navegador está parado (ex.: esperando os workers): um item por vez
+        return self.refresh_stale(1)
+
+    def release(self) -> None:
+        # Encerra o trabalho pendente desta sessão sem fechar o cache compartilhado
+        if len(self._refresh_queue) > 0:
+            print("Revalidando " + str(min(len(self._refresh_queue), REFRESH_ON_CLOSE)) + " itens do cache...")
+            self.refresh_stale(REFRESH_ON_CLOSE)
+            self._refresh_queue.clear()
+        if self._parse_executor is not None:
+            self._parse_executor.shutdown(wait=True)
+            self._parse_executor = None
+
+    def close(self) -> None:
+        self.release()
+        attach_cache(None)
+        self.get_cache().close()
+
     @abstractmethod
     def get_course(self, ref_id: str) -> RequestedCourse:
         ...
 
+    def iter_courses(self, ref_ids: Iterable[str], workers: Optional[int] = None,
+                     executor: Optional[Executor] = None) -> Iterator[RequestedCourse]:
+        # Provedores podem sobrescrever para buscar e interpretar em paralelo
+        for ref_id in ref_ids:
+            yield self.get_course(ref_id)
+
     @abstractmethod
     def get_course_by_code(self, code: str) -> List[RequestedCourse]:
         ...
@@ -1,26 +1,42 @@
 from __future__ import annotations
+import functools
 import re
+from concurrent.futures import Executor
 from collections.abc import Callable
-from typing import Final, Optional, List
+from typing import Any, Final, Iterable, Iterator, Optional, List, Union
 
+from src.sigaa_cli.browser import HtmlPage
 from src.sigaa_cli.models.entities import ActiveTeacher, ActiveStudent
 from src.sigaa_cli.models.program import DetailedProgram, Program
-from src.sigaa_cli.models.section import Section, DetailedSection, ActiveSection, Spot
+from src.sigaa_cli.models.section import Section, DetailedSection, ActiveSection, Participants, Spot
 from src.sigaa_cli.providers.provider import Provider
 from src.sigaa_cli.providers.ufba.utils.active_courses import get_table as get_active_courses_table, \
-    is_valid_active_course_line, get_active_course, to_detail_page_and_extract
-from src.sigaa_cli.providers.ufba.utils.detail_program import extract_detail_program, Course, DetailProgram
+    is_valid_active_course_line, get_active_course, to_detail_page_and_extract, parse_cards
+from src.sigaa_cli.providers.ufba.utils.detail_course import parse_course, parse_course_payload, \
+    EXTRACTOR_VERSION as COURSE_PARSER_VERSION
+from src.sigaa_cli.providers.ufba.utils.detail_program import extract_detail_program, decode_detail_program, Course, DetailProgram, \
+    EXTRACTOR_VERSION as DETAIL_PROGRAM_VERSION
 from src.sigaa_cli.providers.ufba.utils.detail_section import go_and_extract_detail_section, Spot as UnsafeSpot
 from src.sigaa_cli.providers.ufba.utils.elements import extract_times
 from src.sigaa_cli.providers.ufba.utils.table_html import get_rows, Card
-from src.sigaa_cli.utils.cache import get_value, save_value
-from src.sigaa_cli.utils.compiler import fnd_array
+from src.sigaa_cli.utils.cache import CachePolicy, cached, make_key
+from src.sigaa_cli.utils.compiler import attach_cache, attach_provider_cache
+from src.sigaa_cli.utils.database import dump
 from src.sigaa_cli.utils.host import add_uri
-from src.sigaa_cli.utils.parser import strip_html_bs4
+from src.sigaa_cli.utils.parser import strip_html
+from src.sigaa_cli.utils.pipeline import Done, ParsePipeline
 from src.sigaa_cli.models.course import AnchoredCourse, Course as ModelCourse, RequestedCourse
 from src.sigaa_cli.utils.text import strip_parentheses_terms, extract_sequence
 
 
+DAY = 60 * 60 * 24
+
+# Dados de referência mudam pouco: servimos o valor velho e revalidamos depois
+COURSE_CODE_POLICY = CachePolicy(soft_ttl=30 * DAY, hard_ttl=365 * DAY)
+COURSE_POLICY = CachePolicy(soft_ttl=30 * DAY, hard_ttl=365 * DAY)
+PROGRAMS_POLICY = CachePolicy(soft_ttl=7 * DAY, hard_ttl=180 * DAY)
+
+
 class UFBAProvider(Provider):
     error_invalid_credentials: Final[str] = "SIGAA: Invalid credentials."
     KEY = "UFBA"
@@ -46,7 +62,7 @@ class UFBAProvider(Provider):
         with self._browser.page() as p:
             p.goto('/sigaa/portais/discente/discente.jsf')
             html = p.locator('#info-usuario > p.usuario > span').nth(0).inner_html()
-            name = strip_html_bs4(html)
+            name = strip_html(html)
             return name
 
     def get_email(self) -> Optional[str]:
@@ -61,9 +77,9 @@ class UFBAProvider(Provider):
                 tds = row.locator('td')
                 if tds.count() < 2:
                     continue
-                key = strip_html_bs4(tds.nth(0).inner_html() or '').strip().lower()
+                key = strip_html(tds.nth(0).inner_html() or '').strip().lower()
                 if key in ('e-mail:', 'e-mail'):
-                    value = strip_html_bs4(tds.nth(1).inner_html() or '')
+                    value = strip_html(tds.nth(1).inner_html() or '')
                     if value:
                         return value
         return None
@@ -73,7 +89,7 @@ class UFBAProvider(Provider):
             p.goto('/sigaa/portais/discente/discente.jsf')
             # Same selector used by account layer
             reg = str(p.locator('#agenda-docente > table > tbody > tr:nth-child(2) > td:nth-child(2)').nth(0).inner_html())
-            reg = strip_html_bs4(reg or '').replace('\n', '')
+            reg = strip_html(reg or '').replace('\n', '')
             reg = reg.strip()
             # Replace occurrences of 3+ consecutive whitespace chars with a single space
             reg = re.sub(r'\s{3,}', ' ', reg)
@@ -85,7 +101,7 @@ class UFBAProvider(Provider):
             p.goto('/sigaa/portais/discente/discente.jsf')
             # Same selector used by account layer
             reg = str(p.locator('#agenda-docente > table > tbody > tr:nth-child(1) > td:nth-child(2)').nth(0).inner_html())
-            reg = strip_html_bs4(reg or '')
+            reg = strip_html(reg or '')
             return reg or None
 
     def get_profile_picture_url(self) -> Optional[str]:
@@ -108,25 +124,30 @@ class UFBAProvider(Provider):
             if loc.count() == 0:
                 return None
             term_html = loc.nth(0).inner_html() or ''
-            term = strip_html_bs4(term_html).strip()
+            term = strip_html(term_html).strip()
             term = re.sub(r"\s+", " ", term)
             return term or None
 
-    def get_active_courses(self) -> List[ActiveSection]:
-        def parse_teacher(teacher: Card) -> ActiveTeacher:
-            img_url = add_uri(self.get_host(), teacher.img_src)
-            email = teacher.email.lower().replace('e-mail:', '').strip()
-            department = teacher.location.upper().replace('DEPARTAMENTO:', '').strip()
-            education = teacher.code.upper().replace("FORMAÇÃO:", "").strip()
-            return ActiveTeacher(name=teacher.name.strip(), email=email, department=department, education=education, image_url=img_url)
-
-        def parse_student(student: Card) -> ActiveStudent:
-            img_url = add_uri(self.get_host(), student.img_src)
-            email = student.email.lower().replace('e-mail:', '').strip()
-            [course_label, *_] = student.location.upper().replace('CURSO:', '').strip().split('/', 1)
-            registration = student.code.upper().replace("MATRÍCULA:", "").strip()
-            return ActiveStudent(name=student.name.strip(), email=email, course_label=course_label, registration=registration, image_url=img_url)
-
+    def _parse_teacher(self, teacher: Card) -> ActiveTeacher:
+        img_url = add_uri(self.get_host(), teacher.img_src)
+        email = teacher.email.lower().replace('e-mail:', '').strip()
+        department = teacher.location.upper().replace('DEPARTAMENTO:', '').strip()
+        education = teacher.code.upper().replace("FORMAÇÃO:", "").strip()
+        return ActiveTeacher(name=teacher.name.strip(), email=email, department=department, education=education, image_url=img_url)
+
+    def _parse_student(self, student: Card) -> ActiveStudent:
+        img_url = add_uri(self.get_host(), student.img_src)
+        email = student.email.lower().replace('e-mail:', '').strip()
+        [course_label, *_] = student.location.upper().replace('CURSO:', '').strip().split('/', 1)
+        registration = student.code.upper().replace("MATRÍCULA:", "").strip()
+        return ActiveStudent(name=student.name.strip(), email=email, course_label=course_label, registration=registration, image_url=img_url)
+
+    def _parse_participants(self, teachers_html: str, students_html: str) -> Participants:
+        teachers = list(map(self._parse_teacher, parse_cards(teachers_html)))
+        students = list(map(self._parse_student, parse_cards(students_html)))
+        return teachers, students
+
+    def get_active_courses(self, participants: bool = True) -> List[ActiveSection]:
         courses: List[ActiveSection] = []
         with self._browser.page() as p:
             p.goto('/sigaa/portais/discente/discente.jsf')
@@ -140,8 +161,8 @@ class UFBAProvider(Provider):
 
             for row in rows:
                 _, table_location, time_code = get_active_course(row)
-                result = to_detail_page_and_extract(p, row)
-                title, count, teachers, students, *_ = result if result else ("", "", [], [])
+                result = to_detail_page_and_extract(p, row, participants)
+                title, count, teachers_html, students_html, *_ = result if result else ("", "", "", "")
                 code, name, *_ = map(str.strip, title.split('-', 1))
                 name, class_code = map(str.strip, name.split('- T', 1))
                 class_code = "T" + class_code
@@ -152,19 +173,18 @@ class UFBAProvider(Provider):
                     code=code,
                 )
 
-                courses.append(
-                    ActiveSection(
-                        course=course_elment,
-                        location_table=table_location,
-                        time_codes=extract_times(time_code),
-                        term=current_term,
-                        class_code=class_code,
-                        teachers=list(map(parse_teacher, teachers)),
-                        students=list(map(parse_student, students)),
-                        total_classes=int(total_classes),
-                        number_classes=int(number_classes),
-                    )
+                section = ActiveSection(
+                    course=course_elment,
+                    location_table=table_location,
+                    time_codes=extract_times(time_code),
+                    term=current_term,
+                    class_code=class_code,
+                    total_classes=int(total_classes),
+                    number_classes=int(number_classes),
                 )
+                if participants:
+                    section.with_participants(functools.partial(self._parse_participants, teachers_html, students_html))
+                courses.append(section)
         return courses
 
     def get_sections(self) -> List[DetailedSection]:
@@ -185,6 +205,7 @@ class UFBAProvider(Provider):
                 seats_accepted=used
             )
 
+        memo = self.get_parse_memo()
         with self._browser.page() as page:
             page.goto('/sigaa/ensino/turma/busca_turma.jsf')
             page.wait_for_selector('#busca\\:curso')
@@ -203,7 +224,7 @@ class UFBAProvider(Provider):
 
                 # Nome legível do curso selecionado (para logging)
                 selected_opt = page.locator('#form\\:selectCurso > option:checked')
-                course_name = strip_html_bs4(selected_opt.nth(0).inner_html() or '') if selected_opt.count() > 0 else str(course_value)
+                course_name = strip_html(selected_opt.nth(0).inner_html() or '') if selected_opt.count() > 0 else str(course_value)
                 [course_name, *_] = list(map(str.strip, course_name.split('-', 1)))
 
                 # Garante que o checkbox de curso esteja sempre marcado
@@ -232,7 +253,7 @@ class UFBAProvider(Provider):
 
                 for row in rows:
                     try:
-                        unsafe_section = go_and_extract_detail_section(row, page)
+                        unsafe_section = go_and_extract_detail_section(row, page, memo)
                         [code, *_] = list(map(str.strip, unsafe_section.title.split('-', 1)))
                         course = ModelCourse(code=code, name=course_name)
                         teachers = list(map(strip_parentheses_terms, unsafe_section.teachers))
@@ -260,15 +281,14 @@ class UFBAProvider(Provider):
                 page.wait_for_selector('#busca\\:curso')
             return sections
 
+    @cached(
+        "course:code",
+        COURSE_CODE_POLICY,
+        encode=lambda courses: [dump(course) for course in courses],
+        decode=lambda values: [RequestedCourse.model_validate(value) for value in values],
+    )
     def get_course_by_code(self, code: str) -> List[RequestedCourse]:
-        with self.get_cache() as cache, self._browser.page() as page:
-            cached_value = get_value(cache, ":".join(["course", "code", code]))
-            if cached_value and "courses" in cached_value:
-                result = [
-                    RequestedCourse.model_validate(value) for value in cached_value["courses"]
-                ]
-                print("Resultado em Cache: ", code, [result.code for result in result])
-                return result
+        with self._browser.page() as page:
             page.goto('/sigaa/geral/componente_curricular/busca_geral.jsf')
             page.wait_for_selector('#formBusca')
             checkbox_selector = '#formBusca\\:checkCodigo'
@@ -304,95 +324,95 @@ class UFBAProvider(Provider):
                     ref_ids.append(match.group(1))
 
             print("Resultado: ", code, ref_ids)
-            result = [self.get_course(id) for id in ref_ids]
-            save_value(cache, ":".join(["course", "code", code]), {
-                "courses": result,
-            }, 60 * 60 * 24 * 365)
-            return result
-
+            # Poucas páginas por código: o parse vai para threads e a mesma aba segue para o próximo id.
+            # Uma lista incompleta ficaria no cache como se o código estivesse resolvido: falhas propagam
+            return list(self.iter_courses(ref_ids, executor=self.get_parse_executor(), strict=True))
+
+    @cached(
+        "course:id",
+        COURSE_POLICY,
+        encode=dump,
+        decode=RequestedCourse.model_validate,
+    )
     def get_course(self, ref_id: str) -> RequestedCourse:
         with self._browser.page() as page:
-            page.goto('/sigaa/graduacao/componente/view_painel.jsf?id=' + str(ref_id))
-            page.wait_for_selector('body')
-
-            def clean(text: Optional[str]) -> str:
-                return (strip_html_bs4(text or '') or '').replace('\n', ' ').strip()
-
-            # Data to fill
-            data: dict = {
-                'code': None,
-                'name': None,
-                'department': None,
-                'mode': None,
-                'prerequisites': [],
-                'corequisites': [],
-                'equivalences': [],
-                'workload_total': None,
-            }
-
-            # Map straightforward th -> field name
-            th_map = {
-                'Código': 'code',
-                'Nome': 'name',
-                'Unidade Responsável': 'department',
-                'Modalidade de Educação': 'mode',
-            }
-
-            rows = page.locator('tr')
-            for i in range(rows.count()):
-                row = rows.nth(i)
-                ths = row.locator('th')
-                tds = row.locator('td')
-                # Handle simple th->td pairs
-                if ths.count() > 0 and tds.count() > 0:
-                    th_text = clean(ths.nth(0).inner_html())
-                    if th_text.endswith(':'):
-                        th_text = th_text[:-1].strip()
-
-                    if th_text in th_map:
-                        value = clean(tds.nth(0).inner_html())
-                        data[th_map[th_text]] = value
+            body_html = self._fetch_course_html(page, ref_id)
+        attach_cache(self.get_cache())
+        fields = self.get_parse_memo()("course", COURSE_PARSER_VERSION, body_html, lambda: parse_course(ref_id, body_html))
+        return self._build_course(ref_id, fields)
+
+    @staticmethod
+    def _fetch_course_html(page: HtmlPage, ref_id: str) -> str:
+        page.goto('/sigaa/graduacao/componente/view_painel.jsf?id=' + str(ref_id))
+        page.wait_for_selector('body')
+        return page.locator('body').nth(0).inner_html()
+
+    @staticmethod
+    def _build_course(ref_id: str, fields: dict[str, Any]) -> RequestedCourse:
+        print("Carregando a Disciplina: " + str(fields['code']) + " - " + fields['name'])
+        return RequestedCourse.model_construct(id_ref=ref_id, **fields)
+
+    def _refresh_course(self, ref_id: str) -> None:
+        with self.fresh():
+            self.get_course(ref_id)
+
+    def iter_courses(self, ref_ids: Iterable[str], workers: Optional[int] = None,
+                     executor: Optional[Executor] = None, strict: bool = False) -> Iterator[RequestedCourse]:
+        # strict: a primeira falha de parse interrompe (e propaga) em vez de pular a Disciplina
+        cache = self.get_cache()
+        memo = self.get_parse_memo()
+        memo_keys: dict[str, str] = {}
+        # Compilações de pré-requisitos compartilhadas via cache, inclusive entre processos
+        attach_cache(cache)
+
+        def payloads() -> Iterator[Union[tuple[str, str], Done[dict[str, Any]]]]:
+            # Etapa de busca: só navega e coleta o HTML (thread dona do navegador)
+            with self._browser.page() as page:
+                for ref_id in ref_ids:
+                    key = make_key("course:id", ref_id)
+                    entry = None if self.is_cache_bypassed() else cache.get_entry(key)
+                    if entry is not None:
+                        if entry.stale:
+                            self.get_refresh_queue().schedule(key, functools.partial(self._refresh_course, ref_id))
+                        yield Done(entry.value)
                         continue
-
-                    # Complex lists: prerequisites/corequisites/equivalences
-                    if th_text in ('Pré-Requisitos', 'Co-Requisitos', 'Equivalências'):
-                        value = clean(tds.nth(0).inner_html())
-                        value = str(value.replace('-', '').strip())
-                        result = []
-                        if len(value) > 0:
-                            result = fnd_array(value)
-
-                        key = {
-                            'Pré-Requisitos': 'prerequisites',
-                            'Co-Requisitos': 'corequisites',
-                            'Equivalências': 'equivalences',
-                        }[th_text]
-                        data[key] = result
+                    body_html = self._fetch_course_html(page, ref_id)
+                    memo_key = memo.key("course", COURSE_PARSER_VERSION, body_html)
+                    fields = memo.lookup(memo_key)
+                    if fields is not None:
+                        yield Done(dict(fields, id_ref=ref_id))
                         continue
-
-                # Handle workload rows (no th, left cell contains the label)
-                if tds.count() >= 2:
-                    left = clean(tds.nth(0).inner_html())
-                    if 'Total de Carga Horária do Componente' in left:
-                        value = clean(tds.nth(1).inner_html())
-                        data['workload_total'] = value
-
-
-            department, location, *_ = data['department'].split('-')
-            department, *_ = department.rsplit("/", 1)
-            print("Carregando a Disciplina: " + str(data['code']) + " - " + data['name'])
-            return RequestedCourse(
-                id_ref=ref_id,
-                name=data['name'].strip(),
-                code=data['code'].strip(),
-                department=department.strip(),
-                location=location.strip(),
-                mode=data['mode'].strip(),
-                prerequisites=data['prerequisites'],
-                corequisites=data['corequisites'],
-                equivalences=data['equivalences'],
-            )
-
+                    memo_keys[ref_id] = memo_key
+                    yield ref_id, body_html
+
+        pipeline: ParsePipeline[tuple[str, str], dict[str, Any]] = ParsePipeline(
+            parse_course_payload, workers, executor=executor,
+            initializer=attach_provider_cache, initargs=(self.KEY,))
+        for payload, result in pipeline.run(payloads()):
+            if isinstance(result, Exception):
+                if strict:
+                    raise result
+                print("Falha ao carregar a Disciplina: " + str(result))
+                continue
+            if isinstance(payload, Done):
+                fields = dict(result)
+                ref_id = fields.pop('id_ref')
+                yield self._build_course(ref_id, fields)
+                continue
+            # Etapa final: grava a memoização e o cache e entrega o modelo
+            ref_id = payload[0]
+            memo.store(memo_keys.pop(ref_id), result)
+            course = self._build_course(ref_id, result)
+            cache.set_with_policy(make_key("course:id", ref_id), dump(course), COURSE_POLICY)
+            yield course
+
+    @cached(
+        "programs",
+        PROGRAMS_POLICY,
+        encode=lambda programs: [dump(program) for program in programs],
+        decode=lambda values: [DetailedProgram.model_validate(value) for value in values],
+        scoped=True,
+    )
     def get_programs(self) -> list[DetailedProgram]:
         programs : List[DetailedProgram] = []
         def parse_course(program: DetailProgram) -> Callable[[Course], AnchoredCourse]:
@@ -477,7 +497,9 @@ class UFBAProvider(Provider):
 
                     page.wait_for_selector('#formulario > table')
 
-                    detail_program = extract_detail_program(page)
+                    form_html = page.locator('#formulario').nth(0).inner_html()
+                    detail_program = self.get_parse_memo()("detail_program", DETAIL_PROGRAM_VERSION, form_html,
+                                                           lambda: extract_detail_program(page), decode=decode_detail_program)
                     [title, location, program_type, mode, time_code, *_] = list(map(str.strip, detail_program.curriculum_title.split('-')))
                     code = detail_program.code.strip()
                     detailed_program = DetailedProgram(title=title, location=location, program_type=program_type, mode=mode, time_code=time_code,
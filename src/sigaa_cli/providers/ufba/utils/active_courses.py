@@ -2,8 +2,8 @@ from collections import namedtuple
 from typing import List, Optional, NamedTuple
 
 from src.sigaa_cli.browser import HtmlPage, Locator, NodeAdapter
-from src.sigaa_cli.providers.ufba.utils.table_html import extract_cards, Card
-from src.sigaa_cli.utils.parser import strip_html_bs4
+from src.sigaa_cli.providers.ufba.utils.table_html import extract_cards_html, Card
+from src.sigaa_cli.utils.parser import strip_html
 
 
 def get_table(page: HtmlPage) -> Locator:
@@ -16,9 +16,9 @@ def is_valid_active_course_line(line_table: NodeAdapter) -> bool:
 def get_active_course(line: NodeAdapter) -> tuple[str, str, str]:
     cols = line.locator('td')
 
-    name = strip_html_bs4(cols.nth(0).inner_html() or '').strip()
-    location = strip_html_bs4(cols.nth(1).inner_html() or '').strip()
-    time_code = strip_html_bs4(cols.nth(2).inner_html() or '').strip()
+    name = strip_html(cols.nth(0).inner_html() or '').strip()
+    location = strip_html(cols.nth(1).inner_html() or '').strip()
+    time_code = strip_html(cols.nth(2).inner_html() or '').strip()
 
     return name, location, time_code
 
@@ -28,11 +28,27 @@ DetailPage = NamedTuple(
     [
         ('name', str),
         ('count', str),
-        ('teachers', list[Card]),
-        ('students', list[Card]),
+        ('teachers_html', str),
+        ('students_html', str),
     ]
 )
-def to_detail_page_and_extract(page: HtmlPage, active_course_line: NodeAdapter) -> Optional[DetailPage]:
+
+TEACHER_TABLE = '#j_id_jsp_345573504_298 > table:nth-child(3)'
+STUDENT_TABLE = '#j_id_jsp_345573504_298 > table:nth-child(6)'
+
+
+def _outer_html(table: Locator) -> str:
+    if table.count() == 0:
+        return ''
+    return str(table.nth(0).evaluate('el => el.outerHTML') or '')
+
+
+def parse_cards(table_html: str) -> list[Card]:
+    # Cards de uma tabela guardada por to_detail_page_and_extract
+    return extract_cards_html(table_html, 'table') if table_html else []
+
+
+def to_detail_page_and_extract(page: HtmlPage, active_course_line: NodeAdapter, participants: bool = True) -> Optional[DetailPage]:
     link_node = active_course_line.locator('td.descricao a').nth(0)
     if link_node:
         try:
@@ -44,21 +60,20 @@ def to_detail_page_and_extract(page: HtmlPage, active_course_line: NodeAdapter)
             page.wait_for_selector('#nomeTurma')
 
             name_html = page.locator('#nomeTurma').nth(0).inner_html()
-            name = strip_html_bs4(name_html).strip()
+            name = strip_html(name_html).strip()
             
             count_html = page.locator('#j_id_jsp_345573504_153_body > div:nth-child(1) > i').nth(0).inner_html()
-            count = strip_html_bs4(count_html)
+            count = strip_html(count_html)
             
-            teacher_table = page.locator('#j_id_jsp_345573504_298 > table:nth-child(3)')
-            teachers = extract_cards(teacher_table)
-            student_table = page.locator('#j_id_jsp_345573504_298 > table:nth-child(6)')
-            students = extract_cards(student_table)
+            # Só o HTML das tabelas: os cards são montados quando (e se) forem usados
+            teachers_html = _outer_html(page.locator(TEACHER_TABLE)) if participants else ''
+            students_html = _outer_html(page.locator(STUDENT_TABLE)) if participants else ''
 
             page.go_back()
             page.go_back()
             page.wait_for_selector('#turmas-portal')
 
-            detail = DetailPage(name, count, teachers, students)
+            detail = DetailPage(name, count, teachers_html, students_html)
             return detail
         except Exception:
             return None
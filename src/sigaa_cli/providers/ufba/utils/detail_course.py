@@ -0,0 +1,69 @@
+from typing import Any, Optional
+
+from src.sigaa_cli.models.course import RequestedCourse
+from src.sigaa_cli.utils.compiler import fnd_array
+from src.sigaa_cli.utils.parser import strip_html
+from src.sigaa_cli.utils.schema import Field, Schema, label_map
+
+# Incrementar ao mudar a saída de parse_course (invalida a memoização)
+EXTRACTOR_VERSION = 3
+
+# Map straightforward th -> field name
+TH_MAP = {
+    'Código': 'code',
+    'Nome': 'name',
+    'Unidade Responsável': 'department',
+    'Modalidade de Educação': 'mode',
+}
+
+REQUISITES_MAP = {
+    'Pré-Requisitos': 'prerequisites',
+    'Co-Requisitos': 'corequisites',
+    'Equivalências': 'equivalences',
+}
+
+
+def _clean(text: Optional[str]) -> str:
+    return (strip_html(text or '') or '').replace('\n', ' ').strip()
+
+
+def _clean_label(text: Optional[str]) -> str:
+    label = _clean(text)
+    return label[:-1].strip() if label.endswith(':') else label
+
+
+# Linhas th -> td da página; a carga horária (linhas sem th) não entra no modelo
+_COURSE_ROWS = Schema('tr', {
+    'label': Field('th', post=_clean_label),
+    'value': Field('td', post=_clean),
+}, where=lambda row: row['label'] is not None and row['value'] is not None)
+
+
+def parse_course(ref_id: str, html: str) -> dict[str, Any]:
+    # Roda sem navegador (inclusive em outro processo): recebe o inner_html do body de view_painel.jsf
+    data = label_map(_COURSE_ROWS.extract_html(html), {**TH_MAP, **REQUISITES_MAP})
+    for key in REQUISITES_MAP.values():
+        value = str((data.get(key) or '').replace('-', '').strip())
+        data[key] = fnd_array(value) if len(value) > 0 else []
+
+    department, location, *_ = data['department'].split('-')
+    department, *_ = department.rsplit("/", 1)
+    fields = {
+        'name': data['name'].strip(),
+        'code': data['code'].strip(),
+        'department': department.strip(),
+        'location': location.strip(),
+        'mode': data['mode'].strip(),
+        'prerequisites': data['prerequisites'],
+        'corequisites': data['corequisites'],
+        'equivalences': data['equivalences'],
+    }
+    # Valida só na primeira vez; acertos da memoização vêm de dados já validados
+    RequestedCourse(id_ref=ref_id, **fields)
+    return fields
+
+
+def parse_course_payload(payload: tuple[str, str]) -> dict[str, Any]:
+    # Ponto de entrada da etapa de parse do pipeline (precisa ser serializável)
+    ref_id, html = payload
+    return parse_course(ref_id, html)
@@ -1,8 +1,12 @@
-from typing import NamedTuple, List
+from typing import Any, NamedTuple, List
 import re
 
 from src.sigaa_cli.browser import HtmlPage
-from src.sigaa_cli.utils.parser import strip_html_bs4
+from src.sigaa_cli.utils.parser import strip_html
+from src.sigaa_cli.utils.schema import Field, Schema
+
+# Incrementar ao mudar a saída de extract_detail_program (invalida a memoização)
+EXTRACTOR_VERSION = 1
 
 # Course entry as shown in the curriculum tables
 Course = NamedTuple('Course', [
@@ -21,67 +25,70 @@ DetailProgram = NamedTuple('DetailProgram', [
 ])
 
 
-def _text_by_selector(page: HtmlPage, selector: str) -> str:
-    loc = page.locator(selector)
-    if loc.count() == 0:
-        return ""
-    html = loc.nth(0).inner_html() or ""
-    text = strip_html_bs4(html)
+def decode_detail_program(value: Any) -> DetailProgram:
+    code, curriculum_title, courses = value
+    return DetailProgram(code, curriculum_title, [Course(*course) for course in courses])
+
+
+def _text(html: str) -> str:
+    text = strip_html(html)
     # Normalize whitespace/newlines
     lines = [ln.strip() for ln in text.splitlines() if ln and ln.strip()]
     return " ".join(lines).strip()
 
 
-def extract_detail_program(page: HtmlPage) -> DetailProgram:
-    # Top info table
-    code = _text_by_selector(page, '#formulario > table > tbody > tr:nth-child(1) > td')
-    curriculum_title = _text_by_selector(page, '#formulario > table > tbody > tr:nth-child(2) > td')
-
-    # Courses from tab panel
-    courses: List[Course] = []
-    tab_panel = page.locator('#formulario\\:tab_painel')
-
-    if tab_panel.count() > 0:
-        tab_contents = tab_panel.nth(0).locator('> tbody > tr:nth-child(2) > td[id]').all()
-        for content in tab_contents:
-
-            # Get section/level title (first span within content)
-            level_span = content.locator('span')
-            level_name = ''
-            if level_span.count() > 0:
-                level_name = strip_html_bs4(level_span.nth(0).inner_html() or '').strip()
-
-            # Now iterate the data tables within this content
-            tables = content.locator('table.rich-table').all()
-            rows_in_tables = [tbl.locator('tbody > tr').all() for tbl in tables]
+def _label(html: str) -> str:
+    return strip_html(html).strip()
+
+
+# Página inteira num único evaluate: cabeçalho e, por aba do painel, o nível
+# e as linhas (com >= 3 colunas) de cada tabela de componentes
+_PROGRAM = Schema('html', {
+    'code': Field('#formulario > table > tbody > tr:nth-child(1) > td', post=_text, default=''),
+    'curriculum_title': Field('#formulario > table > tbody > tr:nth-child(2) > td', post=_text, default=''),
+    'contents': Field('#formulario\\:tab_painel', schema=Schema('> tbody > tr:nth-child(2) > td[id]', {
+        'level': Field('span', post=_label, default=''),
+        'tables': Field(schema=Schema('table.rich-table', {
+            'rows': Field(schema=Schema('tbody > tr', {
+                'tds': Field('td', 'count'),
+                'labels': Field('td', schema=Schema('label', {
+                    'code': Field(post=strip_html, default=''),
+                    'onclick': Field(attr='@onclick', default=''),
+                })),
+                'title': Field('td', index=1, post=_label, default=''),
+                'mode': Field('td', index=2, post=_label, default=''),
+                'type': Field('td', index=3, post=_label),
+            }, where=lambda row: row['tds'] >= 3)),
+        })),
+    })),
+})
+
+
+def _course(row: dict[str, Any], level_name: str) -> Course:
+    code, onclick = ('', '')
+    if row['labels']:
+        code, onclick = row['labels'][0]['code'], row['labels'][0]['onclick']
+    regex_onclick = re.search(r"PainelComponente\.show\((\d+),", onclick)
+    id_ref = regex_onclick.group(1) if regex_onclick else ''
+    course_type = 'OBRIGATÓRIO' if row['tds'] < 4 else row['type']
+    return Course(code, row['title'], row['mode'], course_type, level_name, id_ref)
+
+
+def _build(found: List[dict[str, Any]]) -> DetailProgram:
+    if not found:
+        return DetailProgram('', '', [])
+    program = found[0]
+    courses = [_course(row, content['level'])
+               for content in program['contents']
+               for table in content['tables']
+               for row in table['rows']]
+    return DetailProgram(program['code'], program['curriculum_title'], courses)
 
-            for rows in rows_in_tables:
-                tds_in_row = [row.locator('td') for row in rows]
-                tds_in_row = [tds for tds in tds_in_row if tds.count() >= 3]
 
-                types = [None if tds.count() < 4 else tds.nth(3).inner_html() or '' for tds in tds_in_row]
-                str_types = ['OBRIGATÓRIO' if type_html is None else strip_html_bs4(type_html) for type_html in types]
-                types = [type_label.strip() for type_label in str_types]
-
-                code_tds = [tds.nth(0) for tds in tds_in_row]
-                labels_html = [code_td.locator('label') for code_td in code_tds]
-                labels_locator_html = [None if label.count() < 0 else label.nth(0) for label in labels_html]
-
-                codes = ['' if label_html is None else strip_html_bs4(label_html.inner_html() or '') for label_html in labels_locator_html]
-
-                onclick_labels = ['' if label_html is None else label_html.get_attribute('onclick') or '' for label_html in labels_locator_html]
-                onclick_regex_labels = [re.search(r"PainelComponente\.show\((\d+),", onclick_text) for onclick_text in onclick_labels]
-                ids = [regex_onclick.group(1) if regex_onclick else '' for regex_onclick in onclick_regex_labels]
-
-                titles_html = [(tds.nth(1).inner_html() or '') for tds in tds_in_row]
-                titles = [strip_html_bs4(title_html).strip() for title_html in titles_html]
-
-                modes_html = [tds.nth(2).inner_html() or '' for tds in tds_in_row]
-                modes = [strip_html_bs4(mode_html).strip() for mode_html in modes_html]
-
-                table_courses = list(zip(codes, titles, modes, types, [level_name] * len(ids), ids))
-                table_tuple_courses = [Course(*props) for props in table_courses]
+def extract_detail_program(page: HtmlPage) -> DetailProgram:
+    return _build(_PROGRAM.extract(page))
 
-                courses += table_tuple_courses
 
-    return DetailProgram(code, curriculum_title, courses)
+def extract_detail_program_html(html: str) -> DetailProgram:
+    # Mesmo resultado a partir do HTML da página (ex.: page.content())
+    return _build(_PROGRAM.extract_html(html))
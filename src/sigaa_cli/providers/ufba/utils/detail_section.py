@@ -1,8 +1,13 @@
-from typing import NamedTuple, List
+from typing import Any, NamedTuple, List, Optional
 import re
 from src.sigaa_cli.browser import HtmlPage, NodeAdapter
 from src.sigaa_cli.utils.list import safe_get
-from src.sigaa_cli.utils.parser import strip_html_bs4
+from src.sigaa_cli.utils.memo import ParseMemo, memoize
+from src.sigaa_cli.utils.parser import strip_html
+from src.sigaa_cli.utils.schema import Field, Schema
+
+# Incrementar ao mudar a saída de _extract_detail (invalida a memoização)
+EXTRACTOR_VERSION = 1
 
 Spot = NamedTuple('Spot', [
     ('course', str),
@@ -34,7 +39,7 @@ def _extract_course_from_header(row: NodeAdapter) -> str:
     if header_td.count() == 0:
         return ''
     html = header_td.nth(0).inner_html() or ''
-    return _normalize_text(strip_html_bs4(html))
+    return _normalize_text(strip_html(html))
 
 
 def _extract_ref_id(row: NodeAdapter) -> str:
@@ -48,76 +53,92 @@ def _extract_ref_id(row: NodeAdapter) -> str:
 
 def _extract_basic_from_row(row: NodeAdapter) -> tuple[str, str, str, str]:
     tds = row.locator('td')
-    term = _normalize_text(strip_html_bs4(tds.nth(0).inner_html() or '')) if tds.count() > 0 else ''
-    mode = _normalize_text(strip_html_bs4(tds.nth(4).inner_html() or '')) if tds.count() > 4 else ''
+    term = _normalize_text(strip_html(tds.nth(0).inner_html() or '')) if tds.count() > 0 else ''
+    mode = _normalize_text(strip_html(tds.nth(4).inner_html() or '')) if tds.count() > 4 else ''
     # Horário (remove intervalo de datas entre parênteses)
-    horario_full = _normalize_text(strip_html_bs4(tds.nth(6).inner_html() or '')) if tds.count() > 6 else ''
+    horario_full = _normalize_text(strip_html(tds.nth(6).inner_html() or '')) if tds.count() > 6 else ''
     time_id = re.sub(r"\s*\(.*\)\s*$", "", horario_full).strip()
-    location = _normalize_text(strip_html_bs4(tds.nth(7).inner_html() or '')) if tds.count() > 7 else ''
+    location = _normalize_text(strip_html(tds.nth(7).inner_html() or '')) if tds.count() > 7 else ''
     return term, mode, time_id, location
 
 
+def _cell_text(html: str) -> str:
+    return _normalize_text(strip_html(html))
+
+
+# Tabela sob #resumo com as subtabelas (subformulário) de professores e vagas
+_RESUMO_TABLES = Schema('#resumo > table > tbody > tr > td > table', {
+    'tables': Field(schema=Schema('table', {
+        'header': Field('tr.secao > td', post=_cell_text, default=''),
+        'rows': Field(schema=Schema('tr', {
+            'class': Field(attr='@class', default=''),
+            'cells': Field('td', many=True, post=_cell_text),
+        })),
+    })),
+})
+
+
 def _extract_teachers_and_spots(page: HtmlPage) -> tuple[List[str], List[Spot]]:
+    return _build_teachers_and_spots(_RESUMO_TABLES.extract(page))
+
+
+def extract_teachers_and_spots_html(html: str) -> tuple[List[str], List[Spot]]:
+    # Mesmo resultado a partir do HTML da página de detalhes da turma
+    return _build_teachers_and_spots(_RESUMO_TABLES.extract_html(html))
+
+
+def _build_teachers_and_spots(found: List[dict[str, Any]]) -> tuple[List[str], List[Spot]]:
     teachers: List[str] = []
     spots: List[Spot] = []
 
-    # Target table under #resumo
-    tbl = page.locator('#resumo > table > tbody > tr > td > table')
-    if tbl.count() == 0:
+    if not found:
         return teachers, spots
 
-    # Find all nested tables (subformluario)
-    nested_tables = tbl.nth(0).locator('table').all()
-    for nt in nested_tables:
-        header = nt.locator('tr.secao > td')
-        header_text = _normalize_text(strip_html_bs4(header.nth(0).inner_html() or '')) if header.count() > 0 else ''
+    for table in found[0]['tables']:
+        header_text = table['header']
+        # Pula a linha de cabeçalho
+        rows = [row for i, row in enumerate(table['rows']) if not (i == 0 and 'secao' in row['class'])]
 
         if header_text.startswith('Professores'):
-            rows = nt.locator('tr').all()
-            for i, r in enumerate(rows):
-                # skip header row
-                if i == 0 and 'secao' in (r.get_attribute('class') or ''):
-                    continue
-                t = _normalize_text(strip_html_bs4(r.locator('td').nth(0).inner_html() or ''))
+            for row in rows:
+                t = safe_get(row['cells'], 0, '')
                 if t:
                     teachers.append(t)
 
         elif header_text.startswith('Vagas Reservadas'):
-            rows = nt.locator('tr').all()
-            for i, r in enumerate(rows):
-                if i == 0 and 'secao' in (r.get_attribute('class') or ''):
-                    continue
-                tds = r.locator('td')
-                if tds.count() >= 2:
-                    course = _normalize_text(strip_html_bs4(tds.nth(0).inner_html() or ''))
-                    count = _normalize_text(strip_html_bs4(tds.nth(1).inner_html() or ''))
+            for row in rows:
+                cells = row['cells']
+                if len(cells) >= 2:
+                    course, count, *_ = cells
                     if course and count:
                         spots.append(Spot(course, count))
 
     return teachers, spots
 
 
-def go_and_extract_detail_section(row: NodeAdapter, page: HtmlPage) -> Section:
-    # Basic info from list row
-    ref_id = _extract_ref_id(row)
-    title = _extract_course_from_header(row)
-    term, mode, time_id, location = _extract_basic_from_row(row)
+Detail = NamedTuple('Detail', [
+    ('total', str),
+    ('total_requested', str),
+    ('total_rerequested', str),
+    ('total_accepted', str),
+    ('teachers', list[str]),
+    ('spots', list[Spot]),
+])
 
 
-    # Navigate to detail page
-    if ref_id:
-        url = f"/sigaa/graduacao/turma/view_painel.jsf?ajaxRequest=true&contarMatriculados=true&id={ref_id}"
-        page.goto(url)
-        page.wait_for_selector('#resumo')
+def _decode_detail(value: Any) -> Detail:
+    total, total_requested, total_rerequested, total_accepted, teachers, spots = value
+    return Detail(total, total_requested, total_rerequested, total_accepted, list(teachers), [Spot(*spot) for spot in spots])
 
 
+def _extract_detail(page: HtmlPage) -> Detail:
     # Find td siblings by locating their corresponding th labels regardless of row position
     total_html = ''
     totals_html = ''
 
     ths = page.locator('#resumo th').all()
     for th in ths:
-        th_text = _normalize_text(strip_html_bs4(th.inner_html() or '')).lower()
+        th_text = _normalize_text(strip_html(th.inner_html() or '')).lower()
         if 'capacidade:' in th_text and not total_html:
             td_loc = th.locator('xpath=following-sibling::td[1]')
             if td_loc.count() > 0:
@@ -128,16 +149,36 @@ def go_and_extract_detail_section(row: NodeAdapter, page: HtmlPage) -> Section:
                 totals_html = td_loc.nth(0).inner_html() or ''
     totals = re.split(r'<br>|<br/>|<br >|<br />', totals_html or '')
 
-    total = strip_html_bs4(total_html).strip()
-    total_requested = strip_html_bs4(safe_get(totals, 0, ) or '')
-    total_rerequested = strip_html_bs4(safe_get(totals, 1, ) or '')
-    total_accepted = strip_html_bs4(safe_get(totals, 2, '') or '')
+    total = strip_html(total_html).strip()
+    total_requested = strip_html(safe_get(totals, 0, ) or '')
+    total_rerequested = strip_html(safe_get(totals, 1, ) or '')
+    total_accepted = strip_html(safe_get(totals, 2, '') or '')
 
     teachers, spots = _extract_teachers_and_spots(page)
+    return Detail(total, total_requested, total_rerequested, total_accepted, teachers, spots)
+
+
+def go_and_extract_detail_section(row: NodeAdapter, page: HtmlPage, memo: Optional[ParseMemo] = None) -> Section:
+    # Basic info from list row
+    ref_id = _extract_ref_id(row)
+    title = _extract_course_from_header(row)
+    term, mode, time_id, location = _extract_basic_from_row(row)
+
+
+    # Navigate to detail page
+    if ref_id:
+        url = f"/sigaa/graduacao/turma/view_painel.jsf?ajaxRequest=true&contarMatriculados=true&id={ref_id}"
+        page.goto(url)
+        page.wait_for_selector('#resumo')
+        resumo_html = page.locator('#resumo').nth(0).inner_html() if memo is not None else ''
+        detail = memoize(memo, "detail_section", EXTRACTOR_VERSION, resumo_html, lambda: _extract_detail(page), decode=_decode_detail)
+    else:
+        detail = _extract_detail(page)
 
     # Go back to the list page to continue scraping
     page.go_back()
     page.wait_for_selector('#lista-turmas')
 
-    section = Section(ref_id, title, term, teachers, mode, time_id, location, spots, total, total_requested, total_rerequested, total_accepted)
+    section = Section(ref_id, title, term, detail.teachers, mode, time_id, location, detail.spots,
+                      detail.total, detail.total_requested, detail.total_rerequested, detail.total_accepted)
     return section
@@ -1,7 +1,10 @@
 from typing import Any, List, NamedTuple
 
+from bs4 import BeautifulSoup
+
 from src.sigaa_cli.browser import HtmlPage, Locator, NodeAdapter
 from src.sigaa_cli.utils.list import chunk_after
+from src.sigaa_cli.utils.schema import Field, Schema
 
 
 def get_rows(table: Locator) -> List[NodeAdapter]:
@@ -11,17 +14,37 @@ def get_rows(table: Locator) -> List[NodeAdapter]:
 Card = NamedTuple(
     'Card', [("img_src", str), ("name", str), ("location", str), ("code", str), ("email", str)]
 )
+# Um único evaluate traz, por linha, as células com imagem, nome e texto de cada card
+_CARD_ROWS = Schema('tbody > tr', {
+    'tds': Field('td', 'count'),
+    'imgs': Field('td > img', 'count'),
+    'cells': Field(schema=Schema('td', {
+        'img_src': Field('img', '@src', default=''),
+        'name': Field('strong', 'text', default=''),
+        'text': Field(attr='text', default=''),
+        'buttons': Field('a.naoImprimir', 'count'),
+    })),
+}, where=lambda row: row['tds'] >= 2 and row['imgs'] >= 1)
+
+
 def extract_cards(table: Locator) -> list[Card]:
+    if table.count() == 0:
+        return []
+    return _build_cards(_CARD_ROWS.extract(table.nth(0)))
 
-    def get_img_src(candidate: NodeAdapter) -> str:
-        img_html = candidate.locator('img').nth(0)
-        return img_html.get_attribute('src') or ''
 
-    def get_name(candidate: NodeAdapter) -> str:
-        return (candidate.locator('strong').nth(0).text_content() or '').strip()
+def extract_cards_html(html: str, selector: str) -> list[Card]:
+    # Mesmo resultado a partir do HTML da página, para a tabela em ``selector``
+    table = BeautifulSoup(html, "html.parser").select_one(selector)
+    if table is None:
+        return []
+    return _build_cards(_CARD_ROWS.extract_soup(table))
 
-    def get_other_lines(candidate: NodeAdapter) -> List[str]:
-        raw_lines = (candidate.text_content() or '').splitlines()
+
+def _build_cards(rows: list[dict[str, Any]]) -> list[Card]:
+
+    def get_other_lines(text: str) -> List[str]:
+        raw_lines = (text or '').splitlines()
         return [raw_line.strip() for raw_line in raw_lines if raw_line and raw_line.strip()]
 
     def is_course_label(candidate: str) -> bool:
@@ -36,24 +59,19 @@ def extract_cards(table: Locator) -> list[Card]:
     def is_email_label(candidate: str) -> bool:
         return candidate.lower().startswith('email:') or candidate.lower().startswith('e-mail:') or candidate.lower().startswith('e-mail:')
 
-    def has_cards_in_row(candidate: NodeAdapter) -> bool:
-        return candidate.locator('td').count() >= 2 and candidate.locator('td > img').count() >= 1
-
-    def is_button_card(candidate: NodeAdapter) -> bool:
-        return candidate.locator('a.naoImprimir').count() > 0
+    def is_button_card(candidate: dict[str, Any]) -> bool:
+        return bool(candidate['buttons'] > 0)
 
     cards: list[Card] = []
-    rows = [row for row in get_rows(table) if has_cards_in_row(row)]
-    tds_in_rows = [row.locator('td').all() for row in rows]
-    tds_cards_in_rows = [chunk_after(tds_in_row, is_button_card) for tds_in_row in tds_in_rows]
+    tds_cards_in_rows = [chunk_after(row['cells'], is_button_card) for row in rows]
     td_cards = [list(td_card) for td_cards_in_row in tds_cards_in_rows for td_card in td_cards_in_row]
     td_cards = [td_card for td_card in td_cards if len(td_card) >= 2]
 
     for tds in td_cards:
         [img_td, info_td, *_] = tds
-        img_src = get_img_src(img_td)
-        name = get_name(info_td)
-        lines = get_other_lines(info_td)
+        img_src = img_td['img_src'] or ''
+        name = (info_td['name'] or '').strip()
+        lines = get_other_lines(info_td['text'])
 
         curso_dep = next(filter(is_course_label, lines), None) or ''
         form_matr = next(filter(is_code_label, lines), None) or ''
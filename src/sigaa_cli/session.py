@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
 from .types import LoginStatus
 
 
@@ -8,4 +9,6 @@ from .types import LoginStatus
 class Session:
     institution: str
     login_status: LoginStatus = LoginStatus.UNAUTHENTICATED
+    # Login usado na sessão; separa no cache o que depende da conta
+    account: Optional[str] = None
 
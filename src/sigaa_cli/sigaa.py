@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
 from itertools import chain
 
 from tinydb import TinyDB, Query
-from typing import Optional, List, cast
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, List, TypeVar
 from .browser import BrowserConfig, SigaaBrowser
 from src.sigaa_cli.providers.ufba.provider import UFBAProvider
 from .models.account import Account
@@ -12,10 +13,26 @@ from .models.program import DetailedProgram
 from .models.section import ActiveSection
 from .parser import Parser
 from .providers.provider import Provider
-from src.sigaa_cli.utils.database import dump, load, get_database
+from src.sigaa_cli.utils.database import dump, get_database, load_table
 from .session import Session
 from .types import LoginStatus
+from .utils.cache import Cache, make_key
+from .utils.compiler import Predicates, formula_codes, is_formula
+from .utils.eligibility import Eligibility
+from .utils.equivalence import EquivalenceIndex, equivalence_path, load_equivalences, save_equivalences
+from .utils.planner import Plan, plan
+from .utils.graph import DependencyIndex, drop_index, graph_path, index_path, load_index, save_index
 from .utils.config import get_config_if_none, USER_KEY, PASSWORD_KEY, DEFAULT_PROVIDER_KEY
+from .utils.workers import WorkerPool
+
+if TYPE_CHECKING:
+    from .utils.csr import CurriculumGraph
+
+I = TypeVar("I")
+R = TypeVar("R")
+
+# Disciplinas acumuladas antes de cada escrita no banco
+ORPHAN_BATCH_SIZE = 50
 
 PROVIDERS = {
     UFBAProvider.KEY: UFBAProvider,
@@ -35,6 +52,7 @@ class Sigaa:
             raise NotImplementedError(f"Institution {final_institution} not supported")
         self._provider_class = PROVIDERS[final_institution]
 
+        self._headless = headless
         self._browser = SigaaBrowser(BrowserConfig(base_url=self._provider_class.HOST, headless=headless))
         self._session = Session(institution=final_institution)
         self._parser = parser or Parser()
@@ -43,16 +61,46 @@ class Sigaa:
         self._provider: Provider = self._provider_class(self._browser, self._session)
         self._account: Optional[Account] = None
         self._active_courses: Optional[List[ActiveSection]] = None
+        self._active_participants = False
+        self._credentials: tuple[str, str] = ('', '')
+        self._predicates: Optional[Predicates] = None
 
     def login(self, username: Optional[str] = None, password: Optional[str] = None) -> bool:
         if self._session.login_status == LoginStatus.UNAUTHENTICATED:
-            self._provider.login(get_config_if_none(USER_KEY, username) or '', get_config_if_none(PASSWORD_KEY, password) or '')
+            self._credentials = (get_config_if_none(USER_KEY, username) or '', get_config_if_none(PASSWORD_KEY, password) or '')
+            self._provider.login(*self._credentials)
+            self._session.account = self._credentials[0]
         self._session.login_status = LoginStatus.AUTHENTICATED
         return True
 
+    def _spawn_provider(self) -> tuple[Provider, SigaaBrowser]:
+        # Cada worker tem seu próprio navegador e sessão; o cache é compartilhado
+        browser = SigaaBrowser(BrowserConfig(base_url=self._provider_class.HOST, headless=self._headless))
+        provider = self._provider_class(browser, Session(institution=self._session.institution, account=self._session.account))
+        try:
+            provider.login(*self._credentials)
+        except Exception:
+            browser.close()
+            raise
+        return provider, browser
+
+    @staticmethod
+    def _release_provider(worker: tuple[Provider, SigaaBrowser]) -> None:
+        provider, browser = worker
+        provider.release()
+        browser.close()
+
+    def _provider_pool(self, job: Callable[[Provider, I], R], workers: int) -> WorkerPool[tuple[Provider, SigaaBrowser], I, R]:
+        # Workers sem itens na fila revalidam as entradas velhas que encontraram
+        return WorkerPool(self._spawn_provider, self._release_provider, lambda worker, item: job(worker[0], item), workers,
+                          idle=lambda worker: worker[0].idle())
+
     def get_database(self) -> TinyDB:
         return get_database(self._provider.KEY)
 
+    def get_cache(self) -> Cache:
+        return self._provider.get_cache()
+
     def logoff(self) -> bool:
         if self._session.login_status == LoginStatus.AUTHENTICATED:
             self._account = None
@@ -77,15 +125,18 @@ class Sigaa:
             return account
 
     def close(self) -> None:
+        self._provider.close()
         self._browser.close()
 
-    def get_active_sections(self) -> List[ActiveSection]:
+    def get_active_sections(self, participants: bool = True) -> List[ActiveSection]:
         if self._session.login_status == LoginStatus.UNAUTHENTICATED:
             raise ValueError("Not authenticated")
-        if self._active_courses is not None:
+        # Uma lista buscada sem participantes não serve a quem pede participantes
+        if self._active_courses is not None and (self._active_participants or not participants):
             return self._active_courses
-        courses = self._provider.get_active_courses()
+        courses = self._provider.get_active_courses(participants=participants)
         self._active_courses = courses
+        self._active_participants = participants
         return courses
 
     def get_programs(self, no_cache: bool = False) -> List[DetailedProgram]:
@@ -94,14 +145,16 @@ class Sigaa:
                 raise ValueError("Not authenticated")
             if not no_cache:
                 print("Verificando se há Cursos salvos...")
-                raw_saved_programs = db.table('programs').all()
-                if len(raw_saved_programs) > 0:
-                    return [cast(DetailedProgram, load(DetailedProgram, program)) for program in raw_saved_programs]
+                saved_programs = load_table(db, 'programs', DetailedProgram)
+                if len(saved_programs) > 0:
+                    return saved_programs
             print("Buscando Cursos...")
-            programs = self._provider.get_programs()
+            with self._provider.fresh() if no_cache else nullcontext():
+                programs = self._provider.get_programs()
             print("Salvando " + str(len(programs)) + " Cursos...")
             for program in programs:
                 db.table('programs').upsert(dump(program), Query().id_ref == program.id_ref)
+            drop_index(graph_path(self._provider.KEY))
             print("Cursos salvos!")
             return programs
 
@@ -121,15 +174,15 @@ class Sigaa:
             print("Turmas salvas!")
             return True
 
-    def get_courses(self, no_cache: bool = False) -> list[RequestedCourse]:
+    def get_courses(self, no_cache: bool = False, workers: Optional[int] = None) -> list[RequestedCourse]:
         with self.get_database() as db:
             if self._session.login_status == LoginStatus.UNAUTHENTICATED:
                 raise ValueError("Not authenticated")
             if not no_cache:
-                raw_saved_courses = db.table('courses').all()
                 print("Verificando se há Disciplinas salvas...")
-                if len(raw_saved_courses) > 0:
-                    return [cast(RequestedCourse, load(RequestedCourse, course)) for course in raw_saved_courses]
+                saved_courses = load_table(db, 'courses', RequestedCourse)
+                if len(saved_courses) > 0:
+                    return saved_courses
             print("Buscando Cursos...")
             programs = self.get_programs()
             print("Cursos capturados...")
@@ -138,38 +191,169 @@ class Sigaa:
             simple_courses = (course for program in programs for course in program.courses)
             ids = set(course.id_ref for course in simple_courses)
             print("Encontrando " + str(len(ids)) + " para buscar")
-            courses = list(self._provider.get_course(id_ref) for id_ref in ids)
-            print("Salvando " + str(len(courses)) + " Cursos...")
-            for course in courses:
-                db.table('courses').upsert(
-                    dump(course), Query().id_ref == course.id_ref
-                )
-            print("Cursos salvos!")
+            # Busca, parse (em processos) e gravação acontecem em paralelo
+            courses: list[RequestedCourse] = []
+            with self._provider.fresh() if no_cache else nullcontext():
+                for course in self._provider.iter_courses(sorted(ids), workers):
+                    db.table('courses').upsert(
+                        dump(course), Query().id_ref == course.id_ref
+                    )
+                    courses.append(course)
+            self._drop_indexes()
+            print(str(len(courses)) + " Cursos salvos!")
             return courses
 
-    def get_orphan_courses(self) -> bool:
+    @staticmethod
+    def _referenced_codes(courses: Iterable[RequestedCourse]) -> set[str]:
+        candidate_code_courses = (chain(course.corequisites, course.prerequisites, course.equivalences) for course in courses)
+        chain_candidate_code_courses = (chain(*items) for items in candidate_code_courses)
+        literals = chain(*chain_candidate_code_courses)
+        # Literais "( ... )" são expressões grandes demais para a FND
+        return set(code for literal in literals
+                   for code in (formula_codes(literal) if is_formula(literal) else [literal.lstrip("¬")]))
+
+    def get_referenced_codes(self) -> set[str]:
+        with self.get_database() as db:
+            return self._referenced_codes(load_table(db, 'courses', RequestedCourse))
+
+    def warm_courses(self, codes: Iterable[str], workers: int = 4) -> int:
+        if self._session.login_status == LoginStatus.UNAUTHENTICATED:
+            raise ValueError("Not authenticated")
+        cache = self.get_cache()
+        # Só busca o que não está no cache ou já passou do TTL "soft"; a consulta
+        # não entra nas estatísticas do cache
+        pending = []
+        for code in sorted({code.strip().upper() for code in codes if code.strip()}):
+            entry = cache.peek(make_key("course", "code", code))
+            if entry is None or entry.stale:
+                pending.append(code)
+        print("Aquecendo o cache com " + str(len(pending)) + " Disciplinas...")
+        def fetch(provider: Provider, code: str) -> list[RequestedCourse]:
+            return provider.get_course_by_code(code)
+
+        warmed = 0
+        with self._provider_pool(fetch, workers) as pool:
+            for code in pending:
+                pool.submit(code)
+            for code, result in pool.results(self._provider.idle):
+                if isinstance(result, Exception):
+                    print("Falha ao buscar " + code + ": " + str(result))
+                    continue
+                warmed += 1
+        print("Cache aquecido: " + str(warmed) + " Disciplinas")
+        return warmed
+
+    @staticmethod
+    def _save_courses(db: TinyDB, courses: list[RequestedCourse]) -> None:
+        # Duas escritas no arquivo por lote, em vez de uma por Disciplina;
+        # a mesma Disciplina repetida no lote fica só com a última versão
+        unique = {course.id_ref: course for course in courses}
+        table = db.table('courses')
+        table.remove(Query().id_ref.one_of(list(unique)))
+        table.insert_multiple(dump(course) for course in unique.values())
+
+    def get_orphan_courses(self, workers: int = 4, batch_size: int = ORPHAN_BATCH_SIZE) -> bool:
         with self.get_database() as db:
             if self._session.login_status == LoginStatus.UNAUTHENTICATED:
                 raise ValueError("Not authenticated")
-            raw_saved_courses = db.table('courses').all()
-            saved_courses: list[RequestedCourse] = [cast(RequestedCourse, load(RequestedCourse, course)) for course in raw_saved_courses]
+            saved_courses = load_table(db, 'courses', RequestedCourse)
 
             saved_ccode_courses = set((course.code for course in saved_courses))
+            orphan_code_courses = sorted(self._referenced_codes(saved_courses) - saved_ccode_courses)
+            # Códigos já salvos ou já enfileirados nunca voltam para a fila
+            seen = saved_ccode_courses | set(orphan_code_courses)
+            print("Encontrando " + str(len(orphan_code_courses)) + " Cursos...")
 
-            candidate_code_courses = (chain(course.corequisites, course.prerequisites, course.equivalences) for course in saved_courses)
-            chain_candidate_code_courses = (chain(*items) for items in candidate_code_courses)
-
-            list_candidate_code_courses: list[str] = list(chain(*chain_candidate_code_courses))
-            set_candidate_code_courses: set[str] = set(list_candidate_code_courses)
+            def fetch(provider: Provider, code: str) -> list[RequestedCourse]:
+                return provider.get_course_by_code(code)
 
-            orphan_code_courses: list[str] = list(set_candidate_code_courses - saved_ccode_courses)
-            print("Encontrando " + str(len(orphan_code_courses)) + " Cursos...")
-            courses = []
-            for orphan_course in sorted(orphan_code_courses):
-                courses += self._provider.get_course_by_code(orphan_course)
-
-            for course in courses:
-                db.table('courses').upsert(
-                    dump(course), Query().id_ref == course.id_ref
-                )
+            # Busca em largura: as Disciplinas novas podem citar outros códigos
+            # ausentes, que entram na fila até não aparecer mais nenhum
+            batch: list[RequestedCourse] = []
+            saved = discovered = 0
+            with self._provider_pool(fetch, workers) as pool:
+                for code in orphan_code_courses:
+                    pool.submit(code)
+                for code, result in pool.results(self._provider.idle):
+                    if isinstance(result, Exception):
+                        print("Falha ao buscar " + code + ": " + str(result))
+                        continue
+                    # A busca pode trazer Disciplinas de outros códigos: não são buscadas de novo
+                    seen.update(course.code for course in result)
+                    for new_code in sorted(self._referenced_codes(result) - seen):
+                        seen.add(new_code)
+                        pool.submit(new_code)
+                        discovered += 1
+                    batch.extend(result)
+                    if len(batch) >= batch_size:
+                        self._save_courses(db, batch)
+                        saved += len(batch)
+                        batch = []
+            if batch:
+                self._save_courses(db, batch)
+                saved += len(batch)
+            print(str(saved) + " Disciplinas salvas (" + str(discovered) + " códigos descobertos pelo caminho)")
+            self._drop_indexes()
         return True
+
+    def _drop_indexes(self) -> None:
+        self._predicates = None
+        drop_index(index_path(self._provider.KEY))
+        drop_index(equivalence_path(self._provider.KEY))
+        drop_index(graph_path(self._provider.KEY))
+
+    def get_dependency_index(self, rebuild: bool = False) -> DependencyIndex:
+        # Montado a partir das Disciplinas salvas; descartado quando elas mudam
+        path = index_path(self._provider.KEY)
+        index = None if rebuild else load_index(path)
+        if index is None:
+            print("Montando o índice de pré-requisitos...")
+            with self.get_database() as db:
+                index = DependencyIndex.build(load_table(db, 'courses', RequestedCourse))
+            save_index(index, path)
+        return index
+
+    def get_equivalence_index(self, rebuild: bool = False) -> EquivalenceIndex:
+        path = equivalence_path(self._provider.KEY)
+        index = None if rebuild else load_equivalences(path)
+        if index is None:
+            print("Montando o índice de equivalências...")
+            with self.get_database() as db:
+                index = EquivalenceIndex.build(load_table(db, 'courses', RequestedCourse))
+            save_equivalences(index, path)
+        return index
+
+    def get_eligibility(self, program: DetailedProgram) -> Eligibility:
+        # Avaliador das Disciplinas do Curso, sobre os predicados compilados da sessão
+        return Eligibility.build(program.courses, self.get_dependency_index().clauses, self.get_predicates())
+
+    def get_predicates(self) -> Predicates:
+        # Um predicado compilado por Disciplina, guardado na sessão e
+        # compartilhado por get_eligibility e get_plan; cursar uma Disciplina
+        # equivalente conta como cursar a própria em todos eles
+        if self._predicates is None:
+            self._predicates = Predicates(self.get_dependency_index().clauses, self.get_equivalence_index().expand)
+        return self._predicates
+
+    def get_curriculum_graph(self, rebuild: bool = False) -> CurriculumGraph:
+        # numpy é opcional: só quem usa o grafo em CSR precisa dele
+        from .utils.csr import build_graph, load_graph, save_graph
+        path = graph_path(self._provider.KEY)
+        graph = None if rebuild else load_graph(path)
+        if graph is None:
+            print("Montando o grafo de pré-requisitos...")
+            with self.get_database() as db:
+                programs = load_table(db, 'programs', DetailedProgram)
+            graph = build_graph(self.get_dependency_index(rebuild=rebuild), programs)
+            save_graph(graph, path)
+        return graph
+
+    def get_saved_program(self, code: str) -> Optional[DetailedProgram]:
+        with self.get_database() as db:
+            programs = load_table(db, 'programs', DetailedProgram)
+        return next((program for program in programs if code in (program.code, program.id_ref)), None)
+
+    def get_plan(self, program: DetailedProgram, completed: Iterable[str], max_courses: int) -> Plan:
+        # Cursar uma Disciplina equivalente conta como cursar a própria
+        completed = self.get_equivalence_index().expand(completed)
+        return plan(program.courses, completed, self.get_dependency_index().clauses, max_courses, self.get_predicates())
@@ -1,50 +1,470 @@
 from __future__ import annotations
+import functools
+import json
 import os
-import shelve
-from typing import Any, Optional, TypeVar, TypedDict
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, NamedTuple, Optional, TypeVar
 
 from src.sigaa_cli.utils.config import DATA_PATH, get_config
 from src.sigaa_cli.utils.time import unix_seconds_dt
 
 T = TypeVar("T")
 
-
-class Value(TypedDict):
-    value: str
-    ttl: int
-
-
 CACHE_FOLDER = os.path.join(
     str(get_config(DATA_PATH, "/tmp/sigaa")),
     "cache",
 )
 
+# Limites padrão: camada em memória por número de entradas, disco por bytes
+MEMORY_ENTRIES = 512
+DISK_MAX_BYTES = 64 * 1024 * 1024
+COMPACT_INTERVAL = 5 * 60
+# Ao passar do limite numa escrita, libera até esta fração dele (evita aparar a cada escrita)
+TRIM_RATIO = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stale_at INTEGER,
+    expires_at INTEGER,
+    created_at INTEGER NOT NULL,
+    accessed_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS stats (
+    family TEXT PRIMARY KEY,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    evictions INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Faixas de idade (em segundos) usadas na distribuição de idade das entradas
+AGE_BUCKETS: list[tuple[str, Optional[int]]] = [
+    ("< 1h", 60 * 60),
+    ("< 1d", 60 * 60 * 24),
+    ("< 7d", 60 * 60 * 24 * 7),
+    ("< 30d", 60 * 60 * 24 * 30),
+    ("< 365d", 60 * 60 * 24 * 365),
+    (">= 365d", None),
+]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """TTLs de uma família de chaves, em segundos (``None`` nunca vence).
+
+    Depois de ``soft_ttl`` o valor continua sendo servido, mas é marcado como
+    velho para ser revalidado; depois de ``hard_ttl`` ele deixa de existir.
+    """
+
+    hard_ttl: Optional[int] = None
+    soft_ttl: Optional[int] = None
+
+
+class Entry(NamedTuple):
+    value: Any
+    stale: bool
+
+
+class FamilyStats(NamedTuple):
+    family: str
+    entries: int
+    size: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+def make_key(*parts: Any) -> str:
+    return ":".join(str(part) for part in parts)
+
+
+def key_family(key: str) -> str:
+    # "course:code:MATA37" -> "course:code"
+    family, _, _ = key.rpartition(":")
+    return family or key
+
+
+_HIT, _MISS, _EVICTION = 0, 1, 2
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _is_expired(expires_at: Optional[int], now: int) -> bool:
+    return expires_at is not None and expires_at <= now
+
+
+def _deadline(now: int, ttl: Optional[int]) -> Optional[int]:
+    return now + ttl if ttl is not None else None
+
+
+class Cache:
+    """Cache em duas camadas: LRU em memória na frente de um SQLite limitado em disco.
+
+    Os valores precisam ser serializáveis em JSON; a camada em memória guarda o
+    texto serializado, então quem lê sempre recebe uma cópia nova do valor.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        memory_entries: int = MEMORY_ENTRIES,
+        max_bytes: int = DISK_MAX_BYTES,
+        compact_interval: Optional[int] = COMPACT_INTERVAL,
+    ) -> None:
+        self._path = path
+        self._memory_entries = memory_entries
+        self._max_bytes = max_bytes
+        self._memory: OrderedDict[str, tuple[Optional[int], Optional[int], str]] = OrderedDict()
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(entries)")}
+        if "stale_at" not in columns:
+            self._db.execute("ALTER TABLE entries ADD COLUMN stale_at INTEGER")
+        (version,) = self._db.execute("PRAGMA user_version").fetchone()
+        if version < 1:
+            # Tamanhos antigos eram contados em caracteres; o limite é em bytes
+            self._db.execute("UPDATE entries SET size = length(CAST(key AS BLOB)) + length(CAST(value AS BLOB))")
+            self._db.execute("PRAGMA user_version = 1")
+        # Total em bytes acompanhado a cada escrita, para aplicar o limite sem esperar a compactação
+        self._size = self.size()
+        self._counters: dict[str, list[int]] = {}
+        self._closed = False
+        self._stop = threading.Event()
+        self._compactor: Optional[threading.Thread] = None
+        if compact_interval:
+            self._compactor = threading.Thread(
+                target=self._compact_loop, args=(compact_interval,), name="sigaa-cache-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _count(self, key: str, kind: int, amount: int = 1) -> None:
+        counters = self._counters.setdefault(key_family(key), [0, 0, 0])
+        counters[kind] += amount
+
+    def _flush_counters(self) -> None:
+        counters, self._counters = self._counters, {}
+        self._db.executemany(
+            "INSERT INTO stats (family, hits, misses, evictions) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(family) DO UPDATE SET hits = hits + excluded.hits, "
+            "misses = misses + excluded.misses, evictions = evictions + excluded.evictions",
+            [(family, hits, misses, evictions) for family, (hits, misses, evictions) in counters.items()],
+        )
+
+    def _remember(self, key: str, stale_at: Optional[int], expires_at: Optional[int], raw: str) -> None:
+        self._memory[key] = (stale_at, expires_at, raw)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_entry(self, key: str) -> Optional[Entry]:
+        now = unix_seconds_dt()
+        with self._lock:
+            memory_hit = self._memory.get(key)
+            if memory_hit is not None:
+                stale_at, expires_at, raw = memory_hit
+                if not _is_expired(expires_at, now):
+                    self._memory.move_to_end(key)
+                    self._count(key, _HIT)
+                    return Entry(json.loads(raw), _is_expired(stale_at, now))
+                self._memory.pop(key, None)
+
+            row = self._db.execute(
+                "SELECT value, stale_at, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._count(key, _MISS)
+                return None
+            raw, stale_at, expires_at = row
+            if _is_expired(expires_at, now):
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count(key, _EVICTION)
+                self._count(key, _MISS)
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._remember(key, stale_at, expires_at, raw)
+            self._count(key, _HIT)
+            return Entry(json.loads(raw), _is_expired(stale_at, now))
+
+    def peek(self, key: str) -> Optional[Entry]:
+        # Como get_entry, mas sem contar acerto/falta nem mexer na ordem de acesso
+        now = unix_seconds_dt()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is None:
+                hit = self._db.execute(
+                    "SELECT stale_at, expires_at, value FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+            if hit is None:
+                return None
+            stale_at, expires_at, raw = hit
+            if _is_expired(expires_at, now):
+                return None
+            return Entry(json.loads(raw), _is_expired(stale_at, now))
+
+    def get(self, key: str) -> Any:
+        entry = self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, soft_ttl: Optional[int] = None) -> None:
+        """Grava ``value`` sob ``key``; ``ttl`` em segundos (``None`` nunca expira)."""
+        now = unix_seconds_dt()
+        raw = _encode(value)
+        size = len(key.encode()) + len(raw.encode())
+        stale_at, expires_at = _deadline(now, soft_ttl), _deadline(now, ttl)
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, stale_at, expires_at, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, raw, size, stale_at, expires_at, now, now),
+            )
+            self._remember(key, stale_at, expires_at, raw)
+            self._size += size - (previous[0] if previous is not None else 0)
+            if self._size > self._max_bytes:
+                self.trim(int(self._max_bytes * TRIM_RATIO))
+
+    def set_with_policy(self, key: str, value: Any, policy: CachePolicy) -> None:
+        self.set(key, value, policy.hard_ttl, policy.soft_ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._size = self.size()
+
+    def evict_expired(self) -> int:
+        now = unix_seconds_dt()
+        with self._lock:
+            for key in [key for key, (_, expires_at, _) in self._memory.items() if _is_expired(expires_at, now)]:
+                self._memory.pop(key, None)
+            expired = [key for (key,) in self._db.execute(
+                "SELECT key FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            )]
+            for key in expired:
+                self._count(key, _EVICTION)
+            self._db.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            self._size = self.size()
+            return len(expired)
+
+    def size(self) -> int:
+        with self._lock:
+            (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+            return int(total)
+
+    def trim(self, max_bytes: Optional[int] = None) -> int:
+        """Remove as entradas acessadas há mais tempo até caber em ``max_bytes``."""
+        limit = self._max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._lock:
+            self._size = self.size()
+            excess = self._size - limit
+            if excess <= 0:
+                return 0
+            rows = self._db.execute("SELECT key, size FROM entries ORDER BY accessed_at, created_at")
+            victims: list[str] = []
+            for key, size in rows:
+                if excess <= 0:
+                    break
+                victims.append(key)
+                excess -= size
+            for key in victims:
+                self._memory.pop(key, None)
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._count(key, _EVICTION)
+                removed += 1
+            self._size = self.size()
+        return removed
+
+    def clear(self, prefix: str = "") -> int:
+        with self._lock:
+            for key in [key for key in self._memory if key.startswith(prefix)]:
+                self._memory.pop(key, None)
+            cursor = self._db.execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            if not prefix:
+                self._counters.clear()
+                self._db.execute("DELETE FROM stats")
+            self._size = self.size()
+            return cursor.rowcount
+
+    def disk_size(self) -> int:
+        paths = [self._path, self._path + "-wal", self._path + "-shm"]
+        return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+    def stats(self) -> list[FamilyStats]:
+        with self._lock:
+            self._flush_counters()
+            families: dict[str, list[int]] = {}
+            for family, hits, misses, evictions in self._db.execute("SELECT family, hits, misses, evictions FROM stats"):
+                families[family] = [0, 0, hits, misses, evictions]
+            for key, size in self._db.execute("SELECT key, size FROM entries"):
+                row = families.setdefault(key_family(key), [0, 0, 0, 0, 0])
+                row[0] += 1
+                row[1] += size
+            return [FamilyStats(family, *values) for family, values in sorted(families.items())]
+
+    def age_distribution(self) -> list[tuple[str, int]]:
+        now = unix_seconds_dt()
+        counts = [0] * len(AGE_BUCKETS)
+        with self._lock:
+            for (created_at,) in self._db.execute("SELECT created_at FROM entries"):
+                age = now - created_at
+                index = next(i for i, (_, limit) in enumerate(AGE_BUCKETS) if limit is None or age < limit)
+                counts[index] += 1
+        return [(label, count) for (label, _), count in zip(AGE_BUCKETS, counts)]
+
+    def compact(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self.evict_expired()
+            self.trim()
+            self._flush_counters()
+            (pages,) = self._db.execute("PRAGMA page_count").fetchone()
+            (free_pages,) = self._db.execute("PRAGMA freelist_count").fetchone()
+            # Só reescreve o arquivo quando há bastante espaço livre a recuperar
+            if pages and free_pages * 4 >= pages:
+                self._db.execute("VACUUM")
+
+    def _compact_loop(self, interval: int) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.compact()
+            except sqlite3.Error:
+                continue
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._stop.set()
+        if self._compactor is not None and self._compactor is not threading.current_thread():
+            self._compactor.join()
+        with self._lock:
+            try:
+                self.compact()
+            except sqlite3.Error:
+                pass
+            self._closed = True
+            self._memory.clear()
+            self._db.close()
+
+    def __enter__(self) -> Cache:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+_caches: dict[str, Cache] = {}
+_caches_lock = threading.Lock()
+
 
 def _cache_path(provider: str) -> str:
     os.makedirs(CACHE_FOLDER, exist_ok=True)
-    return os.path.join(CACHE_FOLDER, provider.lower())
-
-
-def get_cache(provider: str) -> shelve.Shelf[Any]:
-    path = _cache_path(provider)
-    return shelve.open(path, flag="c", writeback=False);
-
-def remove_value(cache_entry: shelve.Shelf[Any], key: str) -> bool:
-    cache_entry.pop(key, None)
-    return True
-
-def save_value(cache_entry: shelve.Shelf[Any], key: str, value: dict[str, Any], ttl: int = 0) -> bool:
-    cache_entry[key] = {
-        "ttl": unix_seconds_dt() + ttl,
-        "value": value,
-    }
-    return True
-
-def get_value(cache_entry: shelve.Shelf[Any], key: str) -> Any:
-     cached_value : Value | None = cache_entry.get(key)
-     if cached_value is None:
-         remove_value(cache_entry, key)
-         return None
-     if int(cached_value.get("ttl", 0)) <= unix_seconds_dt():
-         return None
-     return cached_value["value"]
+    return os.path.join(CACHE_FOLDER, provider.lower() + ".sqlite3")
+
+
+def get_cache(provider: str) -> Cache:
+    # Uma instância por provedor, para que a camada em memória seja compartilhada
+    with _caches_lock:
+        cache = _caches.get(provider)
+        if cache is None or cache._closed:
+            cache = Cache(_cache_path(provider))
+            _caches[provider] = cache
+        return cache
+
+
+class RefreshQueue:
+    """Fila de revalidações pendentes, executadas na thread dona do navegador.
+
+    A API síncrona do Playwright só pode ser usada pela thread que a criou, então
+    as revalidações não rodam numa thread própria: quem é dono do navegador
+    chama ``run_pending`` nos momentos ociosos da sessão (e, com limite, ao encerrá-la).
+    """
+
+    def __init__(self) -> None:
+        self._jobs: OrderedDict[str, Callable[[], None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._jobs.clear()
+
+    def schedule(self, key: str, job: Callable[[], None]) -> None:
+        with self._lock:
+            self._jobs.setdefault(key, job)
+
+    def run_pending(self, limit: Optional[int] = None) -> int:
+        done = 0
+        while limit is None or done < limit:
+            with self._lock:
+                if not self._jobs:
+                    break
+                key, job = self._jobs.popitem(last=False)
+            try:
+                job()
+            except Exception as e:
+                print("Falha ao revalidar " + key + ": " + str(e))
+            done += 1
+        return done
+
+
+def cached(
+    family: str,
+    policy: CachePolicy = CachePolicy(),
+    encode: Callable[[Any], Any] = lambda value: value,
+    decode: Callable[[Any], Any] = lambda value: value,
+    scoped: bool = False,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Cacheia o retorno de um método de ``Provider`` sob ``family:<args>``.
+
+    Com ``scoped`` a chave inclui a conta logada (``family:<conta>:<args>``),
+    para o que a página mostra de forma diferente a cada usuário.
+
+    Valores velhos (após ``policy.soft_ttl``) são devolvidos na hora e a
+    revalidação vai para a ``RefreshQueue`` do provedor.
+    ``encode``/``decode`` convertem o retorno de/para algo serializável em JSON.
+    """
+
+    def decorator(fn: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(fn)
+        def wrapper(self: Any, *args: Any) -> T:
+            cache: Cache = self.get_cache()
+            key = make_key(family, self.get_cache_scope(), *args) if scoped else make_key(family, *args)
+
+            def load() -> T:
+                value = fn(self, *args)
+                cache.set_with_policy(key, encode(value), policy)
+                return value
+
+            if self.is_cache_bypassed():
+                return load()
+            entry = cache.get_entry(key)
+            if entry is None:
+                return load()
+            if entry.stale:
+                self.get_refresh_queue().schedule(key, load)
+            return decode(entry.value)  # type: ignore[no-any-return]
+
+        return wrapper
+
+    return decorator
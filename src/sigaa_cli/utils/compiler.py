@@ -1,9 +1,14 @@
 # Converter expressão booleana para FND (Forma Normal Disjuntiva)
 # Suporta: ou/or/||/+ ; e/and/&&/* ; não/nao/not/!/~/¬ ; parênteses
 
+import functools
+import hashlib
 import re
+from multiprocessing.util import Finalize
 from dataclasses import dataclass
-from typing import List, Union, Iterable, Set, FrozenSet
+from typing import Callable, List, Optional, Tuple, Union, Iterable, Set, FrozenSet
+
+from src.sigaa_cli.utils.cache import Cache, _cache_path, make_key
 
 @dataclass(frozen=True)
 class Var:  name: str
@@ -34,7 +39,75 @@ def tokenize(s: str):
         yield (k, v.lower() if k in {"OR","AND","NOT"} else v)
     yield ("EOF","")
 
+# Precedência dos operadores binários; NOT é prefixo e liga mais que ambos
+_PRECEDENCE = {"OR": 1, "AND": 2, "NOT": 3}
+
 class Parser:
+    """Shunting-yard sobre os tokens de ``MASTER_RE``, sem recursão.
+
+    Lê os tokens conforme aparecem (sem montar a lista) e gera a mesma árvore
+    do ``RecursiveParser``, com ``E``/``OU`` aninhados achatados, em tempo
+    linear e sem limite de profundidade.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def parse(self) -> Node:
+        output: List[Node] = []
+        operators: List[str] = []
+        push, pop = output.append, output.pop
+
+        def apply(operator: str) -> None:
+            if operator == "NOT":
+                push(Not(pop())); return
+            rhs = pop(); lhs = output[-1]
+            cls = Or if operator == "OR" else And
+            # Os nós são desta análise: estender o E/OU da esquerda no lugar
+            # deixa "A OU B OU ... OU Z" linear, sem recriar a lista a cada operando
+            if isinstance(lhs, cls):
+                items = lhs.items
+            else:
+                items = [lhs]; output[-1] = cls(items)
+            if isinstance(rhs, cls): items.extend(rhs.items)
+            else: items.append(rhs)
+
+        # Alterna entre esperar um operando (código, NOT, "(") e um operador
+        operand = True
+        for match in MASTER_RE.finditer(self.text):
+            kind = match.lastgroup
+            if kind == "WS":
+                continue
+            if operand:
+                if kind == "IDENT":
+                    push(Var(match.group())); operand = False
+                elif kind == "NOT" or kind == "LPAREN":
+                    operators.append(kind)
+                else:
+                    raise SyntaxError(f"Fator inesperado: {(kind, match.group())} to {self.text}")
+            elif kind == "OR" or kind == "AND":
+                precedence = _PRECEDENCE[kind]
+                while operators and operators[-1] != "LPAREN" and _PRECEDENCE[operators[-1]] >= precedence:
+                    apply(operators.pop())
+                operators.append(kind); operand = True
+            elif kind == "RPAREN":
+                while operators and operators[-1] != "LPAREN":
+                    apply(operators.pop())
+                if not operators: raise SyntaxError("Sobrou texto após a expressão.")
+                operators.pop()
+            else:
+                raise SyntaxError("Sobrou texto após a expressão.")
+        if operand:
+            raise SyntaxError(f"Fator inesperado: ('EOF', '') to {self.text}")
+        while operators:
+            operator = operators.pop()
+            if operator == "LPAREN": raise SyntaxError("Esperado RPAREN, encontrei ('EOF', '')")
+            apply(operator)
+        return output[0]
+
+class RecursiveParser:
+    # Descendente recursivo original: referência para o Parser iterativo
+
     def __init__(self, text: str):
         self.text = text
         self.toks = list(tokenize(text));
@@ -84,13 +157,43 @@ def _flatten_and(a: Node, b: Node) -> List[Node]:
     for x in (a,b): xs.extend(x.items) if isinstance(x, And) else xs.append(x)
     return xs
 
-def to_nnf(node: Node, neg=False) -> Node:
+def to_nnf(node: Node, neg: bool = False) -> Node:
+    # Pilha explícita: (nó, negado, filhos já convertidos); um nó E/OU sai da
+    # pilha quando todos os filhos foram convertidos
+    stack: List[Tuple[Union[And, Or], bool, List[Node]]] = []
+    result: Optional[Node] = None
+    while True:
+        while isinstance(node, Not): node, neg = node.child, not neg
+        if isinstance(node, Var):
+            result = Not(node) if neg else node
+        elif isinstance(node, (And, Or)):
+            if node.items:
+                stack.append((node, neg, [])); node = node.items[0]; continue
+            result = _switch(node, neg, [])
+        else:
+            raise TypeError
+        while stack:
+            parent, parent_neg, done = stack[-1]
+            done.append(result)
+            if len(done) < len(parent.items):
+                node, neg = parent.items[len(done)], parent_neg
+                break
+            stack.pop(); result = _switch(parent, parent_neg, done)
+        else:
+            return result
+
+def _switch(node: Union[And, Or], neg: bool, items: List[Node]) -> Node:
+    # De Morgan: negar um E vira OU dos negados e vice-versa
+    return (Or(items) if neg else And(items)) if isinstance(node, And) else (And(items) if neg else Or(items))
+
+def to_nnf_recursive(node: Node, neg: bool = False) -> Node:
+    # Versão recursiva original: referência para o to_nnf iterativo
     if isinstance(node, Var): return Not(node) if neg else node
-    if isinstance(node, Not): return to_nnf(node.child, not neg)
+    if isinstance(node, Not): return to_nnf_recursive(node.child, not neg)
     if isinstance(node, And):
-        ch=[to_nnf(c,neg) for c in node.items]; return Or(ch) if neg else And(ch)
+        ch=[to_nnf_recursive(c,neg) for c in node.items]; return Or(ch) if neg else And(ch)
     if isinstance(node, Or):
-        ch=[to_nnf(c,neg) for c in node.items]; return And(ch) if neg else Or(ch)
+        ch=[to_nnf_recursive(c,neg) for c in node.items]; return And(ch) if neg else Or(ch)
     raise TypeError
 
 def _contradiction(lits: Iterable[str]) -> bool:
@@ -117,9 +220,290 @@ def dnf(node: Node) -> Set[FrozenSet[str]]:
         return acc
     raise TypeError("AST fora de NNF ao gerar FND")
 
-def fnd_array(expr: str):
-    terms = dnf(to_nnf(Parser(expr).parse()))
-    def keylit(l): return (l.startswith("¬"), l.lstrip("¬"))
-    out = [sorted(list(t), key=keylit) for t in terms]
-    out.sort(key=lambda xs: (len(xs), [x.lstrip("¬") for x in xs]))
-    return out
+# FND em bits: cada variável recebe um índice i; o literal positivo é o bit 2i
+# e o negado o bit 2i+1. Uma cláusula é a máscara dos seus literais.
+MAX_CLAUSES = 4096
+
+class ClauseLimitExceeded(ValueError):
+    pass
+
+class Literals:
+    def __init__(self) -> None:
+        self.index: dict[str, int] = {}
+        self.names: List[str] = []
+
+    def bit(self, name: str, negated: bool = False) -> int:
+        i = self.index.get(name)
+        if i is None:
+            i = self.index[name] = len(self.names); self.names.append(name)
+        return 1 << (2 * i + negated)
+
+    def evens(self) -> int:
+        # Máscara dos bits positivos: 0b0101...01
+        return int("01" * len(self.names), 2) if self.names else 0
+
+    def clause(self, mask: int) -> List[str]:
+        out = []
+        while mask:
+            low = mask & -mask; p = low.bit_length() - 1; mask ^= low
+            out.append(("¬" if p & 1 else "") + self.names[p >> 1])
+        return out
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+def _support(clauses: Iterable[int], evens: int) -> int:
+    # Variáveis usadas (no bit positivo de cada uma), com ou sem negação
+    mask = 0
+    for c in clauses: mask |= c
+    return (mask | (mask >> 1)) & evens
+
+def absorb(clauses: Iterable[int]) -> List[int]:
+    # Absorção: A ∨ (A ∧ B) = A, então some toda cláusula que contém outra
+    kept: List[int] = []
+    for c in sorted(set(clauses), key=_popcount):
+        if not any(k & c == k for k in kept): kept.append(c)
+    return kept
+
+def _leaf_bits(node: Node, lits: Literals) -> Optional[List[int]]:
+    if isinstance(node, Var): return [lits.bit(node.name)]
+    if isinstance(node, Not) and isinstance(node.child, Var): return [lits.bit(node.child.name, True)]
+    return None
+
+class _Frame:
+    # Um E/OU em andamento: combina cada filho assim que a FND dele fica pronta
+    __slots__ = ("items", "conjunction", "next", "acc", "support")
+
+    def __init__(self, node: Node) -> None:
+        if not isinstance(node, (And, Or)): raise TypeError("AST fora de NNF ao gerar FND")
+        self.items = node.items; self.conjunction = isinstance(node, And)
+        self.next = 0; self.acc: List[int] = [0] if self.conjunction else []; self.support = 0
+
+    def combine(self, rhs: List[int], lits: Literals, max_clauses: int) -> None:
+        if not self.conjunction:
+            self.acc.extend(rhs)
+            # Passou do limite: absorve já e, se ainda não couber, desiste sem esperar o finish
+            if len(self.acc) > max_clauses:
+                self.acc = absorb(self.acc)
+                if len(self.acc) > max_clauses:
+                    raise ClauseLimitExceeded(f"FND com mais de {max_clauses} cláusulas")
+            return
+        evens = lits.evens()
+        rhs_support = _support(rhs, evens)
+        if not self.support & rhs_support:
+            # Variáveis disjuntas: o produto de duas FNDs já absorvidas não
+            # tem contradições nem cláusulas que contenham outras
+            self.acc = [a | b for a in self.acc for b in rhs]
+        else:
+            merged = {a | b for a in self.acc for b in rhs}
+            self.acc = absorb(m for m in merged if not m & (m >> 1) & evens)
+        self.support |= rhs_support
+        # Já passou do limite: os filhos restantes nem são calculados
+        if len(self.acc) > max_clauses:
+            raise ClauseLimitExceeded(f"FND com mais de {max_clauses} cláusulas")
+
+    def finish(self, max_clauses: int) -> List[int]:
+        acc = self.acc if self.conjunction else absorb(self.acc)
+        if len(acc) > max_clauses:
+            raise ClauseLimitExceeded(f"FND com mais de {max_clauses} cláusulas")
+        return acc
+
+def dnf_bits(node: Node, lits: Literals, max_clauses: int = MAX_CLAUSES) -> List[int]:
+    leaf = _leaf_bits(node, lits)
+    if leaf is not None: return leaf
+    frames = [_Frame(node)]
+    while True:
+        frame = frames[-1]
+        if frame.next < len(frame.items):
+            child = frame.items[frame.next]; frame.next += 1
+            rhs = _leaf_bits(child, lits)
+            if rhs is None:
+                frames.append(_Frame(child)); continue
+        else:
+            rhs = frame.finish(max_clauses); frames.pop()
+            if not frames: return rhs
+            frame = frames[-1]
+        frame.combine(rhs, lits, max_clauses)
+
+# Forma canônica dos operadores: expressões com os mesmos tokens compartilham
+# a compilação, qualquer que seja a grafia ("e", "and", "&&", ...)
+_CANONICAL = {"OR": "||", "AND": "&&", "NOT": "!"}
+
+def normalize(expr: str) -> str:
+    return " ".join(_CANONICAL.get(kind, value) for kind, value in tokenize(expr) if kind != "EOF")
+
+# Incrementar ao mudar a saída de fnd_array (invalida as compilações em disco)
+COMPILER_VERSION = 2
+COMPILE_CACHE_SIZE = 4096
+COMPILE_TTL = 60 * 60 * 24 * 365
+
+Compiled = Tuple[Tuple[str, ...], ...]
+
+# Cache em disco consultado quando a LRU em memória não tem a expressão
+_disk: Optional[Cache] = None
+
+def attach_cache(cache: Optional[Cache]) -> None:
+    global _disk
+    _disk = cache
+
+def attach_provider_cache(provider: str) -> None:
+    # Inicializador dos processos de parse: cada um abre sua própria conexão
+    # (a herdada do pai pelo fork não pode ser usada), sem compactador, e a
+    # fecha ao sair; o multiprocessing não roda o atexit nos filhos
+    cache = Cache(_cache_path(provider), compact_interval=None)
+    attach_cache(cache)
+    Finalize(cache, cache.close, exitpriority=0)
+
+def _keylit(l: str) -> Tuple[bool, str]: return (l.startswith("¬"), l.lstrip("¬"))
+
+def sort_clauses(terms: Iterable[Iterable[str]]) -> Compiled:
+    out = [sorted(t, key=_keylit) for t in terms]
+    out.sort(key=lambda xs: (len(xs), [x.lstrip("¬") for x in xs], xs))
+    return tuple(tuple(t) for t in out)
+
+# Quando a FND passa de max_clauses, a expressão fica como um único literal
+# "( ... )" com o texto normalizado, a ser avaliado como fórmula
+def is_formula(literal: str) -> bool:
+    return literal.startswith("(")
+
+def formula_codes(literal: str) -> List[str]:
+    return [value for kind, value in tokenize(literal) if kind == "IDENT"]
+
+def _compile_uncached(expr: str, max_clauses: int = MAX_CLAUSES) -> Compiled:
+    lits = Literals()
+    try:
+        clauses = dnf_bits(to_nnf(Parser(expr).parse()), lits, max_clauses)
+    except ClauseLimitExceeded:
+        return ((("( " + normalize(expr) + " )"),),)
+    return sort_clauses(lits.clause(c) for c in clauses)
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def compile_dnf(normalized: str, max_clauses: int = MAX_CLAUSES) -> Compiled:
+    disk = _disk
+    if disk is None:
+        return _compile_uncached(normalized, max_clauses)
+    text = str(COMPILER_VERSION) + "\0" + str(max_clauses) + "\0" + normalized
+    key = make_key("compile:dnf", hashlib.sha256(text.encode("utf-8")).hexdigest())
+    raw = disk.get(key)
+    if raw is not None:
+        return tuple(tuple(t) for t in raw)
+    compiled = _compile_uncached(normalized, max_clauses)
+    disk.set(key, compiled, COMPILE_TTL)
+    return compiled
+
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile_text(expr: str, max_clauses: int) -> Compiled:
+    # Texto idêntico dispensa até a tokenização da normalização
+    return compile_dnf(normalize(expr), max_clauses)
+
+def fnd_array(expr: str, max_clauses: int = MAX_CLAUSES) -> List[List[str]]:
+    return [list(t) for t in _compile_text(expr, max_clauses)]
+
+# Predicados compilados: cada código ganha um bit numa tabela compartilhada e
+# o histórico do aluno vira uma máscara; a FND de uma Disciplina vira uma
+# função Python gerada que só faz operações de bits sobre essa máscara
+Predicate = Callable[[int], bool]
+
+class Codes:
+    def __init__(self) -> None:
+        self.index: dict[str, int] = {}
+
+    def position(self, code: str) -> int:
+        found = self.index.get(code)
+        if found is None:
+            found = self.index[code] = len(self.index)
+        return found
+
+    def mask(self, completed: Iterable[str]) -> int:
+        # Registra também os códigos ainda desconhecidos: um predicado compilado
+        # depois pode citá-los e precisa encontrar o bit já ligado
+        mask = 0
+        for code in completed: mask |= 1 << self.position(code)
+        return mask
+
+def _formula_source(node: Node, codes: Codes) -> str:
+    if isinstance(node, Var): return f"m >> {codes.position(node.name)} & 1"
+    if isinstance(node, Not) and isinstance(node.child, Var): return f"not m >> {codes.position(node.child.name)} & 1"
+    if isinstance(node, And): return "(" + " and ".join(_formula_source(item, codes) for item in node.items) + ")"
+    if isinstance(node, Or): return "(" + " or ".join(_formula_source(item, codes) for item in node.items) + ")"
+    raise TypeError("AST fora de NNF ao gerar predicado")
+
+def formula_holds(node: Node, codes: Codes, mask: int) -> bool:
+    # Avaliação sem recursão, para fórmulas fundas demais para virar código
+    # (e para quem avalia fórmulas sem compilá-las, como Eligibility)
+    stack: List[Tuple[Union[And, Or], int, bool]] = []
+    while True:
+        if isinstance(node, Var): value = bool(mask >> codes.position(node.name) & 1)
+        elif isinstance(node, Not) and isinstance(node.child, Var): value = not mask >> codes.position(node.child.name) & 1
+        elif isinstance(node, (And, Or)) and node.items:
+            stack.append((node, 0, isinstance(node, And))); node = node.items[0]; continue
+        elif isinstance(node, (And, Or)): value = isinstance(node, And)
+        else: raise TypeError("AST fora de NNF ao gerar predicado")
+        while stack:
+            parent, position, conjunction = stack.pop()
+            # Curto-circuito: E falso ou OU verdadeiro decide o pai
+            if value != conjunction or position + 1 == len(parent.items): continue
+            stack.append((parent, position + 1, conjunction)); node = parent.items[position + 1]
+            break
+        else:
+            return value
+
+def compile_predicate(clauses: Iterable[Iterable[str]], codes: Codes) -> Predicate:
+    """Transforma uma FND (como a de ``fnd_array``) num teste sobre ``codes.mask(...)``.
+
+    Os códigos nunca entram no texto gerado, só os números dos bits. Fórmulas
+    fundas demais para o compilador do Python caem numa avaliação por pilha.
+    """
+    terms: List[str] = []
+    formulas: List[Node] = []
+    for clause in clauses:
+        positive = negative = 0
+        parts: List[str] = []
+        for literal in clause:
+            if is_formula(literal):
+                formula = to_nnf(Parser(literal).parse()); formulas.append(formula)
+                parts.append(f"f{len(formulas) - 1}(m)")
+            elif literal.startswith("¬"): negative |= 1 << codes.position(literal[1:])
+            else: positive |= 1 << codes.position(literal)
+        if positive: parts.insert(0, f"m & {positive} == {positive}")
+        if negative: parts.insert(1 if positive else 0, f"not m & {negative}")
+        terms.append("(" + " and ".join(parts) + ")" if parts else "True")
+    if not terms:
+        return lambda mask: True
+    namespace: dict[str, object] = {}
+    for number, formula in enumerate(formulas):
+        try:
+            namespace[f"f{number}"] = eval(compile("lambda m: " + _formula_source(formula, codes), "<predicado>", "eval"))
+        except (SyntaxError, RecursionError, MemoryError):
+            namespace[f"f{number}"] = functools.partial(formula_holds, formula, codes)
+    return eval(compile("lambda m: " + " or ".join(terms), "<predicado>", "eval"), namespace)  # type: ignore[no-any-return]
+
+class Predicates:
+    """Predicados compilados por Disciplina, montados na primeira consulta e guardados.
+
+    ``satisfied(code, mask)`` responde se um histórico (``mask(completed)``)
+    cumpre os pré-requisitos de ``code``. Com ``expand`` (ex.: o índice de
+    equivalências) o histórico é completado antes de virar máscara.
+    """
+
+    def __init__(self, requisites: Callable[[str], Iterable[Iterable[str]]],
+                 expand: Optional[Callable[[Iterable[str]], Iterable[str]]] = None) -> None:
+        self.codes = Codes()
+        self._requisites = requisites
+        self._expand = expand
+        self._compiled: dict[str, Predicate] = {}
+
+    def __call__(self, code: str) -> Predicate:
+        predicate = self._compiled.get(code)
+        if predicate is None:
+            predicate = self._compiled[code] = compile_predicate(self._requisites(code), self.codes)
+        return predicate
+
+    def expand(self, completed: Iterable[str]) -> Iterable[str]:
+        return self._expand(completed) if self._expand is not None else completed
+
+    def mask(self, completed: Iterable[str]) -> int:
+        return self.codes.mask(self.expand(completed))
+
+    def satisfied(self, code: str, mask: int) -> bool:
+        return self(code)(mask)
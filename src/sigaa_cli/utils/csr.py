@@ -0,0 +1,204 @@
+from __future__ import annotations
+import os
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+from src.sigaa_cli.models.program import DetailedProgram
+from src.sigaa_cli.utils.graph import DependencyIndex
+
+if TYPE_CHECKING:
+    from typing_extensions import TypeAlias
+
+# Alias explícito: sem o numpy instalado o mypy o trata como Any em vez de rejeitá-lo
+Array: TypeAlias = npt.NDArray[np.int64]
+
+
+class CurriculumGraph(NamedTuple):
+    """Grafo de pré-requisitos em CSR: os pré-requisitos diretos do nó i são
+    ``indices[indptr[i]:indptr[i + 1]]``. Os Cursos usam o mesmo formato:
+    as Disciplinas do Curso p são ``program_indices[program_indptr[p]:program_indptr[p + 1]]``.
+    """
+    codes: list[str]
+    indptr: Array
+    indices: Array
+    programs: list[str]
+    program_indptr: Array
+    program_indices: Array
+
+
+class Chain(NamedTuple):
+    program: str
+    length: int
+    path: list[str]
+    # Disciplinas em ciclo de pré-requisitos, fora da contagem
+    cyclic: int
+
+
+def _csr(rows: list[list[int]]) -> tuple[Array, Array]:
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in rows])
+    indices = np.fromiter((item for row in rows for item in row), dtype=np.int64, count=int(indptr[-1]))
+    return indptr, indices
+
+
+def build_graph(index: DependencyIndex, programs: Iterable[DetailedProgram]) -> CurriculumGraph:
+    programs = list(programs)
+    codes = sorted(set(index.nodes()) | {course.code for program in programs for course in program.courses})
+    position = {code: number for number, code in enumerate(codes)}
+    indptr, indices = _csr([sorted(position[item] for item in index.requires(code, transitive=False)) for code in codes])
+    program_indptr, program_indices = _csr([sorted({position[course.code] for course in program.courses})
+                                            for program in programs])
+    return CurriculumGraph(codes, indptr, indices, [program.code for program in programs], program_indptr, program_indices)
+
+
+def save_graph(graph: CurriculumGraph, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = path + ".tmp.npz"
+    np.savez_compressed(temporary, codes=np.array(graph.codes, dtype=str), indptr=graph.indptr, indices=graph.indices,
+                        programs=np.array(graph.programs, dtype=str), program_indptr=graph.program_indptr,
+                        program_indices=graph.program_indices)
+    os.replace(temporary, path)
+
+
+def load_graph(path: str) -> Optional[CurriculumGraph]:
+    try:
+        with np.load(path) as data:
+            return CurriculumGraph(data["codes"].tolist(), data["indptr"], data["indices"], data["programs"].tolist(),
+                                   data["program_indptr"], data["program_indices"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def select_programs(graph: CurriculumGraph, codes: Iterable[str]) -> CurriculumGraph:
+    # Mesmo grafo, só com os Cursos pedidos
+    wanted = set(codes)
+    chosen = [number for number, code in enumerate(graph.programs) if code in wanted]
+    program_indptr, program_indices = _csr([
+        graph.program_indices[graph.program_indptr[number]:graph.program_indptr[number + 1]].tolist() for number in chosen])
+    return graph._replace(programs=[graph.programs[number] for number in chosen], program_indptr=program_indptr,
+                          program_indices=program_indices)
+
+
+def _ranges(starts: Array, counts: Array) -> Array:
+    # Concatena os intervalos [start, start + count) sem laço em Python
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+
+
+def _layers(size: int, rows: Array, cols: Array) -> Array:
+    """Camada de cada nó: 1 + a maior camada dos pré-requisitos (0 = em ciclo).
+
+    Kahn por camadas, vetorizado: cada rodada libera de uma vez todos os nós
+    sem pré-requisito pendente e desconta as arestas deles com ``bincount``.
+    """
+    pending = np.bincount(rows, minlength=size)
+    layer = np.zeros(size, dtype=np.int64)
+    order = np.argsort(cols, kind="stable")
+    dependents, starts = rows[order], np.searchsorted(cols[order], np.arange(size + 1))
+    frontier = np.flatnonzero(pending == 0)
+    depth = 0
+    while frontier.size:
+        depth += 1
+        layer[frontier] = depth
+        released = dependents[_ranges(starts[frontier], starts[frontier + 1] - starts[frontier])]
+        pending -= np.bincount(released, minlength=size)
+        candidates = np.unique(released)
+        frontier = candidates[pending[candidates] == 0]
+    return layer
+
+
+class _Members(NamedTuple):
+    # Nós (Curso, Disciplina), na ordem de program_indices, e as arestas entre
+    # Disciplinas do mesmo Curso: todos os Cursos são analisados de uma vez
+    program: Array
+    rows: Array
+    cols: Array
+    layer: Array
+
+
+def _members(graph: CurriculumGraph) -> _Members:
+    sizes = np.diff(graph.program_indptr)
+    program = np.repeat(np.arange(len(graph.programs)), sizes)
+    code = graph.program_indices
+    # Chave (Curso, Disciplina) já ordenada: Cursos em ordem e Disciplinas ordenadas em cada um
+    keys = program * len(graph.codes) + code
+    counts = graph.indptr[code + 1] - graph.indptr[code]
+    source = np.repeat(np.arange(len(code)), counts)
+    wanted = program[source] * len(graph.codes) + graph.indices[_ranges(graph.indptr[code], counts)]
+    found = np.minimum(np.searchsorted(keys, wanted), max(len(keys) - 1, 0))
+    inside = keys[found] == wanted if len(keys) else np.zeros(0, dtype=bool)
+    rows, cols = source[inside], found[inside]
+    return _Members(program, rows, cols, _layers(len(code), rows, cols))
+
+
+def _per_program(graph: CurriculumGraph, values: Array, reduce: np.ufunc) -> Array:
+    # reduceat por Curso; Cursos sem Disciplinas ficam com 0
+    sizes = np.diff(graph.program_indptr)
+    result = np.zeros(len(sizes), dtype=np.int64)
+    filled = sizes > 0
+    if values.size:
+        result[filled] = reduce.reduceat(values, graph.program_indptr[:-1][filled])
+    return result
+
+
+def longest_chains(graph: CurriculumGraph) -> list[Chain]:
+    # Maior cadeia de pré-requisitos entre as Disciplinas de cada Curso
+    members = _members(graph)
+    layer = members.layer
+    lengths = _per_program(graph, layer, np.maximum)
+    cyclic = _per_program(graph, (layer == 0).astype(np.int64), np.add)
+    order = np.argsort(members.rows, kind="stable")
+    rows, cols = members.rows[order], members.cols[order]
+    starts = np.searchsorted(rows, np.arange(len(layer) + 1))
+    chains = []
+    for number, program in enumerate(graph.programs):
+        path: list[str] = []
+        if lengths[number]:
+            begin, end = graph.program_indptr[number], graph.program_indptr[number + 1]
+            current = int(begin + np.argmax(layer[begin:end]))
+            # Volta pela cadeia: sempre há um pré-requisito na camada anterior
+            while True:
+                path.append(graph.codes[graph.program_indices[current]])
+                required = cols[starts[current]:starts[current + 1]]
+                previous = required[layer[required] == layer[current] - 1]
+                if not previous.size:
+                    break
+                current = int(previous[0])
+        chains.append(Chain(program, int(lengths[number]), path[::-1], int(cyclic[number])))
+    return chains
+
+
+def blocking(graph: CurriculumGraph) -> dict[str, int]:
+    """Quantas Disciplinas de algum Curso dependem (transitivamente) de cada uma, somando os Cursos.
+
+    Cada nó (Curso, Disciplina) guarda em bits as Disciplinas do seu Curso que
+    ele exige. As camadas são preenchidas em ordem, todos os Cursos juntos: os
+    bits de um nó são o OU dos bits dos seus pré-requisitos, incluindo eles
+    mesmos (``bitwise_or.reduceat``).
+    """
+    members = _members(graph)
+    size = len(members.program)
+    if not members.rows.size:
+        return {}
+    local = np.arange(size) - graph.program_indptr[members.program]
+    words = int(np.diff(graph.program_indptr).max() + 63) // 64
+    closed = np.zeros((size, words), dtype=np.uint64)
+    closed[np.arange(size), local // 64] = np.left_shift(np.uint64(1), (local % 64).astype(np.uint64))
+    reach = np.zeros_like(closed)
+    order = np.lexsort((members.cols, members.rows))
+    rows, cols = members.rows[order], members.cols[order]
+    for depth in range(2, int(members.layer.max()) + 1):
+        keep = members.layer[rows] == depth
+        layer_rows, layer_cols = rows[keep], cols[keep]
+        if not layer_rows.size:
+            continue
+        targets, starts = np.unique(layer_rows, return_index=True)
+        reach[targets] = np.bitwise_or.reduceat(closed[layer_cols], starts, axis=0)
+        closed[targets] |= reach[targets]
+    # Bit j de um nó do Curso p: ele exige a j-ésima Disciplina de p; somando por Curso, cada coluna conta os dependentes
+    bits = np.unpackbits(reach.view(np.uint8), axis=1, bitorder="little")
+    counts = np.add.reduceat(bits, graph.program_indptr[:-1][np.diff(graph.program_indptr) > 0], axis=0, dtype=np.int64)
+    dependents = counts[np.searchsorted(np.flatnonzero(np.diff(graph.program_indptr) > 0), members.program), local]
+    total = np.bincount(graph.program_indices, weights=dependents, minlength=len(graph.codes)).astype(np.int64)
+    return {graph.codes[node]: int(total[node]) for node in np.flatnonzero(total)}
@@ -1,8 +1,12 @@
 from __future__ import annotations
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field as PydanticField, ValidationError, create_model
+import functools
+import hashlib
+import json
 import os
 from typing import Any, List, Optional, NamedTuple, TypeVar
 from tinydb import TinyDB, Query
+from tinydb.storages import JSONStorage
 from src.sigaa_cli.utils.config import DATA_PATH, get_config
 
 # Arquivo temporário para persistência dos resultados do scraper (sempre TinyDB)
@@ -11,6 +15,10 @@ os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
 
 T = TypeVar("T")
 V = TypeVar("V")
+M = TypeVar("M", bound=BaseModel)
+
+# Tabela com a versão do esquema de cada tabela já validada
+META_TABLE = "_meta"
 
 DB_FOLDER = os.path.join(
     str(get_config(DATA_PATH, "/tmp/sigaa")),
@@ -25,4 +33,67 @@ def dump(model: BaseModel) -> dict[str, V]:
     return model.model_dump(mode="json")
 
 def load(cls: type[BaseModel], data: dict[T, V]) -> BaseModel:
-    return cls.model_validate(data)
\ No newline at end of file
+    return cls.model_validate(data)
+
+
+def schema_version(cls: type[BaseModel]) -> str:
+    return _schema_version(cls)
+
+
+@functools.lru_cache(maxsize=None)
+def _schema_version(cls: type[BaseModel]) -> str:
+    schema = json.dumps(cls.model_json_schema(), sort_keys=True)
+    return hashlib.sha256(schema.encode("utf-8")).hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=None)
+def _decoder(name: str, cls: type[BaseModel]) -> type[BaseModel]:
+    # Arquivo do TinyDB visto como {tabela: {doc_id: modelo}, _meta: {...}};
+    # as demais tabelas são ignoradas
+    return create_model(
+        "_" + name.capitalize() + "File",
+        __config__=ConfigDict(extra="ignore"),
+        rows=(dict[str, cls], PydanticField(default_factory=dict, alias=name)),  # type: ignore[valid-type]
+        meta=(dict[str, dict[str, Any]], PydanticField(default_factory=dict, alias=META_TABLE)),
+    )
+
+
+def _read_raw(db: TinyDB) -> Optional[str]:
+    storage = db.storage
+    if not isinstance(storage, JSONStorage):
+        return None
+    handle = storage._handle
+    handle.seek(0)
+    raw = handle.read()
+    return raw if isinstance(raw, str) and raw else None
+
+
+def _load_trusted(db: TinyDB, name: str, cls: type[M]) -> Optional[list[M]]:
+    raw = _read_raw(db)
+    if raw is None:
+        return None
+    try:
+        decoded = _decoder(name, cls).model_validate_json(raw)
+    except ValidationError:
+        return None
+    stamps = {row.get("table"): row.get("schema") for row in getattr(decoded, "meta").values()}
+    if stamps.get(name) != schema_version(cls):
+        return None
+    return list(getattr(decoded, "rows").values())
+
+
+def load_table(db: TinyDB, name: str, cls: type[M]) -> list[M]:
+    """Carrega a tabela ``name`` como ``cls``.
+
+    Tabelas já validadas com a versão atual do modelo são decodificadas direto
+    do arquivo JSON pelo pydantic-core, numa passada só. Na primeira leitura
+    depois de uma mudança no modelo, os registros passam pelo TinyDB e por
+    ``model_validate`` e a versão do esquema é registrada em ``_meta``.
+    """
+    models = _load_trusted(db, name, cls)
+    if models is not None:
+        return models
+    models = [cls.model_validate(row) for row in db.table(name).all()]
+    if models:
+        db.table(META_TABLE).upsert({"table": name, "schema": schema_version(cls)}, Query().table == name)
+    return models
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from typing import Callable, Iterable, NamedTuple, Optional, Sequence
+
+from src.sigaa_cli.models.course import AnchoredCourse
+from src.sigaa_cli.utils.compiler import Node, Parser, Predicates, formula_codes, formula_holds, is_formula, to_nnf
+
+Requisites = Callable[[str], list[list[str]]]
+
+
+class Clause(NamedTuple):
+    # Máscaras sobre a tabela de códigos; fórmulas são literais "( ... )" grandes demais para a FND
+    positive: int
+    negative: int
+    formulas: tuple[Node, ...]
+
+
+class Eligibility:
+    """Quais Disciplinas de um Curso cada aluno já pode cursar.
+
+    Usa a tabela de códigos e os predicados compilados de ``Predicates``
+    (compartilháveis entre avaliadores): para um aluno, o histórico vira uma
+    máscara e cada Disciplina é testada pelo seu predicado. ``eligible_batch``
+    inverte o arranjo: cada cláusula da FND vira um par de máscaras (códigos
+    exigidos, códigos que não podem ter sido cursados), cada código guarda a
+    máscara dos alunos que o cursaram e cada cláusula é avaliada para todos
+    de uma vez.
+    """
+
+    def __init__(self, courses: Sequence[AnchoredCourse], predicates: Predicates,
+                 clauses: Sequence[tuple[Clause, ...]]) -> None:
+        self._courses = courses
+        self._codes = predicates.codes
+        self._expand = predicates.expand
+        self._tests = [predicates(course.code) for course in courses]
+        self._own = [self._codes.position(course.code) for course in courses]
+        self._positions = [tuple((_bits(clause.positive), _bits(clause.negative), clause.formulas) for clause in items)
+                           for items in clauses]
+
+    @classmethod
+    def build(cls, courses: Iterable[AnchoredCourse], requisites: Requisites,
+              predicates: Optional[Predicates] = None) -> Eligibility:
+        courses = list(courses)
+        predicates = predicates or Predicates(requisites)
+        codes = predicates.codes
+
+        def bit(code: str) -> int:
+            return 1 << codes.position(code)
+
+        compiled: list[tuple[Clause, ...]] = []
+        for course in courses:
+            bit(course.code)
+            clauses = []
+            for clause in requisites(course.code):
+                positive = negative = 0
+                formulas: list[Node] = []
+                for literal in clause:
+                    if is_formula(literal):
+                        formulas.append(to_nnf(Parser(literal).parse()))
+                        for code in formula_codes(literal):
+                            bit(code)
+                    elif literal.startswith("¬"):
+                        negative |= bit(literal[1:])
+                    else:
+                        positive |= bit(literal)
+                clauses.append(Clause(positive, negative, tuple(formulas)))
+            compiled.append(tuple(clauses))
+        return cls(courses, predicates, compiled)
+
+    def mask(self, completed: Iterable[str]) -> int:
+        # Só os códigos já na tabela: os demais não aparecem em nenhuma cláusula
+        mask = 0
+        for code in self._expand(completed):
+            position = self._codes.index.get(code)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def eligible(self, completed: Iterable[str]) -> list[AnchoredCourse]:
+        done = self.mask(completed)
+        return [course for course, own, test in zip(self._courses, self._own, self._tests)
+                if not done >> own & 1 and test(done)]
+
+    def eligible_batch(self, students: Sequence[Iterable[str]]) -> list[list[AnchoredCourse]]:
+        everyone = (1 << len(students)) - 1
+        masks = [self.mask(completed) for completed in students]
+        # Máscara de alunos por código
+        taken = [0] * len(self._codes.index)
+        for student, mask in enumerate(masks):
+            for position in _bits(mask):
+                taken[position] |= 1 << student
+
+        found: list[list[AnchoredCourse]] = [[] for _ in students]
+        for course, own, clauses in zip(self._courses, self._own, self._positions):
+            if clauses:
+                allowed = 0
+                for positive, negative, formulas in clauses:
+                    satisfied = everyone
+                    for position in positive:
+                        satisfied &= taken[position]
+                    for position in negative:
+                        satisfied &= ~taken[position]
+                    # Fórmulas são raras: avaliadas (sem recursão) só para quem ainda passa
+                    for formula in formulas:
+                        for student in _bits(satisfied):
+                            if not formula_holds(formula, self._codes, masks[student]):
+                                satisfied &= ~(1 << student)
+                    allowed |= satisfied
+            else:
+                allowed = everyone
+            allowed &= ~taken[own]
+            for student in _bits(allowed):
+                found[student].append(course)
+        return found
+
+
+def _bits(mask: int) -> list[int]:
+    # Posições dos bits ligados; o texto binário evita operações em inteiros grandes
+    return [position for position, digit in enumerate(reversed(bin(mask)[2:])) if digit == "1"]
+
@@ -0,0 +1,120 @@
+from __future__ import annotations
+import json
+import os
+from typing import Any, Iterable, Optional
+
+from src.sigaa_cli.models.course import RequestedCourse
+from src.sigaa_cli.utils.compiler import is_formula
+from src.sigaa_cli.utils.database import DB_FOLDER
+from src.sigaa_cli.utils.graph import write_json
+
+# Incrementar ao mudar o formato salvo (índices antigos são reconstruídos)
+EQUIVALENCE_VERSION = 1
+
+
+def equivalence_path(provider: str) -> str:
+    return os.path.join(DB_FOLDER, provider.lower() + ".equiv.json")
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: list[int] = []
+        self.size: list[int] = []
+
+    def add(self) -> int:
+        self.parent.append(len(self.parent))
+        self.size.append(1)
+        return len(self.parent) - 1
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        while parent[node] != node:
+            # Compressão por divisão: cada nó passa a apontar para o avô
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, first: int, second: int) -> None:
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return
+        if self.size[first] < self.size[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.size[first] += self.size[second]
+
+
+class EquivalenceIndex:
+    """Classes de Disciplinas equivalentes entre si.
+
+    Só as cláusulas de equivalência com um único código valem nos dois
+    sentidos ("A equivale a B"); as com vários códigos ("A equivale a B e C")
+    não entram. As classes são montadas com union-find e salvas já achatadas:
+    cada código aponta direto para o representante (o menor código da classe).
+    """
+
+    def __init__(self, canonical: dict[str, str]) -> None:
+        self._canonical = canonical
+        self._members: dict[str, list[str]] = {}
+        for code, root in sorted(canonical.items()):
+            self._members.setdefault(root, []).append(code)
+
+    @classmethod
+    def build(cls, courses: Iterable[RequestedCourse]) -> EquivalenceIndex:
+        sets = _UnionFind()
+        position: dict[str, int] = {}
+
+        def node(code: str) -> int:
+            found = position.get(code)
+            if found is None:
+                found = position[code] = sets.add()
+            return found
+
+        for course in courses:
+            for clause in course.equivalences:
+                if len(clause) == 1 and not is_formula(clause[0]) and not clause[0].startswith("¬"):
+                    sets.union(node(course.code), node(clause[0]))
+
+        roots: dict[int, str] = {}
+        for code in sorted(position):
+            roots.setdefault(sets.find(position[code]), code)
+        canonical = {code: roots[sets.find(number)] for code, number in position.items()}
+        # Classes de um só código não precisam ser guardadas
+        return cls({code: root for code, root in canonical.items() if sets.size[sets.find(position[code])] > 1})
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def find(self, code: str) -> str:
+        return self._canonical.get(code, code)
+
+    def members(self, code: str) -> list[str]:
+        return self._members.get(self.find(code), [code])
+
+    def canonicalize(self, codes: Iterable[str]) -> set[str]:
+        return {self.find(code) for code in codes}
+
+    def expand(self, codes: Iterable[str]) -> set[str]:
+        # Tudo o que conta como cursado: cada código e os equivalentes a ele
+        return {member for code in codes for member in self.members(code)}
+
+    def to_json(self) -> dict[str, Any]:
+        return {"version": EQUIVALENCE_VERSION, "canonical": self._canonical}
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> Optional[EquivalenceIndex]:
+        if data.get("version") != EQUIVALENCE_VERSION:
+            return None
+        return cls(data["canonical"])
+
+
+def save_equivalences(index: EquivalenceIndex, path: str) -> None:
+    write_json(index.to_json(), path)
+
+
+def load_equivalences(path: str) -> Optional[EquivalenceIndex]:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return EquivalenceIndex.from_json(json.load(handle))
+    except (OSError, ValueError, KeyError):
+        return None
@@ -0,0 +1,219 @@
+from __future__ import annotations
+import json
+import os
+from typing import Any, Iterable, Optional
+
+from src.sigaa_cli.models.course import RequestedCourse
+from src.sigaa_cli.utils.compiler import formula_codes, is_formula
+from src.sigaa_cli.utils.database import DB_FOLDER
+
+# Incrementar ao mudar o formato salvo (índices antigos são reconstruídos)
+INDEX_VERSION = 1
+
+
+def index_path(provider: str) -> str:
+    return os.path.join(DB_FOLDER, provider.lower() + ".deps.json")
+
+
+def graph_path(provider: str) -> str:
+    # Exportação CSR (utils/csr.py), descartada junto com o índice
+    return os.path.join(DB_FOLDER, provider.lower() + ".graph.npz")
+
+
+def literal_codes(literal: str) -> list[str]:
+    # Códigos exigidos por um literal; negações não são pré-requisitos
+    if is_formula(literal):
+        return formula_codes(literal)
+    return [] if literal.startswith("¬") else [literal]
+
+
+def _strongly_connected(nodes: int, edges: list[list[int]]) -> list[list[int]]:
+    # Tarjan iterativo: devolve as componentes com as sucessoras antes das antecessoras
+    index = [-1] * nodes
+    low = [0] * nodes
+    on_stack = [False] * nodes
+    stack: list[int] = []
+    components: list[list[int]] = []
+    counter = 0
+    for root in range(nodes):
+        if index[root] != -1:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, position = work.pop()
+            if position == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            recurse = False
+            for next_position in range(position, len(edges[node])):
+                target = edges[node][next_position]
+                if index[target] == -1:
+                    work.append((node, next_position + 1))
+                    work.append((target, 0))
+                    recurse = True
+                    break
+                if on_stack[target]:
+                    low[node] = min(low[node], index[target])
+            if recurse:
+                continue
+            if low[node] == index[node]:
+                component: list[int] = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == node:
+                        break
+                components.append(component)
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+    return components
+
+
+def _closure(nodes: int, edges: list[list[int]]) -> list[int]:
+    """Fecho transitivo como bitsets: bit j de ``result[i]`` indica que i alcança j."""
+    components = _strongly_connected(nodes, edges)
+    owner = [0] * nodes
+    for number, component in enumerate(components):
+        for node in component:
+            owner[node] = number
+    reach = [0] * len(components)
+    for number, component in enumerate(components):
+        mask = 0
+        for node in component:
+            for target in edges[node]:
+                if owner[target] != number:
+                    mask |= reach[owner[target]] | (1 << target)
+        if len(component) > 1:
+            # Ciclo: cada membro alcança todos os outros
+            for node in component:
+                mask |= 1 << node
+        reach[number] = mask
+    return [reach[owner[node]] & ~(1 << node) for node in range(nodes)]
+
+
+class DependencyIndex:
+    """Grafo de pré-requisitos das Disciplinas salvas, com fecho transitivo.
+
+    ``requires(code)`` é o que ``code`` exige (direta ou transitivamente) e
+    ``unlocks(code)`` o que depende dele. As consultas só leem listas já
+    calculadas; o índice é montado uma vez e salvo ao lado do banco.
+    """
+
+    def __init__(
+        self,
+        clauses: dict[str, list[list[str]]],
+        direct: dict[str, list[str]],
+        closure: dict[str, list[str]],
+        unlocks_direct: dict[str, list[str]],
+        unlocks_closure: dict[str, list[str]],
+    ) -> None:
+        self._clauses = clauses
+        self._direct = direct
+        self._closure = closure
+        self._unlocks_direct = unlocks_direct
+        self._unlocks_closure = unlocks_closure
+
+    @classmethod
+    def build(cls, courses: Iterable[RequestedCourse]) -> DependencyIndex:
+        clauses: dict[str, list[list[str]]] = {}
+        for course in courses:
+            known = clauses.setdefault(course.code, [])
+            # Mesmo código em mais de uma Disciplina: qualquer uma das FNDs serve
+            known.extend(clause for clause in course.prerequisites if clause not in known)
+
+        codes = sorted(set(clauses) | {code for items in clauses.values() for clause in items
+                                       for literal in clause for code in literal_codes(literal)})
+        position = {code: number for number, code in enumerate(codes)}
+        edges: list[list[int]] = [[] for _ in codes]
+        for code, items in clauses.items():
+            targets = {position[required] for clause in items for literal in clause
+                       for required in literal_codes(literal) if required != code}
+            edges[position[code]] = sorted(targets)
+        reverse: list[list[int]] = [[] for _ in codes]
+        for source, successors in enumerate(edges):
+            for target in successors:
+                reverse[target].append(source)
+
+        def names(mask: int) -> list[str]:
+            found = []
+            while mask:
+                low = mask & -mask
+                found.append(codes[low.bit_length() - 1])
+                mask ^= low
+            return found
+
+        closure, unlocks_closure = _closure(len(codes), edges), _closure(len(codes), reverse)
+        return cls(
+            clauses,
+            {code: [codes[target] for target in edges[number]] for number, code in enumerate(codes) if edges[number]},
+            {code: names(closure[number]) for number, code in enumerate(codes) if closure[number]},
+            {code: [codes[source] for source in reverse[number]] for number, code in enumerate(codes) if reverse[number]},
+            {code: names(unlocks_closure[number]) for number, code in enumerate(codes) if unlocks_closure[number]},
+        )
+
+    def __contains__(self, code: object) -> bool:
+        return code in self._clauses or code in self._unlocks_direct
+
+    def __len__(self) -> int:
+        return len(self._clauses)
+
+    def nodes(self) -> list[str]:
+        # Disciplinas salvas e códigos citados nos pré-requisitos delas
+        return sorted(set(self._clauses) | set(self._unlocks_direct))
+
+    def clauses(self, code: str) -> list[list[str]]:
+        return self._clauses.get(code, [])
+
+    def requires(self, code: str, transitive: bool = True) -> list[str]:
+        return (self._closure if transitive else self._direct).get(code, [])
+
+    def unlocks(self, code: str, transitive: bool = True) -> list[str]:
+        return (self._unlocks_closure if transitive else self._unlocks_direct).get(code, [])
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "version": INDEX_VERSION,
+            "clauses": self._clauses,
+            "direct": self._direct,
+            "closure": self._closure,
+            "unlocks_direct": self._unlocks_direct,
+            "unlocks_closure": self._unlocks_closure,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> Optional[DependencyIndex]:
+        if data.get("version") != INDEX_VERSION:
+            return None
+        return cls(data["clauses"], data["direct"], data["closure"], data["unlocks_direct"], data["unlocks_closure"])
+
+
+def write_json(data: Any, path: str) -> None:
+    # Grava num temporário e troca, para nunca deixar um índice pela metade
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+def save_index(index: DependencyIndex, path: str) -> None:
+    write_json(index.to_json(), path)
+
+
+def load_index(path: str) -> Optional[DependencyIndex]:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            return DependencyIndex.from_json(json.load(handle))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def drop_index(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import hashlib
+import re
+from typing import Any, Callable, Optional, TypeVar
+
+from src.sigaa_cli.utils.cache import Cache, make_key
+
+T = TypeVar("T")
+
+# Resultados são endereçados pelo conteúdo, então nunca ficam velhos; o TTL só
+# evita que páginas que sumiram do SIGAA ocupem o disco para sempre.
+PARSE_TTL = 60 * 60 * 24 * 90
+
+# Partes da página que mudam a cada requisição sem alterar o que extraímos
+_VOLATILE_RE = re.compile(
+    r'(name="javax\.faces\.ViewState"[^>]*?value=")[^"]*(")|(;jsessionid=)[^?"\'#]*',
+    re.IGNORECASE,
+)
+
+
+def _drop_volatile(match: re.Match[str]) -> str:
+    return "".join(group for group in match.groups() if group)
+
+
+def content_hash(html: str) -> str:
+    normalized = _VOLATILE_RE.sub(_drop_volatile, html)
+    return hashlib.sha256(normalized.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+class ParseMemo:
+    """Memoiza extratores por (nome, versão do extrator, hash do HTML).
+
+    Ao mudar a saída de um extrator, incremente sua versão para invalidar os
+    resultados antigos.
+    """
+
+    def __init__(self, cache: Cache, ttl: Optional[int] = PARSE_TTL) -> None:
+        self._cache = cache
+        self._ttl = ttl
+
+    def key(self, extractor: str, version: int, html: str) -> str:
+        return make_key("parse", extractor, "v" + str(version), content_hash(html))
+
+    def lookup(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    def store(self, key: str, value: Any) -> None:
+        self._cache.set(key, value, self._ttl)
+
+    def __call__(
+        self,
+        extractor: str,
+        version: int,
+        html: str,
+        parse: Callable[[], T],
+        encode: Callable[[T], Any] = lambda value: value,
+        decode: Callable[[Any], T] = lambda value: value,
+    ) -> T:
+        key = self.key(extractor, version, html)
+        raw = self.lookup(key)
+        if raw is not None:
+            return decode(raw)
+        value = parse()
+        self.store(key, encode(value))
+        return value
+
+
+def memoize(
+    memo: Optional[ParseMemo],
+    extractor: str,
+    version: int,
+    html: str,
+    parse: Callable[[], T],
+    encode: Callable[[T], Any] = lambda value: value,
+    decode: Callable[[Any], T] = lambda value: value,
+) -> T:
+    if memo is None:
+        return parse()
+    return memo(extractor, version, html, parse, encode, decode)
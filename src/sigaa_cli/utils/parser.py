@@ -1,7 +1,204 @@
+import re
+from html.entities import html5
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple
+
 from bs4 import BeautifulSoup
+from bs4.builder import HTMLTreeBuilder
 
 def strip_html_bs4(html: str) -> str:
     soup = BeautifulSoup(html, "html.parser")
     for s in soup(["script", "style"]):
         s.decompose()
     return soup.get_text(separator="\n", strip=True)
+
+
+# strip_html reproduz a saída de strip_html_bs4 sem montar a árvore do
+# BeautifulSoup: cada tag encerra um trecho de texto, trechos dentro de
+# script/style/template/rt/rp são descartados e o resultado é a junção por
+# "\n" dos trechos não vazios (após strip), como em get_text(strip=True).
+_BUILDER = HTMLTreeBuilder()
+_EMPTY_ELEMENTS = frozenset(_BUILDER.empty_element_tags or ())
+_HIDDEN_CONTAINERS = frozenset(_BUILDER.string_containers)
+
+# Caminho rápido: marcação "comportada", sem comentários/declarações, sem '<'
+# solto no texto, sem tags que escondem texto e só com as entidades que o
+# navegador emite ao serializar inner_html.
+# Referências de caractere como o BeautifulSoup as resolve, só com a
+# biblioteca padrão: entidades nomeadas do HTML5 (com ou sem ";"), e
+# numéricas com a troca dos controles C1 pelos caracteres do cp1252
+_ENTITIES = {name.rstrip(";"): value for name, value in html5.items()}
+_CP1252: dict[int, str] = {}
+for _code in range(0x80, 0xA0):
+    try:
+        _CP1252[_code] = bytes([_code]).decode("cp1252")
+    except UnicodeDecodeError:
+        pass
+_DECIMAL_REFERENCE_RE = re.compile("^([0-9]+)(.*)")
+_HEX_REFERENCE_RE = re.compile("^([0-9a-f]+)(.*)")
+
+
+def _numeric_reference(name: str) -> Tuple[str, str]:
+    # (caractere, texto que sobrou depois do número em referências sem ";")
+    base, pattern = (16, _HEX_REFERENCE_RE) if name[:1] in ("x", "X") else (10, _DECIMAL_REFERENCE_RE)
+    digits = name[1:] if base == 16 else name
+    try:
+        code, extra = int(digits, base), ""
+    except ValueError:
+        match = pattern.search(digits)
+        if match is None:
+            return "", digits
+        code, extra = int(match.group(1), base), match.group(2)
+    if code == 0 or code > 0x10FFFF or 0xD800 <= code <= 0xDFFF:
+        return "\ufffd", extra
+    return _CP1252.get(code) or chr(code), extra
+
+
+_FAST_TAG_RE = re.compile(
+    r"<(/?)([A-Za-z][A-Za-z0-9]*)"
+    r"(?:\s+[A-Za-z_:][-A-Za-z0-9_:.]*(?:\s*=\s*(?:\"[^\"]*\"|'[^']*'|[^\s\"'=<>`]+))?)*\s*/?>"
+)
+_FAST_ENTITY_RE = re.compile(r"&(amp|lt|gt|quot|nbsp);")
+_FAST_ENTITIES = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "nbsp": "\xa0"}
+_FAST_UNSAFE_TEXT_RE = re.compile(r"<|&(?!(?:amp|lt|gt|quot|nbsp);)")
+
+
+def _fast_entity(match: "re.Match[str]") -> str:
+    return _FAST_ENTITIES[match.group(1)]
+
+
+def _strip_html_fast(html: str) -> Optional[str]:
+    pieces: List[str] = []
+    position = 0
+    for match in _FAST_TAG_RE.finditer(html):
+        closing, name = match.group(1), match.group(2).lower()
+        if name in _HIDDEN_CONTAINERS or (closing and name in _EMPTY_ELEMENTS):
+            return None
+        pieces.append(html[position:match.start()])
+        position = match.end()
+    pieces.append(html[position:])
+
+    texts: List[str] = []
+    for piece in pieces:
+        if not piece:
+            continue
+        if _FAST_UNSAFE_TEXT_RE.search(piece):
+            return None
+        if "&" in piece:
+            piece = _FAST_ENTITY_RE.sub(_fast_entity, piece)
+        piece = piece.strip()
+        if piece:
+            texts.append(piece)
+    return "\n".join(texts)
+
+
+class _TextExtractor(HTMLParser):
+    # Emula o BeautifulSoupHTMLParser + BeautifulSoup.get_text sem criar nós
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=False)
+        self.texts: List[str] = []
+        self._data: List[str] = []
+        self._stack: List[str] = []
+        self._open: dict[str, int] = {}
+        self._hidden: List[int] = []
+        self._already_closed: List[str] = []
+
+    def _end_data(self, keep: bool = True) -> None:
+        if self._data:
+            text = "".join(self._data).strip()
+            self._data = []
+            if text and keep:
+                self.texts.append(text)
+
+    def _visible(self) -> bool:
+        return not self._hidden
+
+    def _push(self, tag: str) -> None:
+        self._stack.append(tag)
+        self._open[tag] = self._open.get(tag, 0) + 1
+        if tag in _HIDDEN_CONTAINERS:
+            self._hidden.append(len(self._stack))
+
+    def _pop_to(self, tag: str) -> None:
+        while self._stack and self._open.get(tag):
+            current = self._stack.pop()
+            self._open[current] -= 1
+            if self._hidden and self._hidden[-1] == len(self._stack) + 1:
+                self._hidden.pop()
+            if current == tag:
+                break
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._start(tag, handle_empty_element=True)
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self._start(tag, handle_empty_element=False)
+        self._end(tag, check_already_closed=False)
+
+    def _start(self, tag: str, handle_empty_element: bool) -> None:
+        self._end_data(self._visible())
+        self._push(tag)
+        if tag in _EMPTY_ELEMENTS and handle_empty_element:
+            self._end(tag, check_already_closed=False)
+            self._already_closed.append(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        self._end(tag, check_already_closed=True)
+
+    def _end(self, tag: str, check_already_closed: bool) -> None:
+        if check_already_closed and tag in self._already_closed:
+            self._already_closed.remove(tag)
+            return
+        self._end_data(self._visible())
+        self._pop_to(tag)
+
+    def handle_data(self, data: str) -> None:
+        self._data.append(data)
+
+    def handle_charref(self, name: str) -> None:
+        dereferenced, extra_data = _numeric_reference(name)
+        self._data.append(dereferenced)
+        self._data.append(extra_data)
+
+    def handle_entityref(self, name: str) -> None:
+        character = _ENTITIES.get(name)
+        self._data.append(character if character is not None else "&%s" % name)
+
+    def _special(self, data: str, keep: bool) -> None:
+        self._end_data(self._visible())
+        self._data.append(data)
+        self._end_data(keep)
+
+    def handle_comment(self, data: str) -> None:
+        self._special(data, keep=False)
+
+    def handle_decl(self, decl: str) -> None:
+        self._special(decl, keep=False)
+
+    def handle_pi(self, data: str) -> None:
+        self._special(data, keep=False)
+
+    def unknown_decl(self, data: str) -> None:
+        # CDATA continua visível no get_text, mesmo dentro de script/template
+        if data.upper().startswith("CDATA["):
+            self._special(data[len("CDATA["):], keep=True)
+        else:
+            self._special(data, keep=False)
+
+    def result(self) -> str:
+        self._end_data(self._visible())
+        return "\n".join(self.texts)
+
+
+def strip_html(html: str) -> str:
+    """Texto de ``html`` idêntico ao de ``strip_html_bs4``, sem montar a árvore."""
+    if "<" not in html and "&" not in html:
+        return html.strip()
+    text = _strip_html_fast(html)
+    if text is not None:
+        return text
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.result()
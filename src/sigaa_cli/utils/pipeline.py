@@ -0,0 +1,81 @@
+from __future__ import annotations
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, Callable, Generic, Iterable, Iterator, Optional, TypeVar, Union
+
+P = TypeVar("P")
+T = TypeVar("T")
+
+QUEUE_SIZE = 32
+
+
+class Done(Generic[T]):
+    """Resultado já pronto (ex.: vindo do cache), que não passa pela etapa de parse."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: T) -> None:
+        self.value = value
+
+
+class ParsePipeline(Generic[P, T]):
+    """Separa a busca (navegador) do parse (CPU) em processos.
+
+    ``run`` consome ``payloads`` na thread que chamou, que é a dona do
+    navegador, e envia cada HTML para ``parse`` num ``ProcessPoolExecutor``.
+    No máximo ``queue_size`` itens ficam em voo: com a fila cheia a busca
+    espera o parse mais antigo terminar. Os resultados saem na ordem de
+    entrada, para que quem consome monte os modelos e grave.
+
+    ``parse`` precisa ser uma função de módulo (o processo filho a importa);
+    ``initializer`` roda uma vez em cada processo criado pelo pipeline.
+    """
+
+    def __init__(
+        self,
+        parse: Callable[[P], T],
+        workers: Optional[int] = None,
+        queue_size: int = QUEUE_SIZE,
+        executor: Optional[Executor] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: tuple[Any, ...] = (),
+    ) -> None:
+        self._parse = parse
+        self._initializer = initializer
+        self._initargs = initargs
+        self._workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._queue_size = max(1, queue_size)
+        self._executor = executor
+
+    def run(self, payloads: Iterable[Union[P, Done[T]]]) -> Iterator[tuple[Union[P, Done[T]], Union[T, Exception]]]:
+        executor = self._executor or ProcessPoolExecutor(
+            max_workers=self._workers, initializer=self._initializer, initargs=self._initargs)
+        pending: deque[tuple[Union[P, Done[T]], Future[T]]] = deque()
+        try:
+            for payload in payloads:
+                pending.append((payload, self._submit(executor, payload)))
+                while pending and (len(pending) >= self._queue_size or pending[0][1].done()):
+                    yield self._take(pending)
+            while pending:
+                yield self._take(pending)
+        finally:
+            for _, future in pending:
+                future.cancel()
+            if self._executor is None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _submit(self, executor: Executor, payload: Union[P, Done[T]]) -> Future[T]:
+        if isinstance(payload, Done):
+            future: Future[T] = Future()
+            future.set_result(payload.value)
+            return future
+        return executor.submit(self._parse, payload)
+
+    @staticmethod
+    def _take(pending: deque[tuple[Union[P, Done[T]], Future[T]]]) -> tuple[Union[P, Done[T]], Union[T, Exception]]:
+        payload, future = pending.popleft()
+        try:
+            return payload, future.result()
+        except Exception as e:
+            return payload, e
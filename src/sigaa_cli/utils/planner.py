@@ -0,0 +1,131 @@
+from __future__ import annotations
+from typing import Callable, Iterable, NamedTuple, Optional, Sequence
+
+from src.sigaa_cli.models.course import AnchoredCourse
+from src.sigaa_cli.utils.compiler import Predicates
+from src.sigaa_cli.utils.eligibility import Eligibility
+from src.sigaa_cli.utils.graph import literal_codes
+
+Requisites = Callable[[str], list[list[str]]]
+
+
+class Plan(NamedTuple):
+    terms: list[list[AnchoredCourse]]
+    # Disciplinas fora das obrigatórias que entraram por serem exigidas por elas
+    extra: list[str]
+    # Obrigatórias que não cabem em nenhum semestre: código -> códigos que faltam
+    blocked: dict[str, list[str]]
+    # Nenhum plano termina antes: maior cadeia de pré-requisitos ou total / limite
+    lower_bound: int
+
+
+def is_mandatory(course: AnchoredCourse) -> bool:
+    return course.type.upper().startswith("OBRIGAT")
+
+
+def _level(course: AnchoredCourse) -> int:
+    return int(course.level) if course.level.isdigit() else 99
+
+
+def _choose(clauses: list[list[str]], available: set[str], done: set[str]) -> list[str]:
+    # Cláusula que menos depende de Disciplinas de fora do plano; empate: a menor
+    def cost(clause: list[str]) -> tuple[int, int]:
+        required = [code for literal in clause for code in literal_codes(literal) if code not in done]
+        return sum(1 for code in required if code not in available), len(required)
+    best = min(clauses, key=cost)
+    return [code for literal in best for code in literal_codes(literal) if code not in done]
+
+
+def plan(courses: Sequence[AnchoredCourse], completed: Iterable[str], requisites: Requisites, max_courses: int,
+         predicates: Optional[Predicates] = None) -> Plan:
+    """Distribui as Disciplinas obrigatórias que faltam em semestres de até ``max_courses``.
+
+    Escalonamento por listas: a cada semestre entram as Disciplinas liberadas
+    (pelo avaliador compilado) com a maior cadeia de dependentes pela frente,
+    desempatando pelo número de dependentes e pelo semestre sugerido. É ótimo
+    quando os pré-requisitos formam árvores e fica perto do limite inferior
+    nos demais casos.
+    """
+    by_code: dict[str, AnchoredCourse] = {}
+    for course in courses:
+        by_code.setdefault(course.code, course)
+    done = set(completed)
+
+    # Fecho das obrigatórias: pré-requisitos que faltam entram no plano se
+    # forem Disciplinas do Curso; os demais bloqueiam quem os exige
+    targets = {code for code, course in by_code.items() if is_mandatory(course) and code not in done}
+    chosen: dict[str, list[str]] = {}
+    missing: dict[str, list[str]] = {}
+    pending = sorted(targets)
+    while pending:
+        code = pending.pop()
+        if code in chosen:
+            continue
+        clauses = requisites(code)
+        required = _choose(clauses, set(by_code), done) if clauses else []
+        chosen[code] = [item for item in required if item in by_code]
+        outside = [item for item in required if item not in by_code]
+        if outside:
+            missing[code] = outside
+        pending.extend(item for item in chosen[code] if item not in chosen)
+
+    # Quem depende de uma Disciplina bloqueada também fica bloqueado
+    dependents: dict[str, list[str]] = {code: [] for code in chosen}
+    for code, required in chosen.items():
+        for item in required:
+            dependents[item].append(code)
+    blocked_queue = list(missing)
+    while blocked_queue:
+        code = blocked_queue.pop()
+        for dependent in dependents[code]:
+            if dependent not in missing:
+                missing[dependent] = [code]
+                blocked_queue.append(dependent)
+
+    # Altura: maior cadeia de dependentes a partir de cada Disciplina (Kahn ao contrário)
+    height = {code: 1 for code in chosen}
+    descendants = {code: 0 for code in chosen}
+    waiting = {code: len(dependents[code]) for code in chosen}
+    ready = [code for code, count in waiting.items() if count == 0]
+    while ready:
+        code = ready.pop()
+        for item in chosen[code]:
+            height[item] = max(height[item], height[code] + 1)
+            descendants[item] += descendants[code] + 1
+            waiting[item] -= 1
+            if waiting[item] == 0:
+                ready.append(item)
+    # Sobrou alguém esperando: ciclo na cláusula escolhida, nunca liberado
+    for code, count in waiting.items():
+        if count and code not in missing:
+            missing[code] = [item for item in chosen[code] if waiting[item]]
+
+    schedulable = {code for code in chosen if code not in missing}
+    lower_bound = 0
+    if schedulable:
+        longest = max(height[code] for code in schedulable)
+        lower_bound = max(longest, -(-len(schedulable) // max_courses))
+
+    eligibility = Eligibility.build([by_code[code] for code in sorted(schedulable)], requisites, predicates)
+    terms: list[list[AnchoredCourse]] = []
+    remaining = set(schedulable)
+    while remaining:
+        available = [course for course in eligibility.eligible(done) if course.code in remaining]
+        if not available:
+            break
+        available.sort(key=lambda course: (-height[course.code], -descendants[course.code], _level(course), course.code))
+        term = available[:max_courses]
+        terms.append(term)
+        for course in term:
+            done.add(course.code)
+            remaining.discard(course.code)
+    # Liberadas por nenhuma cláusula mesmo com o resto do plano cursado
+    for code in remaining:
+        missing[code] = [item for item in chosen[code] if item in remaining]
+
+    return Plan(
+        terms,
+        sorted(code for code in chosen if code not in targets and code not in missing),
+        {code: sorted(set(missing[code])) for code in sorted(missing) if code in targets},
+        lower_bound,
+    )
@@ -0,0 +1,163 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, Iterable, Mapping, Optional, Union
+
+from bs4 import BeautifulSoup, Tag
+
+from src.sigaa_cli.browser import HtmlPage, NodeAdapter
+
+Row = dict[str, Any]
+Target = Union[HtmlPage, NodeAdapter]
+
+# Interpretador único: recebe a especificação compilada e devolve os valores
+# brutos de todas as linhas numa só ida ao navegador.
+_SCRIPT = """
+(scope, spec) => {
+  const pick = (el, selector, top) => {
+    if (!selector) return [el];
+    return Array.from(el.querySelectorAll(top ? selector : ':scope ' + selector));
+  };
+  const read = (el, attr) => {
+    if (attr === 'html') return el.innerHTML;
+    if (attr === 'text') return el.textContent;
+    return el.getAttribute(attr.slice(1));
+  };
+  const run = (el, schema, top) => pick(el, schema.rows, top).map(row => schema.fields.map(([selector, attr, index, many, nested]) => {
+    const found = pick(row, selector, false);
+    if (attr === 'count') return found.length;
+    if (nested) {
+      const target = found[index];
+      return target === undefined ? null : run(target, nested, false);
+    }
+    if (many) return found.map(item => read(item, attr));
+    const target = found[index];
+    return target === undefined ? null : read(target, attr);
+  }));
+  return run(scope, spec, scope.nodeType === 9);
+}
+"""
+
+
+@dataclass(frozen=True)
+class Field:
+    """Valor extraído de cada linha.
+
+    ``selector`` é relativo à linha ("" é a própria linha) e ``attr`` pode ser
+    "html" (innerHTML), "text" (textContent), "count" (número de elementos) ou
+    "@nome" para um atributo.
+    """
+    selector: str = ""
+    attr: str = "html"
+    index: int = 0
+    many: bool = False
+    post: Optional[Callable[[Any], Any]] = None
+    default: Any = None
+    schema: Optional[Schema] = None
+
+    def spec(self) -> list[Any]:
+        nested = self.schema.spec if self.schema is not None else None
+        return [self.selector, self.attr, self.index, self.many, nested]
+
+    def finish(self, raw: Any) -> Any:
+        if raw is None:
+            return [] if self.schema is not None else self.default
+        if self.schema is not None:
+            return self.schema.finish(raw)
+        if self.post is None or self.attr == "count":
+            return raw
+        if self.many:
+            return [self.post(value) for value in raw]
+        return self.post(raw)
+
+
+@dataclass(frozen=True)
+class Schema:
+    """Linhas (``rows``) e os campos extraídos de cada uma.
+
+    ``extract`` resolve tudo num único ``evaluate`` na página viva;
+    ``extract_html`` faz o mesmo numa passada sobre um HTML já serializado
+    pelo navegador (ex.: ``inner_html``/``content``), sem Playwright.
+    """
+    rows: str
+    fields: Mapping[str, Field]
+    where: Optional[Callable[[Row], bool]] = field(default=None, compare=False)
+
+    @cached_property
+    def spec(self) -> dict[str, Any]:
+        return {"rows": self.rows, "fields": [item.spec() for item in self.fields.values()]}
+
+    def finish(self, raw_rows: Iterable[list[Any]]) -> list[Row]:
+        rows: list[Row] = []
+        for raw in raw_rows:
+            row = {name: item.finish(value) for (name, item), value in zip(self.fields.items(), raw)}
+            if self.where is None or self.where(row):
+                rows.append(row)
+        return rows
+
+    def extract(self, target: Target) -> list[Row]:
+        if isinstance(target, HtmlPage):
+            raw = target.evaluate(f"(spec) => ({_SCRIPT})(document, spec)", self.spec)
+        else:
+            raw = target.evaluate(_SCRIPT, self.spec)
+        return self.finish(raw or [])
+
+    def extract_html(self, html: str) -> list[Row]:
+        return self.extract_soup(BeautifulSoup(html, "html.parser"))
+
+    def extract_soup(self, soup: Tag) -> list[Row]:
+        return self.finish(_run(soup, self.spec, isinstance(soup, BeautifulSoup)))
+
+
+def _pick(element: Tag, selector: str, top: bool) -> list[Tag]:
+    if not selector:
+        return [element]
+    if selector.isalnum():
+        # Só o nome da tag: find_all evita o custo do soupsieve
+        return list(element.find_all(selector))
+    return list(element.select(selector if top else ":scope " + selector))
+
+
+def _read(element: Tag, attr: str) -> Optional[str]:
+    if attr == "html":
+        return element.decode_contents()
+    if attr == "text":
+        return element.get_text()
+    value = element.get(attr[1:])
+    if isinstance(value, list):
+        return " ".join(value)
+    return value
+
+
+def _run(element: Tag, spec: Mapping[str, Any], top: bool) -> list[list[Any]]:
+    # Mesma semântica do _SCRIPT, para snapshots offline
+    rows: list[list[Any]] = []
+    for row in _pick(element, spec["rows"], top):
+        values: list[Any] = []
+        for selector, attr, index, many, nested in spec["fields"]:
+            found = _pick(row, selector, False)
+            if attr == "count":
+                values.append(len(found))
+            elif nested is not None:
+                values.append(_run(found[index], nested, False) if index < len(found) else None)
+            elif many:
+                values.append([_read(item, attr) for item in found])
+            else:
+                values.append(_read(found[index], attr) if index < len(found) else None)
+        rows.append(values)
+    return rows
+
+
+def label_map(rows: Iterable[Row], labels: Mapping[str, str], key: str = "label", value: str = "value") -> dict[str, Any]:
+    """Converte linhas rótulo/valor (ex.: th -> td) em ``{campo: valor}``.
+
+    Só os rótulos presentes em ``labels`` são mantidos; rótulos repetidos
+    ficam com o último valor, como nas atribuições sucessivas dos laços
+    originais.
+    """
+    data: dict[str, Any] = {}
+    for row in rows:
+        name = labels.get(row.get(key) or "")
+        if name is not None:
+            data[name] = row.get(value)
+    return data
@@ -7,4 +7,20 @@ def strip_parentheses_terms(value: str) -> str:
 
 def extract_sequence(value: str) -> int:
     m = re.search(r"\d+", value)
-    return int(m.group(0)) if m else 0
\ No newline at end of file
+    return int(m.group(0)) if m else 0
+
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "KB": 1024, "M": 1024 ** 2, "MB": 1024 ** 2, "G": 1024 ** 3, "GB": 1024 ** 3}
+
+def parse_size(value: str) -> int:
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([A-Za-z]*)\s*", value)
+    if not m or m.group(2).upper() not in _SIZE_UNITS:
+        raise ValueError(f"Tamanho inválido: {value}")
+    return int(float(m.group(1)) * _SIZE_UNITS[m.group(2).upper()])
+
+def format_size(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if value < 1024:
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{value:.1f} GB"
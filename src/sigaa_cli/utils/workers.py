@@ -0,0 +1,114 @@
+from __future__ import annotations
+import queue
+import threading
+from typing import Callable, Generic, Iterator, Optional, TypeVar, Union, cast
+
+W = TypeVar("W")
+I = TypeVar("I")
+R = TypeVar("R")
+
+_STOP = object()
+# Intervalo entre as chamadas de ``idle`` enquanto se espera um resultado
+IDLE_POLL = 0.05
+
+
+class WorkerPool(Generic[W, I, R]):
+    """Executa ``job(resource, item)`` em threads, cada uma com seu próprio recurso.
+
+    O recurso de cada thread (ex.: um provedor com navegador logado) é criado
+    por ``spawn`` dentro da própria thread, já que a API síncrona do Playwright
+    não pode ser compartilhada entre threads. Novos itens podem ser enviados
+    enquanto ``results`` está sendo consumido.
+
+    ``idle(resource)`` roda no worker quando a fila de itens está vazia, e o
+    ``idle`` passado a ``results`` roda na thread que espera os resultados;
+    ambos devolvem quanto trabalho fizeram (0 = nada a fazer, pode bloquear).
+    """
+
+    def __init__(
+        self,
+        spawn: Callable[[], W],
+        release: Callable[[W], None],
+        job: Callable[[W, I], R],
+        workers: int = 4,
+        idle: Optional[Callable[[W], int]] = None,
+    ) -> None:
+        self._spawn = spawn
+        self._idle = idle
+        self._release = release
+        self._job = job
+        self._tasks: queue.Queue[object] = queue.Queue()
+        self._results: queue.Queue[tuple[Optional[I], Union[R, BaseException], bool]] = queue.Queue()
+        self._pending = 0
+        self._spawn_error: Optional[BaseException] = None
+        self._threads = [
+            threading.Thread(target=self._work, name=f"sigaa-worker-{index}", daemon=True)
+            for index in range(max(1, workers))
+        ]
+        self._alive = len(self._threads)
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self) -> None:
+        try:
+            resource = self._spawn()
+        except BaseException as e:
+            self._results.put((None, e, True))
+            return
+        try:
+            while True:
+                item = self._next(resource)
+                if item is _STOP:
+                    break
+                try:
+                    self._results.put((item, self._job(resource, item), False))  # type: ignore[arg-type]
+                except Exception as e:
+                    self._results.put((item, e, False))  # type: ignore[arg-type]
+        finally:
+            self._release(resource)
+
+    def _next(self, resource: W) -> object:
+        while self._idle is not None:
+            try:
+                return self._tasks.get_nowait()
+            except queue.Empty:
+                if not self._idle(resource):
+                    break
+        return self._tasks.get()
+
+    def submit(self, item: I) -> None:
+        self._pending += 1
+        self._tasks.put(item)
+
+    def _result(self, idle: Optional[Callable[[], int]]) -> tuple[Optional[I], Union[R, BaseException], bool]:
+        while idle is not None:
+            try:
+                return self._results.get(timeout=IDLE_POLL)
+            except queue.Empty:
+                if not idle():
+                    break
+        return self._results.get()
+
+    def results(self, idle: Optional[Callable[[], int]] = None) -> Iterator[tuple[I, Union[R, Exception]]]:
+        while self._pending > 0:
+            item, result, worker_died = self._result(idle)
+            if worker_died:
+                self._alive -= 1
+                self._spawn_error = cast(BaseException, result)
+                if self._alive == 0:
+                    raise RuntimeError("Nenhum worker conseguiu iniciar") from self._spawn_error
+                continue
+            self._pending -= 1
+            yield item, result  # type: ignore[misc]
+
+    def close(self) -> None:
+        for _ in self._threads:
+            self._tasks.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self) -> WorkerPool[W, I, R]:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()